@@ -1,7 +1,6 @@
 from helper import argparse,\
                    a2_preprocessing,\
-                   a2_create_nodes, \
-                   a2_create_edges,\
+                   a2_create_graph,\
                    a2_ingest
 
 from neo4j import GraphDatabase
@@ -20,13 +19,13 @@ if __name__ == "__main__":
     db = args.db
     data_path = args.data_path
     output_path = args.output_path
+    workers = args.workers
 
 
     driver = GraphDatabase.driver(uri, auth=(username, password))
 
     a2_preprocessing.preprocessing()
-    a2_create_nodes.create_nodes(data_path,output_path)
-    a2_create_edges.create_edges(data_path,output_path)
+    a2_create_graph.create_graph(data_path,output_path,workers)
     a2_ingest.ingestion(driver)
 
 
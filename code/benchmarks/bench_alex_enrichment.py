@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from helper import fetching_data
+from helper.scheduler import RateLimitedScheduler
+
+### Benchmark of the OpenAlex enrichment stage against a local stub server
+num_papers = 5000
+latency = 0.02  # simulated OpenAlex response time in seconds
+concurrency_levels = [1, 8, 32]
+
+
+class StubOpenAlexHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so the client connection pool is exercised
+    disable_nagle_algorithm = True
+
+    request_count = 0
+
+    def do_GET(self):
+        time.sleep(latency)
+        StubOpenAlexHandler.request_count += 1
+        query = parse_qs(urlparse(self.path).query)
+        if 'filter' in query and query['filter'][0].startswith('doi:'):
+            # Batched lookup: one work per DOI in the OR-ed filter
+            dois = query['filter'][0][len('doi:'):].split('|')
+            body = {"results": [create_work(f"https://doi.org/{doi}") for doi in dois]}
+        else:
+            body = create_work(self.path)
+        body = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_work(doi):
+    return {"id": doi, "doi": doi, "keywords": [{"display_name": "data management"}]}
+
+
+def create_papers(n):
+    return [{'paperId': f'paper{i}', 'externalIds': {'DOI': f'10.1000/{i}'}} for i in range(n)]
+
+
+if __name__ == "__main__":
+
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAlexHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    paper_lst = create_papers(num_papers)
+
+    for concurrency in concurrency_levels:
+        StubOpenAlexHandler.request_count = 0
+        start = time.perf_counter()
+        # The stub server is not rate limited, only the concurrency bounds the request rate
+        scheduler = RateLimitedScheduler(rate=1e6, concurrency=concurrency)
+        alex_info_lst = list(fetching_data.fetch_alex_info(paper_lst, concurrency=concurrency, base_url=base_url,
+                                                           scheduler=scheduler))
+        elapsed = time.perf_counter() - start
+
+        assert [x['paperId'] for x in alex_info_lst] == [x['paperId'] for x in paper_lst]
+        print(f"concurrency={concurrency:>3}: {len(alex_info_lst)} papers in {elapsed:.2f}s "
+              f"-> {len(alex_info_lst) / elapsed:.1f} papers/s, {StubOpenAlexHandler.request_count} requests")
+
+    server.shutdown()
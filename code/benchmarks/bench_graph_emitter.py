@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from helper import a2_preprocessing, a2_create_nodes, a2_create_edges, a2_create_graph
+from helper.synthetic_data import generate
+
+### CSV generation of PartA.2 on synthetic corpora: create_nodes + create_edges (one scan of the papers per
+### paper file, mappings written to and read back from disk) vs. create_graph (a single scan)
+paper_counts = [10_000, 100_000]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        fn(*args)
+    return time.perf_counter() - start
+
+
+def two_step(data_path, output_path):
+    a2_create_nodes.create_nodes(data_path, output_path)
+    a2_create_edges.create_edges(data_path, output_path)
+
+
+if __name__ == "__main__":
+
+    for num_papers in paper_counts:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                generate(num_papers)
+                a2_preprocessing.preprocessing()
+            os.makedirs('two_step')
+            os.makedirs('single_pass')
+
+            two_step_time = timed(two_step, './paper_data/', './two_step/')
+            single_pass_time = timed(a2_create_graph.create_graph, './paper_data/', './single_pass/')
+            print(f"{num_papers} papers: create_nodes + create_edges {two_step_time:.1f}s, "
+                  f"create_graph {single_pass_time:.1f}s ({two_step_time / single_pass_time:.1f}x)")
+            os.chdir('/')
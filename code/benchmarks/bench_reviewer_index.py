@@ -0,0 +1,97 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from helper.reviewer_index import build_reviewer_index
+
+### Benchmark of the reviewer candidate selection: per paper domain list scan vs. the inverted domain index
+### (the index also excludes co-authors and shared affiliations and balances the reviews under the per reviewer
+### cap of assign_reviewer_research_paper, which the domain list scan does not)
+paper_counts = [10_000, 100_000, 1_000_000]
+legacy_max_papers = 200   # the domain list scan is timed on a sample and extrapolated above this
+fields = ["Computer Science", "Medicine", "Biology", "Chemistry", "Mathematics", "Physics",
+          "Engineering", "Economics", "Psychology", "Geography"]
+h_index_threshold = 5
+max_reviews_per_reviewer = 10   # default cap of assign_reviewer_research_paper
+
+
+def create_papers(n):
+    num_authors = max(n // 2, 10)
+    papers = []
+    for i in range(n):
+        papers.append({
+            'paperId': f'paper{i}',
+            'fieldsOfStudy': random.sample(fields, random.randint(1, 2)) if i % 10 else None,
+            'authors': [{'authorId': str(random.randrange(num_authors))} for _ in range(random.randint(1, 5))]
+        })
+    author_h_index = {str(a): random.randint(0, 40) for a in range(num_authors)}
+    author_affiliations = {str(a): [f'Institute {random.randrange(num_authors // 20 + 1)}'] for a in range(num_authors)}
+    return papers, author_h_index, author_affiliations
+
+
+def legacy_candidates(paper_lst, author_h_index):
+    """Candidate selection of the original assign_reviewer_research_paper"""
+    domain_author = {}
+    for paper in paper_lst:
+        if paper['fieldsOfStudy'] != None:
+            for domain in paper['fieldsOfStudy']:
+                for author in paper['authors']:
+                    domain_author.setdefault(domain, []).append(author['authorId'])
+
+    def select(paper):
+        paper_author = set([author['authorId'] for author in paper['authors']])
+        selected_author = []
+        for domain in paper['fieldsOfStudy']:
+            selected_author.extend(domain_author[domain])
+        selected_author = list(set(selected_author))
+        selected_author = set([ids for ids in selected_author if ids != None and ids in author_h_index.keys()
+                               and author_h_index[ids] >= h_index_threshold])
+        choosen_authors = list(selected_author.difference(paper_author))
+        if len(choosen_authors) >= 3:
+            return random.sample(choosen_authors, random.choice([2, 3]))
+        return choosen_authors
+
+    return select
+
+
+def time_legacy(paper_lst, author_h_index):
+    start = time.perf_counter()
+    select = legacy_candidates(paper_lst, author_h_index)
+    build = time.perf_counter() - start
+
+    sample = [paper for paper in paper_lst[:legacy_max_papers] if paper['fieldsOfStudy'] is not None]
+    start = time.perf_counter()
+    for paper in sample:
+        select(paper)
+    per_paper = (time.perf_counter() - start) / len(sample)
+    with_fields = sum(1 for paper in paper_lst if paper['fieldsOfStudy'] is not None)
+    return build + per_paper * with_fields, len(sample) < with_fields
+
+
+def time_index(paper_lst, author_h_index, author_affiliations):
+    start = time.perf_counter()
+    index = build_reviewer_index(paper_lst, author_h_index, h_index_threshold, author_affiliations)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for paper in paper_lst:
+        if paper['fieldsOfStudy'] is not None:
+            index.assign(paper['fieldsOfStudy'], {author['authorId'] for author in paper['authors']},
+                         random.choice([2, 3]), max_reviews_per_reviewer)
+    return build, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+    random.seed(0)
+    for n in paper_counts:
+        paper_lst, author_h_index, author_affiliations = create_papers(n)
+        legacy_time, extrapolated = time_legacy(paper_lst, author_h_index)
+        build_time, assign_time = time_index(paper_lst, author_h_index, author_affiliations)
+        index_time = build_time + assign_time
+        note = " (extrapolated)" if extrapolated else ""
+        print(f"{n} papers: domain list scan {legacy_time:.1f}s{note}, "
+              f"inverted index {index_time:.2f}s (build {build_time:.2f}s, assign {assign_time:.2f}s), "
+              f"speedup {legacy_time / index_time:.0f}x")
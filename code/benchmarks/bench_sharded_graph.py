@@ -0,0 +1,46 @@
+import filecmp
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from helper import a2_preprocessing, a2_create_graph
+from helper.synthetic_data import generate
+
+### Speedup of the sharded create_graph from 1 to N processes on synthetic corpora
+### (1 process is the unsharded single pass, the files of every run are checked to be identical to it)
+paper_counts = [100_000, 1_000_000]
+worker_counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+
+
+def timed_create_graph(output_path, workers):
+    os.makedirs(output_path)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        a2_create_graph.create_graph('./paper_data/', output_path, workers)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+    print(f"{os.cpu_count()} cores")
+    for num_papers in paper_counts:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                generate(num_papers)
+                a2_preprocessing.preprocessing()
+
+            base_time = timed_create_graph('./workers_1/', 1)
+            print(f"{num_papers} papers, 1 process: {base_time:.1f}s")
+            for workers in worker_counts[1:]:
+                output_path = f'./workers_{workers}/'
+                elapsed = timed_create_graph(output_path, workers)
+                files = sorted(os.listdir('./workers_1/'))
+                _, mismatch, errors = filecmp.cmpfiles('./workers_1/', output_path, files, shallow=False)
+                assert not mismatch and not errors, mismatch + errors
+                print(f"{num_papers} papers, {workers} processes: {elapsed:.1f}s ({base_time / elapsed:.2f}x)")
+            os.chdir('/')
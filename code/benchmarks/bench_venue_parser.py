@@ -0,0 +1,132 @@
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from helper import venue_parser
+from helper.venue_parser import ORDINAL_WORDS, VenueTable
+
+### Throughput of the venue name parsing on a million venue strings:
+### regexes compiled per call (original a2_preprocessing functions) vs. precompiled, memoized parser and venue table
+num_venues = 1_000_000
+num_distinct = 5_000
+
+conference_names = ["International Conference on Very Large Data Bases", "ACM SIGMOD Conference",
+                    "IEEE International Conference on Data Engineering", "Symposium on Principles of Database Systems",
+                    "European Conference on Machine Learning", "Workshop on Health Informatics"]
+edition_terms = ["{year}", "{n}th", "Edition {n}", "'{yy}", "Twenty-First", "Third", ""]
+
+
+def create_venues():
+    distinct = []
+    for _ in range(num_distinct):
+        term = random.choice(edition_terms).format(year=random.randint(1980, 2024), n=random.randint(1, 40),
+                                                   yy=random.randint(10, 99))
+        distinct.append(f"{term} {random.choice(conference_names)} {random.randint(1990, 2024)}".strip())
+    # Venue names repeat heavily, like the conference papers of one proceedings
+    return random.choices(distinct, weights=[1 / (i + 1) for i in range(num_distinct)], k=num_venues)
+
+
+def legacy_extract_edition(conference_name):
+    pattern = re.compile(
+        r"""
+        (\b\d{4}\b)|                        # 4-digit year (group 1)
+        (\d+)(?:st|nd|rd|th)\b|             # Numeric ordinal (group 2)
+        Edition\s+(\d+)|                    # Explicit "Edition X" (group 3)
+        ['’](\d{2})\b|                      # Apostrophe year (group 4)
+        \b(First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth|
+        Eleventh|Twelfth|Thirteenth|Fourteenth|Fifteenth|Sixteenth|Seventeenth|
+        Eighteenth|Nineteenth|Twentieth|Twenty[- ]?First|Twenty[- ]?Second|
+        Twenty[- ]?Third|Twenty[- ]?Fourth|Twenty[- ]?Fifth|Twenty[- ]?Sixth|
+        Twenty[- ]?Seventh|Twenty[- ]?Eighth|Twenty[- ]?Ninth|Thirtieth)\b
+        """,
+        re.IGNORECASE | re.X
+    )
+    editions = []
+    for match in pattern.finditer(conference_name):
+        if match.group(1):
+            editions.append(('year', int(match.group(1))))
+        elif match.group(2):
+            editions.append(('ordinal', int(match.group(2))))
+        elif match.group(3):
+            editions.append(('edition_x', int(match.group(3))))
+        elif match.group(4):
+            year = int(match.group(4))
+            full_year = 2000 + year if year < (datetime.now().year - 2000 + 1) else 1900 + year
+            editions.append(('apostrophe_year', full_year))
+        elif match.group(5):
+            key = match.group(5).lower().replace('-', '').replace(' ', '')
+            editions.append(('textual_ordinal', ORDINAL_WORDS.get(key, None)))
+    for category in ['edition_x', 'textual_ordinal', 'ordinal', 'apostrophe_year', 'year']:
+        for ed_type, value in editions:
+            if ed_type == category and value is not None:
+                return value
+    return None
+
+
+def legacy_clean_conference_name(conference_name):
+    pattern = re.compile(
+        r"""
+        \b\d{4}\b|                        # 4-digit year
+        \d+(?:st|nd|rd|th)\b|             # Numeric ordinal
+        Edition\s+\d+|                    # Explicit "Edition X"
+        ['’]\d{2}\b|                      # Apostrophe year
+        \b(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth|
+        Eleventh|Twelfth|Thirteenth|Fourteenth|Fifteenth|Sixteenth|Seventeenth|
+        Eighteenth|Nineteenth|Twentieth|Twenty[- ]?First|Twenty[- ]?Second|
+        Twenty[- ]?Third|Twenty[- ]?Fourth|Twenty[- ]?Fifth|Twenty[- ]?Sixth|
+        Twenty[- ]?Seventh|Twenty[- ]?Eighth|Twenty[- ]?Ninth|Thirtieth)\b
+        """,
+        re.IGNORECASE | re.X
+    )
+    cleaned = pattern.sub('', conference_name)
+    cleaned = re.sub(r'\s{2,}', ' ', cleaned)
+    cleaned = re.sub(r'[ ,\-]+$', '', cleaned)
+    cleaned = re.sub(r'^[ ,\-]+', '', cleaned)
+    return cleaned.strip()
+
+
+def report(name, elapsed):
+    print(f"{name}: {elapsed:.2f}s, {num_venues / elapsed:,.0f} venues/s")
+
+
+if __name__ == "__main__":
+
+    random.seed(0)
+    venues = create_venues()
+
+    start = time.perf_counter()
+    legacy = [(legacy_clean_conference_name(venue), legacy_extract_edition(venue)) for venue in venues]
+    report("regexes compiled per call", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    precompiled = [(venue_parser.clean_conference_name(venue), venue_parser.extract_edition(venue)) for venue in venues]
+    report("precompiled regexes", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    memoized = [venue_parser.parse_venue(venue) for venue in venues]
+    report("precompiled + memoized", time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # First run fills and saves the venue table, a later run only loads it
+        table_path = os.path.join(tmp_dir, 'venue_table.json')
+        venue_parser.parse_venue.cache_clear()
+        start = time.perf_counter()
+        venue_table = VenueTable(table_path)
+        from_table = [venue_table.parse(venue) for venue in venues]
+        venue_table.save()
+        report("venue table, first run", time.perf_counter() - start)
+
+        venue_parser.parse_venue.cache_clear()
+        start = time.perf_counter()
+        venue_table = VenueTable(table_path)
+        from_saved_table = [venue_table.parse(venue) for venue in venues]
+        report("venue table, later run", time.perf_counter() - start)
+
+    assert legacy == precompiled == memoized == from_table == from_saved_table
+    print(f"{len(set(venues))} distinct venue names")
@@ -1,9 +1,13 @@
 
 import argparse
-import csv
 import os
 import json
 import pandas as pd
+from helper.storage import load_records
+from helper.table_output import TableWriter, write_frame, check_output_formats
+from helper.paper_emitter import PaperWriter, is_journal_article, write_papers
+from helper.a2_create_nodes import volume_key, add_edition_ids
+from helper.node_ids import keyword_id, volume_id
 
 def load_json(json_file_path):
     """Loading json files"""
@@ -16,224 +20,164 @@ def load_json(json_file_path):
         except json.JSONDecodeError:
             print(f"Error loading JSON from {json_file_path}, starting with empty list")
             
-def load_keyword_to_id(keywords_node):
-    """Loading keyword to id mapping"""
-    keyword_to_id = {}
-    with open(keywords_node, 'r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            keyword_to_id[row['keyword']] = row['keywordId']
-    return keyword_to_id
-
-def load_volume_to_id(volume_file):
-    """Loading volume to journal mapping"""
-    volume_to_id = {}
-    with open(volume_file, 'r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            volume_key = (row['journalId'], row['year'], row['number'])
-            volume_to_id[volume_key] = row['volumeId']
-    return volume_to_id
+class AuthorWroteWriter(PaperWriter):
+    columns = ["authorId","paperId"]
+
+    def __init__(self, output):
+        super().__init__(output)
+        self.author_count = 0
+
+    def write_paper(self, paper):
+        self.author_count+=len(paper['authors'])
+        authors = paper.get('authors', None)
+        paperId=paper.get('paperId', None)
+        # paperIds are unique in the combined data, so the pairs only repeat within a paper
+        paper_author_ids = set()
+        for author in authors:
+            if author is None:
+                continue
+            authorId=author.get('authorId', None)
+            if authorId not in paper_author_ids and authorId:
+                self.write_row(authorId, paperId)
+                paper_author_ids.add(authorId)
 
-def create_author_wrote_edge(output,all_papers):
-    count = 0
+    def report(self):
+        return f'Added {self.count} author-wrote-paper relations from total {self.author_count} to {self.output}'
 
-    author_paper_pairs = set()
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "authorId","paperId"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-        author_count=0
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-            author_count+=len(paper['authors'])
-            authors = paper.get('authors', None)
-            paperId=paper.get('paperId', None)
-            for author in authors:
-                if author is None:
-                    continue
-                authorId=author.get('authorId', None)
-                if (authorId, paperId) not in author_paper_pairs and authorId:
-                    writer.writerow({
-                        'authorId': authorId,
-                        'paperId': paperId
-                    })
-                    author_paper_pairs.add((authorId, paperId))
-                    count += 1
-
-        print(f'Added {count} author-wrote-paper relations from total {author_count} to {output}')
+
+def create_author_wrote_edge(output,all_papers):
+    write_papers(all_papers, AuthorWroteWriter(output))
 
 def create_author_reviewed_edge(output,paper_reviews):
     count = 0
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "authorId","paperId"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-        result = set()
-        for paperId, authorIds in paper_reviews.items():
-            for authorId in authorIds:
-                result.add((authorId,paperId))
-                count+=1
-        writer.writerows({"authorId": authorId, "paperId": paperId} for authorId, paperId, in result)
-        print(f'Added {count} author_reviewed relations to {output}')
+    result = {} # Distinct pairs in order, a set would change the row order from run to run
+    for paperId, authorIds in paper_reviews.items():
+        for authorId in authorIds:
+            result[(authorId,paperId)] = None
+            count+=1
+    table = TableWriter(output, ["authorId","paperId"])
+    table.write_rows(result)
+    table.close()
+    print(f'Added {count} author_reviewed relations to {output}')
 
-def create_paper_correspondedBy_edge(output,all_papers):
-    count = 0
+class CorrespondedByWriter(PaperWriter):
+    columns = ["paperId", "authorId"]
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "paperId", "authorId"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
+    def write_paper(self, paper):
+        corr_author = paper.get('authors', None)
+        if corr_author and corr_author[0]['authorId']:
+            self.write_row(paper.get('paperId', None), corr_author[0]['authorId'])
 
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-            corr_author = paper.get('authors', None)
-            if corr_author is None:
-                continue
-            if corr_author and corr_author[0]['authorId']:
-                writer.writerow({
-                    'paperId': paper.get('paperId', None),
-                    'authorId': corr_author[0]['authorId']
-                })
-                count += 1
+    def report(self):
+        return f'Added {self.count} paper_corresponded_by relations to {self.output}'
 
-        print(f'Added {count} paper_corresponded_by relations to {output}')
 
-def create_paper_isRelatedTo_edge(output, paper_keywords, keyword_to_id):
+def create_paper_correspondedBy_edge(output,all_papers):
+    write_papers(all_papers, CorrespondedByWriter(output))
+
+def create_paper_isRelatedTo_edge(output, paper_keywords):
     count = 0
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "paperId", "keywordId"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-        for paper_id, keywords in paper_keywords.items():
-            for keyword in keywords:
-                lower_key=keyword.lower()
-                keyword_id = keyword_to_id[lower_key]
-                writer.writerow({
-                    'paperId': paper_id,
-                    'keywordId': keyword_id
-                })
-                count+=1
-        print(f'Added {count} paper_isRelatedTo relations to {output}')
+    table = TableWriter(output, ["paperId", "keywordId"])
+    for paper_id, keywords in paper_keywords.items():
+        for keyword in keywords:
+            if not keyword.strip():
+                continue
+            table.write((paper_id, keyword_id(keyword)))
+            count+=1
+    table.close()
+    print(f'Added {count} paper_isRelatedTo relations to {output}')
 
 def create_paper_publishedIn_ed_edge(output, paper_event_ed):
     paper_edition_df = paper_event_ed[['paperId', 'editionId', 'pages']].drop_duplicates()
 
-    paper_edition_df.to_csv(output, index=False)
+    write_frame(paper_edition_df, output)
     print(f'Added {len(paper_edition_df)} paper_publishedIn relations to {output} for events')
     
-def create_paper_publishedIn_vol_edge(output, all_papers, volume_to_id):
-    count = 0
+class PublishedInVolumeWriter(PaperWriter):
+    columns = ["paperId", "volumeId", "pages"]
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "paperId", "volumeId", "pages"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
+    def write_paper(self, paper):
+        if is_journal_article(paper):
+            paperId=paper.get('paperId', None)
+            journal = paper.get('journal', None) or {}
+            key = volume_key(paper)
+            journal_id, year, number = key
+            if not journal_id or not year or not number:
+                print(f"Skipping paper due to missing data: paperId={paperId}, journal_id={journal_id}, year={year}, number={number}")
+                return
+
+            self.write_row(paperId, volume_id(*key), journal.get('pages'))
+
+    def report(self):
+        return f'Added {self.count} paper_publishedIn relations to {self.output} for journals'
 
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-            year=str(paper.get('year', None)).strip()
-            venue=paper.get('publicationVenue') 
-            if ('JournalArticle' in paper.get('publicationTypes', None)
-            and 'Conference' not in paper.get('publicationTypes', None) and venue is not None):
-                paperId=paper.get('paperId', None)
-                journal = paper.get('journal', None)
-                number=str(journal.get('volume',None)).strip()
-                journal_id = str(venue.get('id')).strip()
-                if not journal_id or not year or not number:
-                    print(f"Skipping paper due to missing data: paperId={paperId}, journal_id={journal_id}, year={year}, number={number}")
-                    continue
-
-                volume_key = (journal_id, year, number)
-                # print(f"Volume Key Searched: {volume_key}")
-
-                if volume_key in volume_to_id:
-                    volumeId = volume_to_id[volume_key]
-                    writer.writerow({
-                        'paperId': paperId,
-                        'volumeId': volumeId,
-                        'pages': journal.get('pages')
-                    })
-                    count += 1
-                else:
-                    print(f"Warning: Volume not found for paper {paperId}")
-
-        print(f'Added {count} paper_publishedIn relations to {output} for journals')
+
+def create_paper_publishedIn_vol_edge(output, all_papers):
+    write_papers(all_papers, PublishedInVolumeWriter(output))
 
 
 def create_event_hasEdition_edge(output, paper_event_ed):
     edition_event_df = paper_event_ed[['venue_id', 'editionId']].drop_duplicates()
     edition_event_df.rename(columns={'venue_id': 'eventId'}, inplace=True)
-    edition_event_df.to_csv(output, index=False)
+    write_frame(edition_event_df, output)
     print(f'Added {len(edition_event_df)} event_hasEdition relations to {output} for events')
 
-def create_journal_hasVolume_edge(output, vol_journal):
-    edge_df = vol_journal[['journalId', 'volumeId']].drop_duplicates()
-    edge_df.to_csv(output, index=False)
-    print(f'Added {len(edge_df)} journal_hasVolume relations to {output}')
+class JournalHasVolumeWriter(PaperWriter):
+    columns = ["journalId", "volumeId"]
+    merge_key = ['volumeId']
 
-def create_paper_citedIn_edge(output, all_papers):
-    count = 0
+    def __init__(self, output):
+        super().__init__(output)
+        self.unique_volumes = set()
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                 "paperId", "citingPaperId"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
+    def write_paper(self, paper):
+        if is_journal_article(paper):
+            key = volume_key(paper)
+            if key not in self.unique_volumes:
+                self.write_row(key[0], volume_id(*key))
+                self.unique_volumes.add(key)
 
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-            
-            paperId=paper.get('paperId', None)
-            citations = paper.get('citations', None)
-            for citation in citations:
-                citationId=citation.get('paperId', None)
-                if citationId is not None:
-                    writer.writerow({
-                        'paperId': paperId,
-                        'citingPaperId': citationId
-                    })
-                    count += 1
-
-        print(f'Added {count} paper_citedIn relations to {output}')
+    def report(self):
+        return f'Added {self.count} journal_hasVolume relations to {self.output}'
+
+
+def create_journal_hasVolume_edge(output, all_papers):
+    write_papers(all_papers, JournalHasVolumeWriter(output))
+
+class CitedInWriter(PaperWriter):
+    columns = ["paperId", "citingPaperId"]
+
+    def write_paper(self, paper):
+        paperId=paper.get('paperId', None)
+        citations = paper.get('citations', None)
+        for citation in citations:
+            citationId=citation.get('paperId', None)
+            if citationId is not None:
+                self.write_row(paperId, citationId)
+
+    def report(self):
+        return f'Added {self.count} paper_citedIn relations to {self.output}'
+
+
+def create_paper_citedIn_edge(output, all_papers):
+    write_papers(all_papers, CitedInWriter(output))
 
 def create_edges(data_path,output_path):
 
-    all_papers=load_json(os.path.join(data_path, 'combined_papers_data.json'))
+    check_output_formats()
+    all_papers=load_records(os.path.join(data_path, 'combined_papers_data.json'))
     paper_reviews=load_json(os.path.join(data_path, 'paper_reviewers.json'))
-    paper_event_ed=pd.read_csv(os.path.join(output_path, 'ed_conf_merged.csv'))
-    vol_journal=pd.read_csv(os.path.join(output_path, 'vol_journal_map.csv'))
-    keyword_to_Id=load_keyword_to_id(os.path.join(output_path, 'keyword.csv'))
-    volume_to_id=load_volume_to_id(os.path.join(output_path, 'vol_journal_map.csv'))
+    paper_event_ed=add_edition_ids(pd.read_csv(os.path.join(data_path, 'paper_proceedings_location_new.csv')))
     paper_keywords = load_json(os.path.join(data_path,'paper_keywords.json'))
-    create_paper_isRelatedTo_edge(os.path.join(output_path,'paper_isRelatedTo_keyword.csv'), paper_keywords , keyword_to_Id)
+    create_paper_isRelatedTo_edge(os.path.join(output_path,'paper_isRelatedTo_keyword.csv'), paper_keywords)
     create_author_wrote_edge(os.path.join(output_path,'author_wrote_paper.csv'), all_papers)
     create_paper_correspondedBy_edge(os.path.join(output_path,'paper_correspondedBy_author.csv'), all_papers)
-    create_paper_publishedIn_vol_edge(os.path.join(output_path,'paper_publishedIn_volume.csv'), all_papers, volume_to_id)
+    create_paper_publishedIn_vol_edge(os.path.join(output_path,'paper_publishedIn_volume.csv'), all_papers)
     create_paper_publishedIn_ed_edge(os.path.join(output_path,'paper_publishedIn_edition.csv'), paper_event_ed)
     create_event_hasEdition_edge(os.path.join(output_path,'event_hasEdition_edition.csv'), paper_event_ed)
-    create_journal_hasVolume_edge(os.path.join(output_path,'journal_hasVolume_volume.csv'), vol_journal)
+    create_journal_hasVolume_edge(os.path.join(output_path,'journal_hasVolume_volume.csv'), all_papers)
     create_paper_citedIn_edge(os.path.join(output_path,'paper_citedIn_paper.csv'), all_papers)
     create_author_reviewed_edge(os.path.join(output_path, 'author_reviewed_paper.csv'), paper_reviews)
     print("Edges Created Successfully!!!")
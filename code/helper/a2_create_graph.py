@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from helper.storage import load_records, read_records, iter_batches
+from helper.paper_emitter import PaperEmitter, merge_shard_files
+from helper.table_output import check_output_formats
+from helper.a2_create_nodes import load_json, create_keywords_node, create_edition_node, add_edition_ids, \
+    PaperNodeWriter, EventNodeWriter, VolumeNodeWriter, JournalNodeWriter, AuthorNodeWriter
+from helper.a2_create_edges import create_paper_isRelatedTo_edge, create_paper_publishedIn_ed_edge, \
+    create_event_hasEdition_edge, create_author_reviewed_edge, AuthorWroteWriter, CorrespondedByWriter, \
+    PublishedInVolumeWriter, JournalHasVolumeWriter, CitedInWriter
+
+### Node and edge CSV files of PartA.2 in a single scan of combined_papers_data
+### Same files as create_nodes followed by create_edges, but the papers are streamed once to all paper
+### writers. The keyword, volume and edition ids are derived from their natural keys (helper.node_ids),
+### so no writer depends on another one.
+### With workers > 1 the paper stream is cut into shards of shard_size papers, written by a process pool
+### into output_path/shards and merged in shard order: the files are identical to the single process ones.
+
+shard_size = 20000          # papers per shard with workers > 1
+
+# Writers fed from the paper records and their files
+paper_writers = [
+    (PaperNodeWriter, 'paper.csv'),
+    (EventNodeWriter, 'event.csv'),
+    (VolumeNodeWriter, 'volume.csv'),
+    (JournalNodeWriter, 'journal.csv'),
+    (AuthorNodeWriter, 'author.csv'),
+    (AuthorWroteWriter, 'author_wrote_paper.csv'),
+    (CorrespondedByWriter, 'paper_correspondedBy_author.csv'),
+    (PublishedInVolumeWriter, 'paper_publishedIn_volume.csv'),
+    (JournalHasVolumeWriter, 'journal_hasVolume_volume.csv'),
+    (CitedInWriter, 'paper_citedIn_paper.csv'),
+]
+
+
+def register_paper_writers(emitter, output_path):
+    """Registers the node and edge writers fed from the paper records"""
+    for writer_class, filename in paper_writers:
+        emitter.register(writer_class(os.path.join(output_path, filename)))
+    return emitter
+
+
+def write_paper_shard(shard_path, paper_texts):
+    """Writes the paper files of one shard from the JSON text of its papers,
+    returns the number of papers and the rows of every file"""
+    os.makedirs(shard_path, exist_ok=True)
+    emitter = register_paper_writers(PaperEmitter(), shard_path)
+    num_papers = emitter.run((json.loads(text) for text in paper_texts), report=False)
+    return num_papers, [writer.count for writer in emitter.writers]
+
+
+def create_paper_files_sharded(papers_path, output_path, workers):
+    shard_root = os.path.join(output_path, 'shards')
+    shard_paths = []
+    shard_results = []
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # The papers are sent as JSON text, cheaper to pass to a process than the parsed records
+        for i, paper_texts in enumerate(iter_batches(read_records(papers_path, raw=True), shard_size)):
+            shard_paths.append(os.path.join(shard_root, f'shard_{i:05d}'))
+            pending.append(executor.submit(write_paper_shard, shard_paths[-1], paper_texts))
+            # The papers of a shard stay in memory until it is written, so only a few shards are in flight
+            if len(pending) >= 2 * workers:
+                shard_results.append(pending.popleft().result())
+        while pending:
+            shard_results.append(pending.popleft().result())
+
+    if not shard_paths:
+        return register_paper_writers(PaperEmitter(), output_path).run([])
+
+    ## Ordered merge, authors, journals, events and volumes of several shards are written once
+    for i, (writer_class, filename) in enumerate(paper_writers):
+        output = os.path.join(output_path, filename)
+        count = merge_shard_files(output, [os.path.join(shard_path, filename) for shard_path in shard_paths],
+                                  [shard_counts[i] for _, shard_counts in shard_results], writer_class)
+        print(f'Added {count} rows to {output} from {len(shard_paths)} shards')
+    shutil.rmtree(shard_root)
+    return sum(num_papers for num_papers, _ in shard_results)
+
+
+def create_graph(data_path, output_path, workers=1):
+    check_output_formats()
+    start = time.perf_counter()
+    all_papers = load_records(os.path.join(data_path, 'combined_papers_data.json'))
+    paper_keywords = load_json(os.path.join(data_path, 'paper_keywords.json'))
+    paper_reviews = load_json(os.path.join(data_path, 'paper_reviewers.json'))
+    ed_data = pd.read_csv(os.path.join(data_path, 'paper_proceedings_location_new.csv'))
+
+    ## Files that do not come from the paper records
+    paper_event_ed = add_edition_ids(ed_data)
+    create_keywords_node(os.path.join(output_path, 'keyword.csv'), paper_keywords)
+    create_edition_node(os.path.join(output_path, 'edition.csv'), ed_data)
+    create_paper_isRelatedTo_edge(os.path.join(output_path, 'paper_isRelatedTo_keyword.csv'), paper_keywords)
+    create_paper_publishedIn_ed_edge(os.path.join(output_path, 'paper_publishedIn_edition.csv'), paper_event_ed)
+    create_event_hasEdition_edge(os.path.join(output_path, 'event_hasEdition_edition.csv'), paper_event_ed)
+    create_author_reviewed_edge(os.path.join(output_path, 'author_reviewed_paper.csv'), paper_reviews)
+
+    ## One pass over the papers for all the other files
+    if workers > 1:
+        num_papers = create_paper_files_sharded(all_papers.path, output_path, workers)
+    else:
+        num_papers = register_paper_writers(PaperEmitter(), output_path).run(all_papers)
+
+    print(f"Created Nodes and Edges Successfully from {num_papers} papers in {time.perf_counter() - start:.1f}s!!!")
@@ -3,16 +3,11 @@ import argparse
 import csv
 import os
 import json
-import uuid
 import pandas as pd
-
-def clean_field(value):
-    value = str(value).strip()
-    # Replace problematic characters
-    value = value.replace('\r', ' ').replace('\n', ' ')  # Remove newlines
-    value = value.replace('"', "'")  # Standardize to single quotes
-    value = value.replace('\\', '/')  # Handle backslashes
-    return value
+from helper.storage import load_records
+from helper.node_ids import keyword_id, volume_id, edition_id
+from helper.table_output import TableWriter, write_frame, check_output_formats
+from helper.paper_emitter import PaperWriter, is_conference_paper, is_journal_article, write_papers
 
 def load_json(json_file_path):
     """Loading json files"""
@@ -26,219 +21,172 @@ def load_json(json_file_path):
             print(f"Error loading JSON from {json_file_path}, starting with empty list")
 
 
-def create_paper_node(output,all_papers):
-    count = 0
+class PaperNodeWriter(PaperWriter):
+    columns = ["paperId", "url", "title", "abstract"]
+    writer_args = {'quoting': csv.QUOTE_ALL, 'escapechar': '\\'}
+    text_columns = columns # Cleaned like table_output.clean_field, a batch at a time
+
+    def __init__(self, output):
+        super().__init__(output)
+        self.author_count = 0 # For consistency check
+
+    def write_paper(self, paper):
+        self.write_row(paper['paperId'], paper['url'], paper['title'], paper['abstract'])
+        self.author_count += len(paper['authors'])
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "paperId", "url", "title", "abstract"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns, quoting=csv.QUOTE_ALL,
-                          escapechar='\\')
-        writer.writeheader()
-
-        author_count=0 # For consistency check
-        for paper in all_papers:
-            cleaned_paper = {
-                'paperId': clean_field(paper['paperId']),
-                'url': clean_field(paper['url']),
-                'title': clean_field(paper['title']),
-                'abstract': clean_field(paper['abstract'])
-            }
-
-            if paper is None:  # Skip None entries
-                continue
-            writer.writerow(cleaned_paper)
-            count += 1
-            author_count+=len(paper['authors'])
-
-        print(f'Added {count} papers to {output} with author count {author_count}')
+    def report(self):
+        return f'Added {self.count} papers to {self.output} with author count {self.author_count}'
+
+
+def create_paper_node(output,all_papers):
+    write_papers(all_papers, PaperNodeWriter(output))
 
 def create_keywords_node(output,keywords_file):
     count = 0
-    distinct_keywords = set() # Collecting only distinct keywords
+    distinct_keywords = {} # Collecting only distinct keywords, in order of first use
     for paper_id, keywords in keywords_file.items():
-        distinct_keywords.update(kw.strip().lower() for kw in keywords if kw.strip())
+        distinct_keywords.update(dict.fromkeys(kw.strip().lower() for kw in keywords if kw.strip()))
+
+    table = TableWriter(output, ["keywordId", "keyword"])
+    for keyword in distinct_keywords:
+        table.write((keyword_id(keyword), keyword))
+        count += 1
+    table.close()
+
+    print(f'Added {count} keywords to {output} from total {len(distinct_keywords)}')
 
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "keywordId", "keyword"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
+class JournalNodeWriter(PaperWriter):
+    columns = ["journalId", "name", "ISSN", "url"]
+    merge_key = ['journalId']
 
-        for keyword in distinct_keywords:
-            
-            writer.writerow({
-                'keywordId': str(uuid.uuid4()),
-                'keyword': keyword
-                })
-            count += 1
+    def __init__(self, output):
+        super().__init__(output)
+        self.unique_journal_ids = set() # Collecting only distinct journals
+
+    def write_paper(self, paper):
+        if is_journal_article(paper):
+            venue = paper.get('publicationVenue')
+            journal_id = venue.get('id')
+            # Check if the journal ID is already processed
+            if journal_id not in self.unique_journal_ids:
+                self.write_row(journal_id, venue.get('name',None), venue.get('issn', None), venue.get('url', None))
+                self.unique_journal_ids.add(journal_id)
+
+    def report(self):
+        return f'Added {self.count} journals to {self.output}'
 
-        print(f'Added {count} keywords to {output} from total {len(distinct_keywords)}')
 
 def create_journal_node(output, all_papers):
-    count = 0
-    unique_journal_ids = set() # Collecting only distinct journals
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "journalId", "name", "ISSN", "url"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-            if ('JournalArticle' in paper.get('publicationTypes', None)
-            and 'Conference' not in paper.get('publicationTypes', None) and paper.get('publicationVenue') is not None):
-                venue = paper.get('publicationVenue')
-                journal_id = venue.get('id')
-                # Check if the journal ID is already processed
-                if journal_id not in unique_journal_ids:
-                    writer.writerow({
-                        'journalId': journal_id,
-                        'name': venue.get('name',None),
-                        'ISSN': venue.get('issn', None),
-                        'url': venue.get('url', None)
-                    })
-                    unique_journal_ids.add(journal_id)
-                    count += 1
-
-        print(f'Added {count} journals to {output}')
-
-def create_volume_node(output, mapping, all_papers):
-    count = 0
-    unique_volumes = set() # Collecting only distinct volumes per journal
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "volumeId", "number", "year"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-        journal_to_volume_mapping = {}
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-
-            year=str(paper.get('year', None)).strip()
-            venue=paper.get('publicationVenue')
-            if ('JournalArticle' in paper.get('publicationTypes', None)
-            and 'Conference' not in paper.get('publicationTypes', None) and venue is not None ):
-                journal = paper.get('journal', None)
-                number=str(journal.get('volume',None)).strip()
-                journal_id = str(venue.get('id')).strip()
-                volume_key = (journal_id, year, number)
-                # print(f"Volume Key Created: {volume_key}")
-                if volume_key not in unique_volumes:
-                    volumeId=str(uuid.uuid4())
-                    writer.writerow({
-                        'volumeId': volumeId,
-                        'number': number,
-                        'year': year
-                    })
-                    journal_to_volume_mapping[volume_key] = volumeId
-                    unique_volumes.add(volume_key)
-                    count += 1
-
-        print(f'Added {count} volumes to {output}')
-
-    # Creating a mapping between volume and journal for future use in edge creation
-    with open(mapping, 'w', newline='') as mapcsv:
-        mapwriter = csv.writer(mapcsv)
-        mapwriter.writerow(['journalId', 'year', 'number', 'volumeId'])
-        for (journal_id, year, number), volume_id in journal_to_volume_mapping.items():
-            mapwriter.writerow([journal_id, year, number, volume_id])
+    write_papers(all_papers, JournalNodeWriter(output))
+
+
+def volume_key(paper):
+    """(journalId, year, volume number) of a journal article"""
+    journal = paper.get('journal', None) or {}
+    return (str(paper.get('publicationVenue').get('id')).strip(), str(paper.get('year', None)).strip(),
+            str(journal.get('volume',None)).strip())
+
+
+class VolumeNodeWriter(PaperWriter):
+    columns = ["volumeId", "number", "year"]
+    merge_key = ['volumeId']
+
+    def __init__(self, output):
+        super().__init__(output)
+        self.unique_volumes = set() # Collecting only distinct volumes per journal
+
+    def write_paper(self, paper):
+        if is_journal_article(paper):
+            key = volume_key(paper)
+            if key not in self.unique_volumes:
+                journal_id, year, number = key
+                self.unique_volumes.add(key)
+                self.write_row(volume_id(*key), number, year)
+
+    def report(self):
+        return f'Added {self.count} volumes to {self.output}'
+
+
+def create_volume_node(output, all_papers):
+    write_papers(all_papers, VolumeNodeWriter(output))
+
+
+class EventNodeWriter(PaperWriter):
+    columns = ["eventId", "name", "ISSN", "url", "type"]
+    merge_key = ['eventId']
+
+    def __init__(self, output):
+        super().__init__(output)
+        self.unique_conf_ids = set() # Collecting only distinct events
+
+    def write_paper(self, paper):
+        if is_conference_paper(paper):
+            venue = paper.get('publicationVenue', None)
+
+            conf_id = venue.get('id')
+            conf_name = venue.get('name')
+            if conf_id not in self.unique_conf_ids:
+
+                self.unique_conf_ids.add(conf_id)
+                self.write_row(conf_id, conf_name, venue.get('issn', None), venue.get('url', None),
+                               'Workshop' if 'workshop' in conf_name.lower() else 'Conference')
+
+    def report(self):
+        return f'Added {self.count} conferences to {self.output}'
+
 
 def create_event_node(output,all_papers):
-    count = 0
-    unique_conf_ids = set() # Collecting only distinct events
-    with open(output, 'w', newline='') as csvfile:
-        columns = [
-                "eventId", "name", "ISSN", "url", "type"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-
-        for paper in all_papers:
-            
-            if paper is None:  # Skip None entries
-                continue
-            if 'Conference' in paper.get('publicationTypes', None) and paper.get('publicationVenue') is not None :
-                venue = paper.get('publicationVenue', None)
-                
-                conf_id = venue.get('id')
-                conf_name = venue.get('name')
-                if conf_id not in unique_conf_ids:
-
-                    unique_conf_ids.add(conf_id)
-                    writer.writerow({
-                        'eventId': conf_id,
-                        'name': conf_name,
-                        'ISSN': venue.get('issn', None),
-                        'url': venue.get('url', None),
-                        'type': 'Workshop' if 'workshop' in conf_name.lower() else 'Conference'
-                    })
-                    count += 1
-
-        print(f'Added {count} conferences to {output}')
-
-def create_edition_node(output, merged, ed_info):
-    distinct_editions = ed_info[['edition', 'location', 'year', 'venue_id']].drop_duplicates()
-    distinct_editions['editionId'] = [str(uuid.uuid4()) for _ in range(len(distinct_editions))]
-    ed_info = pd.merge(ed_info, distinct_editions, on=['edition', 'location', 'year','venue_id'], how='left')
-
-    # Creating a mapping between edition and event for future use in edge creation
-    ed_info.to_csv(merged, index=False)
+    write_papers(all_papers, EventNodeWriter(output))
+
+def add_edition_ids(ed_info):
+    """paper_proceedings_location rows with the editionId of their (venue, edition, location, year)"""
+    ed_info = ed_info.copy()
+    ed_info['editionId'] = [edition_id(*key) for key in
+                            zip(ed_info['venue_id'], ed_info['edition'], ed_info['location'], ed_info['year'])]
+    return ed_info
+
+def create_edition_node(output, ed_info):
+    distinct_editions = add_edition_ids(ed_info).drop_duplicates(subset=['edition', 'location', 'year', 'venue_id'])
 
     # Creating a csv for edition node
-    distinct_editions.drop('venue_id', axis=1, inplace=True)
     distinct_editions = distinct_editions[['editionId', 'edition', 'location', 'year']]
-    distinct_editions.to_csv(output, index=False)
+    write_frame(distinct_editions, output)
     print(f'Added {len(distinct_editions)} editions to {output}')
 
+class AuthorNodeWriter(PaperWriter):
+    columns = ["authorId", "name"]
+    merge_key = ['authorId']
+
+    def __init__(self, output):
+        super().__init__(output)
+        self.unique_author_ids = set() # Collecting only distinct authors
+
+    def write_paper(self, paper):
+        for author in paper.get('authors', None):
+            author_id = author.get('authorId', None)
+            # Check if the author ID is already processed
+            if author_id not in self.unique_author_ids and author_id is not None:
+                self.write_row(author_id, author.get('name', None))
+                self.unique_author_ids.add(author_id)
+
+    def report(self):
+        return f'Added {self.count} authors to {self.output}'
+
+
 def create_author_node(output,all_papers):
-    count = 0
-    unique_author_ids = set() # Collecting only distinct authors
-
-    with open(output, 'w', newline='') as csvfile: 
-        columns = [
-                "authorId", "name"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns)
-        writer.writeheader()
-
-        for paper in all_papers:
-            if paper is None:  # Skip None entries
-                continue
-            authors = paper.get('authors', None)
-            for author in authors:
-                author_id = author.get('authorId', None)
-                # Check if the author ID is already processed
-                if author_id not in unique_author_ids and author_id is not None:
-                    writer.writerow({
-                        'authorId': author_id,
-                        'name': author.get('name', None)
-                    })
-                    unique_author_ids.add(author_id)
-                    count += 1
-
-        print(f'Added {count} authors to {output}')
+    write_papers(all_papers, AuthorNodeWriter(output))
 
 def create_nodes(data_path,output_path):
+    check_output_formats()
     ed_data = pd.read_csv(os.path.join(data_path, 'paper_proceedings_location_new.csv'))
-    all_papers=load_json(os.path.join(data_path, 'combined_papers_data.json'))
+    all_papers=load_records(os.path.join(data_path, 'combined_papers_data.json'))
     keywords_file=load_json(os.path.join(data_path, 'paper_keywords.json'))
-    print(type(all_papers))
-    print(len(all_papers))
     
     create_paper_node(os.path.join(output_path, 'paper.csv'), all_papers)
     create_keywords_node(os.path.join(output_path, 'keyword.csv'), keywords_file)
-    create_edition_node(os.path.join(output_path, 'edition.csv'), os.path.join(output_path, 'ed_conf_merged.csv'), ed_data)
+    create_edition_node(os.path.join(output_path, 'edition.csv'), ed_data)
     create_event_node(os.path.join(output_path,'event.csv'), all_papers)
-    create_volume_node(os.path.join(output_path,'volume.csv'), os.path.join(output_path, 'vol_journal_map.csv'), all_papers)
+    create_volume_node(os.path.join(output_path,'volume.csv'), all_papers)
     create_journal_node(os.path.join(output_path,'journal.csv'), all_papers)
     create_author_node(os.path.join(output_path,'author.csv'), all_papers)
 
@@ -1,11 +1,15 @@
 import json
 import os
+import numpy as np
 import pandas as pd 
-import random
-from faker import Faker
-from datetime import datetime
-import re
+import time
 import uuid
+from helper.storage import load_records, read_records, existing_records_path, iter_batches
+from helper.reviewer_index import build_reviewer_index
+from helper.keyword_matcher import KeywordMatcher
+from helper.tfidf_keywords import extract_tfidf_keywords
+from helper.venue_parser import VenueTable
+from helper.generation import entity_seed, entity_random, entity_faker, map_shards
 
 json_dir = './paper_data'
 
@@ -18,15 +22,6 @@ domain = {
     "Mathematics":["curves","probability","Harmonic","hyperbolic"]
 }
 
-ORDINAL_WORDS = {
-    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5, 'sixth': 6,
-    'seventh': 7, 'eighth': 8, 'ninth': 9, 'tenth': 10, 'eleventh': 11,
-    'twelfth': 12, 'thirteenth': 13, 'fourteenth': 14, 'fifteenth': 15,
-    'sixteenth': 16, 'seventeenth': 17, 'eighteenth': 18, 'nineteenth': 19,
-    'twentieth': 20, 'twentyfirst': 21, 'twentysecond': 22, 'twentythird': 23,
-    'twentyfourth': 24, 'twentyfifth': 25, 'twentysixth': 26, 'twentyseventh': 27,
-    'twentyeighth': 28, 'twentyninth': 29, 'thirtieth': 30
-}
 
 peer_reviews = [
     "The study addresses an important gap, but the small sample size limits generalizability. Recommend major revisions.",
@@ -42,81 +37,57 @@ peer_reviews = [
 ]
 review_decisions = ['accepted', 'rejected']
 
-fake = Faker()
-
-def assign_reviewer_research_paper(paper_lst,h_index_threshold = 5):
-    
-
-    ## Create the domain of the authors 
-    domain_author = {}
+# Match the domain words in titles only as whole words (False keeps substring matching, e.g. "indexing" in "reindexing")
+keyword_word_boundary = False
 
-    for paper in paper_lst:
-        if paper['fieldsOfStudy'] != None:
-            for domain in paper['fieldsOfStudy']:
-                for author in paper['authors']:
-                    if domain not in domain_author.keys():
-                        domain_author[domain] = [author['authorId']]
-                    else:
-                        domain_author[domain].append(author['authorId'])
+def assign_reviewer_research_paper(paper_lst,h_index_threshold = 5, max_reviews_per_reviewer = 10):
 
-    print("Author Domain Created")
     ## Load Author
 
-    with open(f'./paper_data/authors_details_new.json','r') as f:
-        author_details = json.load(f)
-
-    print("Author Details Loaded")
-
-    h_index_lst = []
-
-    for author in author_details:
-        if author['hIndex'] != None:
-            h_index_lst.append(author['hIndex'])
-    df = pd.DataFrame(h_index_lst,columns=['h_index'])
+    author_details = read_records(existing_records_path('./paper_data/authors_details_new.json'))
 
     author_h_index = {}
+    author_affiliations = {}
 
     for author in author_details:
         if author['hIndex'] != None:
             author_h_index[author['authorId']] = author['hIndex']
         else:
             author_h_index[author['authorId']] = 0
+        author_affiliations[author['authorId']] = author.get('affiliations') or []
 
+    ## Create the domain of the authors, only the authors above the h-index threshold are indexed
+    ## Co-authors and authors sharing an affiliation with the paper authors are excluded as reviewers
+    reviewer_index = build_reviewer_index(paper_lst, author_h_index, h_index_threshold, author_affiliations,
+                                          seed=entity_seed('reviewer_assignment'))
+
+    print("Author Domain Created")
 
     paper_reviewers = {}
     paper_with_no_reviewers = []
+    start = time.perf_counter()
 
     for paper in paper_lst:
 
         paper_author = set([author['authorId'] for author in paper['authors']])
 
-        
         if paper['fieldsOfStudy'] != None:
-            selected_author = []
-            for domain in paper['fieldsOfStudy'] :
-                selected_author.extend(domain_author[domain])
-            
-            selected_author = list(set(selected_author))
-
-            selected_author = set([ids for ids in selected_author if ids != None and ids in author_h_index.keys() and author_h_index[ids]>=h_index_threshold])
-
-            choosen_authors = list(selected_author.difference(paper_author))
-
 
-            if len(choosen_authors)>=3:
+            num_ids = entity_random('num_reviewers', paper['paperId']).choice([2,3])
+            # Least loaded candidates first, papers with fewer candidates than num_ids get all of them
+            choosen_authors = reviewer_index.assign(paper['fieldsOfStudy'], paper_author, num_ids, max_reviews_per_reviewer)
 
-                num_ids = random.choice([2,3])
-                selected_ids = random.sample(choosen_authors,num_ids)
-
-                paper_reviewers[paper['paperId']] = selected_ids
-        
-            elif len(choosen_authors)>0:
-                paper_reviewers[paper['paperId']] = selected_ids
+            if len(choosen_authors)>0:
+                paper_reviewers[paper['paperId']] = choosen_authors
             else:
                 paper_with_no_reviewers.append(paper['paperId'])
         else:
             paper_with_no_reviewers.append(paper['paperId'])
 
+    print(f"Reviewers assigned to {len(paper_reviewers)} papers in {time.perf_counter() - start:.2f}s, "
+          f"{len(paper_with_no_reviewers)} papers without reviewers")
+    print(f"Reviewer load: {reviewer_index.load_report(max_reviews_per_reviewer)}")
+
     with open("./paper_data/paper_reviewers.json","w") as f:
         json.dump(paper_reviewers, f)
 
@@ -126,9 +97,7 @@ def assign_reviewer_research_paper(paper_lst,h_index_threshold = 5):
 
 def assign_keywords_research_paper(paper_lst):
 
-    alex_info_lst=[]
-    with open(f'./paper_data/alex_info.json','r') as f:
-        alex_info_lst = json.load(f)
+    alex_info_lst = read_records(existing_records_path('./paper_data/alex_info.json'))
 
     alex_info_dict = {}
 
@@ -138,19 +107,33 @@ def assign_keywords_research_paper(paper_lst):
             alex_info_dict[paper['paperId']] =  [x['display_name'] for x in paper['keywords'] if x['display_name']!='Plain Text']
 
     
+    ## Domain words are matched in the titles by one matcher built over the whole vocabulary
+    keyword_matcher = KeywordMatcher((word for words in domain.values() for word in words), keyword_word_boundary)
+    # Position and original case of every domain word, per field
+    field_words = {field: {word.lower(): (position, word) for position, word in enumerate(words)}
+                   for field, words in domain.items()}
+
     paper_keywords = {}
 
-    for paper in paper_lst:
-        initial_keywords = {kw.lower(): kw for kw in alex_info_dict.get(paper['paperId'], [])}
-        
-        if paper['fieldsOfStudy'] is not None:
-            for field in paper['fieldsOfStudy']:
-                if field in domain:
-                    for word in domain[field]:
-                        if word.lower() in paper['title'].lower():
-                            initial_keywords[word.lower()] = word  # Overwrites with last seen case
-        
-        paper_keywords[paper['paperId']] = list(initial_keywords.values())
+    for batch in iter_batches(paper_lst, 10000):
+        matches = keyword_matcher.find_many([paper['title'] or '' for paper in batch])
+
+        for paper, matched in zip(batch, matches):
+            initial_keywords = {kw.lower(): kw for kw in alex_info_dict.get(paper['paperId'], [])}
+
+            if paper['fieldsOfStudy'] is not None and matched:
+                fields = [field for field in paper['fieldsOfStudy'] if field in domain]
+                hits = {}
+                for keyword in (keyword_matcher.keywords[i] for i in matched):
+                    in_fields = [(field_idx, field_words[field][keyword][0], field_words[field][keyword][1])
+                                 for field_idx, field in enumerate(fields) if keyword in field_words[field]]
+                    if in_fields:
+                        # Ordered like the fields and domain words, with the case of the last field listing the word
+                        hits[keyword] = (min(in_fields)[:2], in_fields[-1][2])
+                for keyword, (_, word) in sorted(hits.items(), key=lambda hit: hit[1][0]):
+                    initial_keywords[keyword] = word
+
+            paper_keywords[paper['paperId']] = list(initial_keywords.values())
 
     
 
@@ -159,7 +142,8 @@ def assign_keywords_research_paper(paper_lst):
 
     print("Keywords Assigned Successfully!!!")
 
-def generate_venue():
+def generate_venue(*keys):
+    fake = entity_faker('venue', *keys)
     city = fake.city()
     country = fake.country()
     institution = fake.random_element(elements=(
@@ -173,117 +157,36 @@ def generate_venue():
         "institution": institution
     }
 
-def extract_edition(conference_name):
-    pattern = re.compile(
-        r"""
-        (\b\d{4}\b)|                        # 4-digit year (group 1)
-        (\d+)(?:st|nd|rd|th)\b|             # Numeric ordinal (group 2)
-        Edition\s+(\d+)|                    # Explicit "Edition X" (group 3)
-        ['’](\d{2})\b|                      # Apostrophe year (group 4)
-        \b(First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth|
-        Eleventh|Twelfth|Thirteenth|Fourteenth|Fifteenth|Sixteenth|Seventeenth|
-        Eighteenth|Nineteenth|Twentieth|Twenty[- ]?First|Twenty[- ]?Second|
-        Twenty[- ]?Third|Twenty[- ]?Fourth|Twenty[- ]?Fifth|Twenty[- ]?Sixth|
-        Twenty[- ]?Seventh|Twenty[- ]?Eighth|Twenty[- ]?Ninth|Thirtieth)\b
-        """,
-        re.IGNORECASE | re.X
-    )
-
-    editions = []
-    for match in pattern.finditer(conference_name):
-        year_4d = match.group(1)
-        numeric_ordinal = match.group(2)
-        edition_x = match.group(3)
-        apostrophe_year = match.group(4)
-        textual_ordinal = match.group(5)
-
-        if year_4d:
-            editions.append(('year', int(year_4d)))
-        elif numeric_ordinal:
-            editions.append(('ordinal', int(numeric_ordinal)))
-        elif edition_x:
-            editions.append(('edition_x', int(edition_x)))
-        elif apostrophe_year:
-            year = int(apostrophe_year)
-            current_year = datetime.now().year
-            full_year = 2000 + year if year < (current_year - 2000 + 1) else 1900 + year
-            editions.append(('apostrophe_year', full_year))
-        elif textual_ordinal:
-            key = textual_ordinal.lower().replace('-', '').replace(' ', '')
-            editions.append(('textual_ordinal', ORDINAL_WORDS.get(key, None)))
-
-    # Priority order: edition_x > textual_ordinal > ordinal > apostrophe_year > year
-    priority_order = ['edition_x', 'textual_ordinal', 'ordinal', 'apostrophe_year', 'year']
-    for category in priority_order:
-        for ed_type, value in editions:
-            if ed_type == category and value is not None:
-                return value
-    return None
-
-def clean_conference_name(conference_name):
-    # Remove edition-related terms to get the base name
-    pattern = re.compile(
-        r"""
-        \b\d{4}\b|                        # 4-digit year
-        \d+(?:st|nd|rd|th)\b|             # Numeric ordinal
-        Edition\s+\d+|                    # Explicit "Edition X"
-        ['’]\d{2}\b|                      # Apostrophe year
-        \b(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth|
-        Eleventh|Twelfth|Thirteenth|Fourteenth|Fifteenth|Sixteenth|Seventeenth|
-        Eighteenth|Nineteenth|Twentieth|Twenty[- ]?First|Twenty[- ]?Second|
-        Twenty[- ]?Third|Twenty[- ]?Fourth|Twenty[- ]?Fifth|Twenty[- ]?Sixth|
-        Twenty[- ]?Seventh|Twenty[- ]?Eighth|Twenty[- ]?Ninth|Thirtieth)\b
-        """,
-        re.IGNORECASE | re.X
-    )
-    cleaned = pattern.sub('', conference_name)
-    # Clean up extra spaces and punctuation
-    cleaned = re.sub(r'\s{2,}', ' ', cleaned)  # Replace multiple spaces
-    cleaned = re.sub(r'[ ,\-]+$', '', cleaned)  # Remove trailing punctuation
-    cleaned = re.sub(r'^[ ,\-]+', '', cleaned)  # Remove leading punctuation
-    return cleaned.strip()
-
-
 def assign_proceedings_venues(paper_lst):
 
-    conference_articles = []
+    ## Only the columns used below are collected from the conference papers
+    columns = {'paperId': [], 'title': [], 'publicationDate': [], 'year': [], 'venue': [], 'venue_id': [], 'pages': []}
 
     for paper in paper_lst:
         
         if paper['publicationTypes'] != None and  "Conference" in paper['publicationTypes']: 
-            conference_articles.append(paper)
-
-    conference_df = pd.DataFrame(conference_articles)
-    sub_df = conference_df[['paperId','title','publicationDate','year','venue']]
-    sub_df['venue_id'] = conference_df['publicationVenue'].apply(lambda x: x.get('id', None) if x else None)
-    sub_df['pages'] = conference_df['journal'].apply(lambda x: x.get('pages', None) if x else None)
-    sub_df['proceedings'] = sub_df['venue'].apply(extract_edition)
-    sub_df['new_conference_name'] = sub_df['venue'].apply(clean_conference_name)
-    df1 = sub_df[~sub_df['proceedings'].isnull()]
-    df1 = df1.reset_index(drop=True)
-    df2 = sub_df[sub_df['proceedings'].isnull()]
-    df2 = df2.reset_index(drop=True)
-    grouped = df1.groupby(by=['new_conference_name','proceedings'])
-
-    for g in grouped.groups:
-        index = list(grouped.groups[g])
-        df1.loc[index,'location'] = fake.city()
-
-    grouped = df2.groupby(by=['year','new_conference_name'])
-
-    conf_count = {}
-
-    for g in grouped.groups:
-        index = list(grouped.groups[g])
-        
-        df2.loc[index,'location'] = fake.city()
-        
-        if g[1] in conf_count.keys():
-            conf_count[g[1]] += 1
-            df2.loc[index,'proceedings'] = conf_count[g[1]]
-        else:
-            conf_count[g[1]] = 3
-            df2.loc[index,'proceedings'] = 3
+            for column in ['paperId', 'title', 'publicationDate', 'year', 'venue']:
+                columns[column].append(paper[column])
+            columns['venue_id'].append(paper['publicationVenue'].get('id', None) if paper['publicationVenue'] else None)
+            columns['pages'].append(paper['journal'].get('pages', None) if paper['journal'] else None)
+
+    sub_df = pd.DataFrame(columns)
+    # Venue names repeat a lot, every distinct name is parsed once and kept in the venue table
+    venue_table = VenueTable()
+    sub_df['proceedings'] = sub_df['venue'].map(venue_table.edition)
+    sub_df['new_conference_name'] = sub_df['venue'].map(venue_table.base_name)
+    venue_table.save()
+    df1 = sub_df[~sub_df['proceedings'].isnull()].reset_index(drop=True)
+    df2 = sub_df[sub_df['proceedings'].isnull()].reset_index(drop=True)
+
+    ## Papers with an edition in the venue name: one location per (conference, edition)
+    df1['location'] = group_cities(df1, ['new_conference_name','proceedings'])
+
+    ## Papers without an edition: one location per (year, conference), the editions of a conference
+    ## are numbered from 3 in the order of the years (papers without a year come last)
+    year_groups = group_codes(df2, ['year','new_conference_name'])
+    df2['location'] = group_cities(df2, ['year','new_conference_name'])
+    df2['proceedings'] = pd.Series(year_groups, index=df2.index).groupby(df2['new_conference_name']).rank(method='dense') + 2
 
     final_df = pd.concat([df1,df2])
     final_df = final_df.reset_index(drop=True)
@@ -298,23 +201,49 @@ def assign_proceedings_venues(paper_lst):
     print("Venues and Proceeding created successfully!!!")
 
 
-def reviewers_metadata():
+def group_codes(df, keys):
+    """Group number of every row, groups numbered in sorted order of the keys (missing keys last)"""
+    return df.groupby(by=keys, dropna=False).ngroup().to_numpy()
 
-    with open("./paper_data/paper_reviewers.json",'r') as f:
-        paper_reviewers = json.load(f)
 
-    paper_reviewer_metadata = {}
+def group_cities(df, keys):
+    """One random city per group of keys, broadcast to the rows of the group. The city of a group
+    only depends on its keys, the cities are generated in a process pool for large inputs"""
+    group_idx = group_codes(df, keys)
+    group_keys = df[keys].assign(group=group_idx).drop_duplicates('group').sort_values('group')
+    cities = map_shards(cities_of_groups, list(group_keys[keys].itertuples(index=False, name=None)))
+    return np.array(cities, dtype=object)[group_idx]
 
-    for paper_id, author_ids in paper_reviewers.items():
-        num_reviewers = len(author_ids)
+
+def cities_of_groups(group_keys):
+    return [entity_faker('location', *keys).city() for keys in group_keys]
+
+
+def reviews_of_papers(paper_reviewers):
+    """Comments and votes of the reviewers of [(paperId, reviewer authorIds)], seeded per review"""
+    reviews = []
+    for paper_id, author_ids in paper_reviewers:
+        paper_reviews = {}
         for i, author_id in enumerate(author_ids, 1):
-            if paper_id not in paper_reviewer_metadata:
-                paper_reviewer_metadata[paper_id] = {}
-            paper_reviewer_metadata[paper_id][f"reviewer_{i}"] = {
+            rng = entity_random('review', paper_id, author_id)
+            paper_reviews[f"reviewer_{i}"] = {
                 "authorId": author_id,
-                "comments": random.choice(peer_reviews),
-                "vote": random.choices(review_decisions, weights=[0.8, 0.2])[0],  # 80% accept, 20% reject
+                "comments": rng.choice(peer_reviews),
+                "vote": rng.choices(review_decisions, weights=[0.8, 0.2])[0],  # 80% accept, 20% reject
             }
+        reviews.append((paper_id, paper_reviews))
+    return reviews
+
+
+def reviewers_metadata():
+
+    with open("./paper_data/paper_reviewers.json",'r') as f:
+        paper_reviewers = json.load(f)
+
+    ## Reviews are generated in shards over a process pool, every review has its own seed
+    paper_reviewer_metadata = {paper_id: paper_reviews
+                               for paper_id, paper_reviews in map_shards(reviews_of_papers, paper_reviewers.items())
+                               if paper_reviews}
 
     with open("./paper_data/paper_reviewers_metadata.json",'w') as f:
         json.dump(paper_reviewer_metadata,f)
@@ -324,19 +253,14 @@ def reviewers_metadata():
 
 def preprocessing():
 
-    ## Load Papers
-    paper_lst = []
-    paths = ['paper_data/combined_papers_data.json']
-    for path in paths:
-        with open(f'./{path}','r') as f:
-            data = json.load(f)
-
-        paper_lst.extend(data)
+    ## Load Papers, streamed from disk by every stage that iterates them
+    paper_lst = load_records('./paper_data/combined_papers_data.json')
     
     print("Paper Loaded Successfully") 
 
     assign_reviewer_research_paper(paper_lst)
     assign_keywords_research_paper(paper_lst)
+    extract_tfidf_keywords(paper_lst)
     assign_proceedings_venues(paper_lst)
     reviewers_metadata()
 
@@ -3,7 +3,11 @@ import argparse
 import csv
 import os
 import json
-import uuid
+from collections import Counter
+from helper.storage import load_records
+from helper.affiliation_resolution import resolve_affiliations
+from helper.node_ids import affiliation_id
+from helper.table_output import TableWriter, check_output_formats
 
 def load_json(json_file_path):
     """Loading json files"""
@@ -18,25 +22,18 @@ def load_json(json_file_path):
 
 def create_reviews(output_edge, paper_reviews):
     count_edge=0
-    with open(output_edge, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-        writer.writerow(['authorId','paperId','comments', 'vote'])
-        
-        for paper_id, reviewers in paper_reviews.items():
-            for reviewer_key, data in reviewers.items():
-                writer.writerow([
-                    data['authorId'],
-                    paper_id,
-                    data['comments'],
-                    data['vote']
-                ])
-                count_edge+=1
+    table = TableWriter(output_edge, ['authorId','paperId','comments', 'vote'], quoting=csv.QUOTE_ALL)
+    for paper_id, reviewers in paper_reviews.items():
+        for reviewer_key, data in reviewers.items():
+            table.write((data['authorId'], paper_id, data['comments'], data['vote']))
+            count_edge+=1
+    table.close()
     print(f"Added {count_edge} to {output_edge}")
 
 def create_affiliation(output_node, output_edge, author_details):
 
     
-    unique_affiliations = set()
+    raw_counts = Counter() # Number of authors of every raw affiliation string
     author_affiliation_pairs = set() # Collecting distinct author-affiliation pairs for edge creation
     for author in author_details:
         if author is None:  # Skip None entries
@@ -45,12 +42,17 @@ def create_affiliation(output_node, output_edge, author_details):
         affiliations=author.get('affiliations', [])
         for affiliation in affiliations:
             if affiliation:
-                unique_affiliations.add(str(affiliation).strip())  # Remove whitespace and add to set
+                raw_counts[str(affiliation).strip()] += 1  # Remove whitespace and count
                 author_affiliation_pairs.add(
                     (author['authorId'], str(affiliation).strip()))
 
-    affiliation_nodes = [{'affId': str(uuid.uuid4()), 'name': aff} for aff in unique_affiliations]
+    ## Spelling variants of the same institution are merged into one affiliation
+    canonical_name = resolve_affiliations(raw_counts)
+    unique_affiliations = sorted(set(canonical_name.values()))
+
+    affiliation_nodes = [{'affId': affiliation_id(aff), 'name': aff} for aff in unique_affiliations]
     affiliation_uuid_map = {aff['name']: aff['affId'] for aff in affiliation_nodes}
+    author_affiliation_pairs = {(author_id, canonical_name[aff_name]) for author_id, aff_name in author_affiliation_pairs}
 
     missing_affiliations = set()
     for author_id, aff_name in author_affiliation_pairs:
@@ -60,28 +62,21 @@ def create_affiliation(output_node, output_edge, author_details):
     if missing_affiliations:
         print("Missing affiliations in UUID map:", missing_affiliations)
 
-    with open(output_node, 'w', newline='') as csvfile:
-        columns = [
-                "affId", "name"
-            ]
-        writer = csv.DictWriter(csvfile, fieldnames=columns, quoting=csv.QUOTE_NONNUMERIC)
-        writer.writeheader()
-        writer.writerows(affiliation_nodes)
+    table = TableWriter(output_node, ["affId", "name"], quoting=csv.QUOTE_NONNUMERIC)
+    table.write_rows((aff['affId'], aff['name']) for aff in affiliation_nodes)
+    table.close()
     print(f"Added {len(affiliation_nodes)} to {output_node}")
 
-    with open(output_edge, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=['authorId', 'affId'], quoting=csv.QUOTE_NONNUMERIC)
-        writer.writeheader()
-        for author_id, aff_name in author_affiliation_pairs:
-            writer.writerow({
-                'authorId': author_id,
-                'affId': affiliation_uuid_map[aff_name]
-            })
+    table = TableWriter(output_edge, ['authorId', 'affId'], quoting=csv.QUOTE_NONNUMERIC)
+    # Sorted, the order of the set changes from run to run
+    table.write_rows((author_id, affiliation_uuid_map[aff_name]) for author_id, aff_name in sorted(author_affiliation_pairs))
+    table.close()
     print(f"Added {len(author_affiliation_pairs)} to {output_edge}")
 
 
 def create_add_data(data_path,output_path) :
-    author_details = load_json(os.path.join(data_path, 'authors_details_new.json'))
+    check_output_formats()
+    author_details = load_records(os.path.join(data_path, 'authors_details_new.json'))
     paper_reviews = load_json(os.path.join(data_path, 'paper_reviewers_metadata.json'))
     
     create_affiliation(os.path.join(output_path,'affiliation.csv'), os.path.join(output_path, 'author_affiliatedWith_affiliation.csv'), author_details)
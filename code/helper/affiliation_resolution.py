@@ -0,0 +1,165 @@
+import re
+import time
+import unicodedata
+from collections import Counter
+from itertools import combinations
+
+### Entity resolution of the author affiliation strings
+### 1. raw names are normalized (case, accents, punctuation, abbreviations, department segments, stop words,
+###    word order) into the institution tokens and the location tokens (campus or city segment following the
+###    institution, e.g. "University of California, Berkeley"), names with the same normalized form are merged
+### 2. the distinct normalized names are blocked on their rarest tokens, only names sharing a block are compared,
+###    so the number of comparisons grows with the number of names and not with its square
+### 3. pairs whose token sets are similar enough are merged with a union-find, unless both clusters have a location
+###    and the locations share no token (different campuses of one university are different affiliations).
+###    A name without a location ("University of X") joins a located cluster only if it is the only one matching,
+###    so it never links two campuses. Every cluster gets the most frequent raw spelling as its canonical name
+
+similarity_threshold = 0.75      # Jaccard similarity of the token sets to merge two names
+block_tokens = 2                 # rarest tokens of a name used as its block keys
+max_block_size = 1000            # larger blocks come from frequent tokens and are not compared
+
+abbreviations = {
+    'univ': 'university', 'uni': 'university', 'universitat': 'university', 'universite': 'university',
+    'universidad': 'university', 'universita': 'university', 'inst': 'institute', 'institut': 'institute',
+    'tech': 'technology', 'technol': 'technology', 'natl': 'national', 'nat': 'national', 'ctr': 'center',
+    'centre': 'center', 'lab': 'laboratory', 'labs': 'laboratory', 'hosp': 'hospital', 'coll': 'college',
+    'acad': 'academy', 'sci': 'science', 'sciences': 'science', 'intl': 'international', 'res': 'research',
+}
+stop_words = {'of', 'the', 'and', 'at', 'for', 'in', 'de', 'la', 'du', 'di', 'der', 'und', 'a'}
+institution_words = {'university', 'institute', 'college', 'center', 'laboratory', 'hospital', 'academy',
+                     'school', 'company', 'corporation', 'inc', 'ltd', 'gmbh', 'foundation', 'council'}
+department_words = {'department', 'dept', 'faculty', 'division', 'group', 'chair'}
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+
+def name_tokens(segment):
+    tokens = []
+    for token in NON_ALPHANUMERIC.split(segment):
+        token = abbreviations.get(token, token)
+        if token and token not in stop_words:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_affiliation(name):
+    """Normalized form of an affiliation: sorted distinct tokens of its institution part, followed by
+    ' | ' and the sorted tokens of its location (the segment after the institution) when it has one"""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode().lower()
+    segments = [name_tokens(segment) for segment in name.split(',')]
+    segments = [tokens for tokens in segments if tokens]
+    if not segments:
+        return ''
+    # "Dept. of Computer Science, University of X, City, Country": keep the institution and the city segments
+    kept = [tokens for tokens in segments if not department_words.intersection(tokens)] or segments[:1]
+    institution = next((i for i, tokens in enumerate(kept) if institution_words.intersection(tokens)), 0)
+    normalized = ' '.join(sorted(set(kept[institution])))
+    if institution + 1 < len(kept):
+        normalized += ' | ' + ' '.join(sorted(set(kept[institution + 1])))
+    return normalized
+
+
+def name_key(normalized):
+    """(institution tokens, location tokens) of a normalized name"""
+    institution, _, location = normalized.partition(' | ')
+    return frozenset(institution.split()), frozenset(location.split())
+
+
+class UnionFind:
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def resolve_affiliations(raw_counts):
+    """{raw name: count} -> {raw name: canonical name}, printing the blocking statistics"""
+    start = time.perf_counter()
+
+    ## Normalized names
+    normalized_of = {raw: normalize_affiliation(raw) for raw in raw_counts}
+    names = sorted(set(normalized_of.values()) - {''})
+    name_idx = {name: i for i, name in enumerate(names)}
+    institutions, locations = zip(*map(name_key, names)) if names else ((), ())
+    token_sets = [institution | location for institution, location in zip(institutions, locations)]
+
+    ## Blocks on the rarest institution tokens of every name
+    token_df = Counter(token for tokens in institutions for token in tokens)
+    blocks = {}
+    for i, tokens in enumerate(institutions):
+        for token in sorted(tokens, key=lambda token: (token_df[token], token))[:block_tokens]:
+            blocks.setdefault(token, []).append(i)
+
+    clusters = UnionFind(len(names))
+    cluster_locations = list(locations)      # root -> location tokens of the names in the cluster
+
+    def merge(i, j):
+        root_i, root_j = clusters.find(i), clusters.find(j)
+        location_i, location_j = cluster_locations[root_i], cluster_locations[root_j]
+        if root_i != root_j and (not location_i or not location_j or location_i & location_j):
+            clusters.union(root_i, root_j)
+            cluster_locations[clusters.find(root_i)] = location_i | location_j
+
+    ## Pairwise comparison inside the blocks
+    located_matches = {}                     # name without location -> similar names with a location
+    comparisons = 0
+    skipped_blocks = 0
+    for members in blocks.values():
+        if len(members) > max_block_size:
+            skipped_blocks += 1
+            continue
+        # Names sharing two block keys are compared twice, cheaper than remembering the compared pairs
+        for i, j in combinations(members, 2):
+            comparisons += 1
+            if bool(locations[i]) == bool(locations[j]):
+                if jaccard(token_sets[i], token_sets[j]) >= similarity_threshold:
+                    merge(i, j)
+            elif max(jaccard(token_sets[i], token_sets[j]), jaccard(institutions[i], institutions[j])) >= similarity_threshold:
+                bare, located = (j, i) if locations[i] else (i, j)
+                located_matches.setdefault(bare, set()).add(located)
+
+    ## Clusters without a location join the located cluster they match, unless they match several campuses
+    bare_matches = {}
+    for bare, located in located_matches.items():
+        bare_matches.setdefault(clusters.find(bare), set()).update(located)
+    for root, located in sorted(bare_matches.items()):
+        located_roots = {clusters.find(j) for j in located}
+        if len(located_roots) == 1:
+            merge(root, located_roots.pop())
+
+    ## Canonical name of every cluster: its most frequent raw spelling
+    cluster_counts = {}
+    for raw, count in raw_counts.items():
+        name = normalized_of[raw]
+        key = clusters.find(name_idx[name]) if name else raw
+        cluster_counts.setdefault(key, Counter())[raw] += count
+    canonical = {key: max(counts.items(), key=lambda item: (item[1], item[0]))[0]
+                 for key, counts in cluster_counts.items()}
+    resolved = {raw: canonical[clusters.find(name_idx[normalized_of[raw]]) if normalized_of[raw] else raw]
+                for raw in raw_counts}
+
+    block_sizes = sorted(len(members) for members in blocks.values())
+    print(f"Affiliation resolution: {len(raw_counts)} raw names, {len(names)} normalized, "
+          f"{len(canonical)} affiliations after merging ({time.perf_counter() - start:.1f}s)")
+    if block_sizes:
+        print(f"Affiliation blocks: {len(block_sizes)} blocks, size mean {sum(block_sizes) / len(block_sizes):.1f} / "
+              f"median {block_sizes[len(block_sizes) // 2]} / max {block_sizes[-1]}, "
+              f"{skipped_blocks} blocks above {max_block_size} skipped, {comparisons} comparisons")
+    return resolved
@@ -8,4 +8,5 @@ def create_parser():
     parser.add_argument('--db', type=str, default="neo4j", help="Database name for Neo4j connection (default: neo4j)")
     parser.add_argument('--data_path',type=str, default="./paper_data/",help="Path for where fetched data is stored")
     parser.add_argument('--output_path',type=str, default="./paper_data/nodes_edges/",help="Path where nodes and edges data needs to be stored")
+    parser.add_argument('--workers',type=int, default=1,help="Processes writing the node and edge files (default: 1, no sharding)")
     return parser
\ No newline at end of file
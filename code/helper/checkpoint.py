@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import shutil
+
+### Chunk level checkpoints for the fetch stages
+### Every finished chunk is written to <checkpoint_dir>/<stage>/chunk_XXXXX.json and recorded in
+### progress.json, so a restarted run only fetches the chunks that are not on disk yet.
+### The checkpoint of a stage is cleared once the stage has written its records.
+
+default_checkpoint_dir = './paper_data/checkpoints'
+
+
+def write_json_atomic(path, data):
+    """Write to a temporary file first so a crash never leaves a half written file behind"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class Checkpoint:
+
+    def __init__(self, stage, checkpoint_dir=default_checkpoint_dir):
+        self.stage = stage
+        self.stage_dir = os.path.join(checkpoint_dir, stage)
+        self.manifest_path = os.path.join(self.stage_dir, 'progress.json')
+        self.manifest = None
+        self.done = set()
+
+    def start(self, ids, chunk_size):
+        """Resume the stage if the manifest was written for the same ids and chunk size, otherwise start over"""
+        fingerprint = hashlib.sha1('\n'.join(map(str, ids)).encode()).hexdigest()
+        total_chunks = (len(ids) + chunk_size - 1) // chunk_size
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest['fingerprint'] == fingerprint and manifest['chunk_size'] == chunk_size:
+                self.manifest = manifest
+                self.done = set(manifest['done'])
+                print(f"Resuming {self.stage}: {len(manifest['done'])}/{total_chunks} chunks already fetched")
+                return
+            self.clear()
+
+        os.makedirs(self.stage_dir, exist_ok=True)
+        self.manifest = {
+            'stage': self.stage,
+            'fingerprint': fingerprint,
+            'chunk_size': chunk_size,
+            'total_chunks': total_chunks,
+            'done': []
+        }
+        self.done = set()
+        write_json_atomic(self.manifest_path, self.manifest)
+
+    def chunk_path(self, chunk_idx):
+        return os.path.join(self.stage_dir, f'chunk_{chunk_idx:05d}.json')
+
+    def is_done(self, chunk_idx):
+        return chunk_idx in self.done
+
+    def save(self, chunk_idx, records):
+        write_json_atomic(self.chunk_path(chunk_idx), records)
+        self.manifest['done'].append(chunk_idx)
+        self.done.add(chunk_idx)
+        write_json_atomic(self.manifest_path, self.manifest)
+
+    def load_all(self):
+        """Records of all finished chunks, in chunk order"""
+        records = []
+        for chunk_idx in sorted(self.manifest['done']):
+            with open(self.chunk_path(chunk_idx), 'r') as f:
+                records.extend(json.load(f))
+        return records
+
+    def clear(self):
+        if os.path.exists(self.stage_dir):
+            shutil.rmtree(self.stage_dir)
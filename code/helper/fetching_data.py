@@ -1,7 +1,14 @@
-from semanticscholar import SemanticScholar
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from helper.response_cache import ResponseCache
+from helper.checkpoint import Checkpoint, write_json_atomic
+from helper.storage import records_path, existing_records_path, write_records, read_records, iter_batches, load_records
+from helper.scheduler import RateLimitedScheduler
+from helper.registry import Registry
 import json
 import os 
+import sys
 import requests
 
 ### Selected Keywords for each domain for selecting the papers
@@ -25,194 +32,533 @@ fields = ["paperId", "corpusId", "externalIds", "url", "title", "abstract", "ven
 
 author_fields = ['authorId', 'externalIds', 'url', 'name', 'affiliations', 'homepage', 'paperCount', 'citationCount', 'hIndex']
 
-
-def main():
-
-    sc = SemanticScholar(timeout=200)
-    journal_papers = []
-    conference_papers = []
-
-    # ## Fetching Research paper with certain keywords for Journal and conerferences specifically
-
-    for keyword in tqdm(domain.keys()):
-            response_journal = sc.search_paper(query="| ".join(domain[keyword]),\
-                                               fields=fields,publication_types=["JournalArticle"],\
-                                               fields_of_study=[f"{keyword}"],min_citation_count=5)
-            response_conference = sc.search_paper(query="| ".join(domain[keyword]),\
-                                                  fields=fields,publication_types=["Conference"],\
-                                                  fields_of_study=[f"{keyword}"],min_citation_count=5)
-            journal_papers.extend(response_journal.items)
-            conference_papers.extend(response_conference.items)
-    
-    journal_papers = journal_papers[:5]
-    conference_papers = conference_papers[:5]
-
-    new_conference_papers = [dict(x) for x in conference_papers]
-    new_journal_papers = [dict(x) for x in journal_papers]
+## Bulk search settings
+S2_API_URL = "https://api.semanticscholar.org/graph/v1"
+S2_API_KEY = os.environ.get("S2_API_KEY")   # optional, raises the rate limit
+s2_timeout = 200
+s2_requests_per_second = 1.0   # shared by all concurrent batch requests
+s2_concurrency = 4             # chunks fetched in parallel
+# Number of papers harvested per domain and publication type
+harvest_target = {keyword: {"JournalArticle": 5, "Conference": 5} for keyword in domain}
+
+## OpenAlex enrichment settings
+OPENALEX_URL = "https://api.openalex.org"
+alex_concurrency = 8   # parallel requests to OpenAlex
+alex_timeout = 30      # seconds per request
+alex_batch_size = 50   # DOIs/MAG ids OR-ed together in one filter request
+alex_chunk_size = 10000           # papers resolved at a time
+alex_requests_per_second = 10.0   # OpenAlex polite pool limit, 429/5xx answers are retried with backoff
+
+## Paper shards merged by the combine step
+# Every fetch stage registers the paper files it writes in the manifest, other record files
+# (authors, OpenAlex works, ...) in ./paper_data are never read by combine_papers
+paper_manifest_path = './paper_data/manifest.json'
+default_paper_shards = ["journal_papers.json", "conference_papers.json",
+                        "journal_papers_citations.json", "conference_papers_citations.json"]
+
+
+def create_http_session(pool_size):
+    """Session with a connection pool large enough for pool_size worker threads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def alex_work_url(paper, base_url=OPENALEX_URL):
+    """OpenAlex lookup url for a paper, using the DOI first and the MAG id otherwise"""
+    external_ids = paper.get('externalIds') or {}
+    if 'DOI' in external_ids:
+        return f"{base_url}/works/https://doi.org/{external_ids['DOI']}"
+    if 'MAG' in external_ids:
+        return f"{base_url}/works?filter=ids.mag:{external_ids['MAG']}"
+    return None
+
+
+def single_lookup_work(response):
+    """Work of a single lookup response, None if nothing matched.
+    /works/<doi> returns the work itself but the MAG filter returns a list of results, so both are reduced to the
+    work record returned by the batched filters."""
+    if response is None:
+        return None
+    if 'results' in response:
+        return response['results'][0] if response['results'] else None
+    return response if response.get('id') else None
+
+
+def fetch_alex_work(session, paper, base_url=OPENALEX_URL, timeout=alex_timeout):
+    """OpenAlex work of a paper with its paperId, None if the paper has no DOI/MAG or OpenAlex does not know it.
+    Other error answers (429, 5xx, ...) raise an HTTPError, they are not a missing work"""
+    url = alex_work_url(paper, base_url)
+    if url is None:
+        return None
+    response = session.get(url, timeout=timeout)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    work = single_lookup_work(response.json())
+    return None if work is None else dict(work, paperId=paper['paperId'])
+
+
+def alex_lookup_key(paper):
+    """(id type, normalized id) used to batch a paper in an OpenAlex filter, DOI first and MAG otherwise"""
+    external_ids = paper.get('externalIds') or {}
+    if 'DOI' in external_ids:
+        doi = str(external_ids['DOI']).strip().lower()
+        # ',' and '|' are separators in OpenAlex filters, such DOIs are resolved one by one
+        if doi and ',' not in doi and '|' not in doi:
+            return ('doi', doi)
+        return None
+    if 'MAG' in external_ids:
+        return ('ids.mag', str(external_ids['MAG']).strip())
+    return None
+
+
+def work_lookup_keys(work):
+    """Keys under which a returned OpenAlex work can be matched back to our papers"""
+    keys = []
+    if work.get('doi'):
+        keys.append(('doi', work['doi'].lower().replace('https://doi.org/', '')))
+    mag = (work.get('ids') or {}).get('mag')
+    if mag:
+        keys.append(('ids.mag', str(mag)))
+    return keys
+
+
+def resolve_alex_batch(session, id_type, ids, base_url=OPENALEX_URL, timeout=alex_timeout):
+    """Resolve up to alex_batch_size ids of one type with a single OR-ed filter request, raises on error answers"""
+    params = {'filter': f"{id_type}:{'|'.join(ids)}", 'per-page': 200}
+    response = session.get(f"{base_url}/works", params=params, timeout=timeout)
+    response.raise_for_status()
+    works = {}
+    for work in response.json().get('results', []):
+        for key in work_lookup_keys(work):
+            works.setdefault(key, work)
+    return works
+
+
+def fetch_alex_info(paper_lst, concurrency=alex_concurrency, timeout=alex_timeout, base_url=OPENALEX_URL, cache=None,
+                    scheduler=None, chunk_size=alex_chunk_size):
+    """Generator over the OpenAlex works of a stream of papers, fetched with a bounded thread pool.
+    Papers are read chunk_size at a time, so the memory does not depend on the number of papers.
+    Requests go through a RateLimitedScheduler, throttled (429) and failed (5xx) requests are retried with backoff.
+    With a ResponseCache, works already on disk are not requested again, only real answers are cached.
+    Every result is the OpenAlex work record with the paperId added, whichever lookup found it.
+    Results keep the order of paper_lst, papers that fail, are not found or have no DOI/MAG are left out."""
+    session = create_http_session(concurrency)
+    if scheduler is None:
+        scheduler = RateLimitedScheduler(rate=alex_requests_per_second, concurrency=concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for chunk in iter_batches(paper_lst, chunk_size):
+            yield from fetch_alex_chunk(chunk, session, scheduler, executor, timeout, base_url, cache)
+    scheduler.report("openalex")
+    session.close()
+
+
+def fetch_alex_chunk(paper_lst, session, scheduler, executor, timeout, base_url, cache):
+    """OpenAlex works of a list of papers: batches of DOI/MAG filters first, single lookups for the misses"""
+    results = [None] * len(paper_lst)
+
+    ## Group the papers by id type and normalized id
+    keyed_papers = {}
+    for idx, paper in enumerate(paper_lst):
+        key = alex_lookup_key(paper)
+        if key is not None:
+            keyed_papers.setdefault(key, []).append(idx)
+
+    if cache is not None:
+        cached = cache.get_many('openalex', [':'.join(key) for key in keyed_papers])
+        for key in list(keyed_papers):
+            work = cached.get(':'.join(key))
+            if work is not None:
+                for idx in keyed_papers.pop(key):
+                    results[idx] = dict(work, paperId=paper_lst[idx]['paperId'])
+
+    batches = []
+    for id_type in ['doi', 'ids.mag']:
+        ids = [key[1] for key in keyed_papers if key[0] == id_type]
+        for i in range(0, len(ids), alex_batch_size):
+            batches.append((id_type, ids[i:i + alex_batch_size]))
+
+    def resolve_batch(id_type, ids):
+        # A batch that times out is split in halves by the scheduler, the works of the halves are merged
+        request_fn = lambda chunk: list(resolve_alex_batch(session, id_type, chunk, base_url, timeout).items())
+        return dict(scheduler.call(request_fn, ids))
+
+    failed_keys = set()     # papers of failed batches, not retried one by one while OpenAlex is failing
+    futures = {executor.submit(resolve_batch, id_type, ids): (id_type, ids) for id_type, ids in batches}
+    for future in tqdm(as_completed(futures), total=len(futures)):
+        try:
+            works = future.result()
+        except Exception as e:
+            print(f'error as {e}')
+            id_type, ids = futures[future]
+            failed_keys.update((id_type, doc_id) for doc_id in ids)
+            continue
+        for key, work in works.items():
+            for idx in keyed_papers.get(key, []):
+                results[idx] = dict(work, paperId=paper_lst[idx]['paperId'])
+        if cache is not None:
+            cache.set_many('openalex', {':'.join(key): work for key, work in works.items() if key in keyed_papers})
+
+    ## Single lookups for the papers no batch could resolve
+    misses = [idx for idx, paper in enumerate(paper_lst)
+              if results[idx] is None and alex_work_url(paper, base_url) is not None
+              and alex_lookup_key(paper) not in failed_keys]
+    resolved = sum(1 for response in results if response is not None)
+    print(f"Resolved {resolved} papers with {len(batches)} batch requests ({len(failed_keys)} ids in failed batches), "
+          f"{len(misses)} single lookups left")
+
+    if cache is not None:
+        single_keys = {idx: alex_work_url(paper_lst[idx], '') for idx in misses}
+        cached = cache.get_many('openalex_single', single_keys.values())
+        for idx in list(misses):
+            if single_keys[idx] in cached:
+                # None is a cached miss, the paper is left out without a new request
+                work = single_lookup_work(cached[single_keys[idx]])
+                if work is not None:
+                    results[idx] = dict(work, paperId=paper_lst[idx]['paperId'])
+        misses = [idx for idx in misses if single_keys[idx] not in cached]
+
+    def lookup(paper):
+        return scheduler.request(lambda: fetch_alex_work(session, paper, base_url, timeout))
+
+    futures = {executor.submit(lookup, paper_lst[idx]): idx for idx in misses}
+    for future in tqdm(as_completed(futures), total=len(futures)):
+        idx = futures[future]
+        try:
+            results[idx] = future.result()
+        except Exception as e:
+            # Errors are not cached, the paper is looked up again on the next run
+            print(f'error as {e}')
+            continue
+        if cache is not None:
+            cache.set('openalex_single', single_keys[idx], results[idx])
+
+    return [response for response in results if response is not None]
+
+
+def harvest_papers(session, cache, scheduler, keyword, publication_type, target_size, max_age=None):
+    """Generator over the bulk search results of one domain and publication type.
+    Follows the continuation tokens page by page until target_size papers are yielded or the results run out,
+    so only one page is held in memory at a time. Cached pages older than max_age seconds are searched again."""
+    params = {
+        'query': "| ".join(domain[keyword]),
+        'fields': 'paperId',
+        'publicationTypes': publication_type,
+        'fieldsOfStudy': keyword,
+        'minCitationCount': 5
+    }
+    headers = {'x-api-key': S2_API_KEY} if S2_API_KEY else {}
+    token = None
+    yielded = 0
+
+    while yielded < target_size:
+        cache_key = json.dumps([keyword, publication_type, domain[keyword], token])
+        page = cache.get('search_bulk', cache_key, max_age)
+        if page is None:
+            page_params = dict(params, token=token) if token else params
+
+            def get_page():
+                response = session.get(f"{S2_API_URL}/paper/search/bulk", params=page_params,
+                                       headers=headers, timeout=s2_timeout)
+                response.raise_for_status()
+                return response.json()
+
+            page = scheduler.request(get_page)
+            cache.set('search_bulk', cache_key, page)
+
+        for paper in page.get('data') or []:
+            yield paper
+            yielded += 1
+            if yielded >= target_size:
+                return
+
+        token = page.get('token')
+        if not token:
+            return
+
+
+def hydrate_papers(session, cache, scheduler, papers, chunk_size=500, registry=None):
+    """Full paper records (citations, authors, ...) for a stream of bulk search results, fetched in chunks.
+    With a registry, seed papers that are new or stale in it are requested again instead of read from the cache,
+    so their citations follow the registry max_age and not the cache ttl"""
+    def hydrate(chunk):
+        refresh_ids = frozenset()
+        if registry is not None:
+            new_ids, stale_ids = registry.split('seed', chunk)
+            refresh_ids = frozenset(new_ids) | frozenset(stale_ids)
+        records = get_papers_cached(session, cache, scheduler, chunk, refresh_ids)
+        if registry is not None:
+            registry.mark('seed', sorted(refresh_ids))
+        return records
+
+    for chunk in iter_batches((paper['paperId'] for paper in papers), chunk_size):
+        yield from hydrate(chunk)
+
+
+def post_batch(session, entity, ids, entity_fields):
+    """POST /paper/batch or /author/batch, ids that are not found are left out"""
+    headers = {'x-api-key': S2_API_KEY} if S2_API_KEY else {}
+    response = session.post(f"{S2_API_URL}/{entity}/batch", params={'fields': ','.join(entity_fields)},
+                            json={'ids': ids}, headers=headers, timeout=s2_timeout)
+    response.raise_for_status()
+    return [record for record in response.json() if record is not None]
+
+
+def get_papers_cached(session, cache, scheduler, paper_ids, refresh_ids=frozenset()):
+    """Paper details for paper_ids, only the ids missing from the cache (or in refresh_ids) are requested"""
+    papers = cache.get_many('get_papers', [paper_id for paper_id in paper_ids if paper_id not in refresh_ids])
+    missing = [paper_id for paper_id in paper_ids if paper_id not in papers]
+    if missing:
+        fetched = {}
+        for paper in scheduler.call(lambda ids: post_batch(session, 'paper', ids, fields), missing):
+            fetched[paper['paperId']] = paper
+        cache.set_many('get_papers', fetched)
+        papers.update(fetched)
+    return [papers[paper_id] for paper_id in paper_ids if paper_id in papers]
+
+
+def get_authors_cached(session, cache, scheduler, author_ids, refresh_ids=frozenset()):
+    """Author details for author_ids, only the ids missing from the cache (or in refresh_ids) are requested"""
+    authors = cache.get_many('get_authors', [author_id for author_id in author_ids if author_id not in refresh_ids])
+    missing = [author_id for author_id in author_ids if author_id not in authors]
+    if missing:
+        fetched = {}
+        for author in scheduler.call(lambda ids: post_batch(session, 'author', ids, author_fields), missing):
+            fetched[author['authorId']] = author
+        cache.set_many('get_authors', fetched)
+        authors.update(fetched)
+    return [authors[author_id] for author_id in author_ids if author_id in authors]
+
+
+def fetch_in_chunks(stage, ids, chunk_size, fetch_chunk, scheduler):
+    """Run fetch_chunk over ids in concurrent chunks, checkpointing every finished chunk so an interrupted run resumes"""
+    checkpoint = Checkpoint(stage)
+    checkpoint.start(ids, chunk_size)
+
+    chunks = {}
+    for chunk_idx, i in enumerate(range(0, len(ids), chunk_size)):
+        if not checkpoint.is_done(chunk_idx):
+            chunks[chunk_idx] = ids[i:min(i + chunk_size, len(ids))]
+
+    for chunk_idx, records in tqdm(scheduler.map_chunks(chunks, fetch_chunk), total=len(chunks)):
+        checkpoint.save(chunk_idx, records)
+
+    scheduler.report(stage)
+    return checkpoint.load_all()
+
+
+def fetch_delta(stage, registry, kind, ids, chunk_size, fetch_chunk, scheduler, path, id_field):
+    """Fetch only the ids of a stage that are new or stale in the registry and merge them
+    into the records already stored at path. Returns the merged records of ids."""
+    stored = {}
+    if os.path.exists(existing_records_path(path)):
+        stored = {record[id_field]: record for record in read_records(existing_records_path(path)) if record is not None}
+
+    new_ids, stale_ids = registry.split(kind, ids)
+    # Registered ids whose record is no longer on disk have to be fetched again
+    requested = set(new_ids) | set(stale_ids)
+    new_ids += [entity_id for entity_id in ids if entity_id not in stored and entity_id not in requested]
+    to_fetch = sorted(set(new_ids) | set(stale_ids))
+    print(f"{stage}: {len(new_ids)} new, {len(stale_ids)} stale, {len(ids) - len(to_fetch)} up to date")
+
+    stale_ids = frozenset(stale_ids)
+    fetched = fetch_in_chunks(stage, to_fetch, chunk_size, lambda chunk: fetch_chunk(chunk, stale_ids), scheduler)
+    for record in fetched:
+        stored[record[id_field]] = record
+
+    ids_set = set(ids)
+    fetched_ids = {record[id_field] for record in fetched}
+    records = [record for record_id, record in stored.items() if record_id in ids_set or record_id in fetched_ids]
+    write_records(records_path(path), records)
+    registry.mark(kind, to_fetch)
+    # The stage is complete: a later refresh of the same ids must fetch them again, not resume these chunks
+    Checkpoint(stage).clear()
+    return records
+
+
+def fetch_online(cache):
+    """Fetch the papers, their citing papers and the authors from the Semantic Scholar API into ./paper_data"""
+
+    session = create_http_session(s2_concurrency)
+    scheduler = RateLimitedScheduler(rate=s2_requests_per_second, concurrency=s2_concurrency)
+    registry = Registry()
 
     if not os.path.exists("./paper_data"):
          os.mkdir("./paper_data")
 
-    with open("./paper_data/conference_papers.json","w") as f:
-        json.dump(new_conference_papers,f)
-
-    with open("./paper_data/journal_papers.json","w") as f:
-        json.dump(new_journal_papers,f)
-
-    print("Conference and Journal Research Papers Fetched Successfully!!")
+    # ## Fetching Research paper with certain keywords for Journal and conerferences specifically
+    # Papers are streamed to disk, only the citation and author ids are kept for the next stages
+    citation_ids = {"JournalArticle": set(), "Conference": set()}
+    lst_of_author_ids = set()
+
+    def harvest(publication_type):
+        for keyword in tqdm(domain.keys()):
+            # Search pages and seed papers are refreshed after the registry max_age, like the citing papers
+            harvested = harvest_papers(session, cache, scheduler, keyword, publication_type,
+                                       harvest_target[keyword][publication_type], registry.max_age)
+            for paper in hydrate_papers(session, cache, scheduler, harvested, registry=registry):
+                citation_ids[publication_type].update(cite['paperId'] for cite in paper['citations']
+                                                      if cite['paperId'] != None)
+                lst_of_author_ids.update(author['authorId'] for author in paper['authors'])
+                yield paper
+
+    count_journal = write_records(records_path("./paper_data/journal_papers.json"), harvest("JournalArticle"))
+    register_paper_shard("./paper_data/journal_papers.json")
+    count_conference = write_records(records_path("./paper_data/conference_papers.json"), harvest("Conference"))
+    register_paper_shard("./paper_data/conference_papers.json")
+
+    print(f"Conference ({count_conference}) and Journal ({count_journal}) Research Papers Fetched Successfully!!")
+    cache.report("search_paper")
+    scheduler.report("search_paper")
 
     ## Collecting the citation list for fetched papers
-    lst_of_paperids_conference = []
-    for x in conference_papers:
-        lst_of_paperids_conference.extend([cite['paperId'] for cite in x['citations'] if cite['paperId'] != None])   
-
-    lst_of_paperids_conference = list(set(lst_of_paperids_conference))
-
-    lst_of_paperids_journal = []
-    for x in journal_papers:
-        lst_of_paperids_journal.extend([cite['paperId'] for cite in x['citations'] if cite['paperId'] != None])  
-
-    lst_of_paperids_journal = list(set(lst_of_paperids_journal)) 
-
-    ## Fetching Paper Details for Citation paperids in a batch size 500
-    chunk_size = 500 
-    cited_conference_papers = []
-
-    for i in tqdm(range(0, len(lst_of_paperids_conference), chunk_size)):
-        
-        chunk = lst_of_paperids_conference[i:min(i + chunk_size,len(lst_of_paperids_conference))]
-        response = sc.get_papers(paper_ids=chunk,fields=fields)
-        cited_conference_papers.extend(response)
+    # Sorted so that the chunks are the same on every run and checkpoints can be resumed
+    lst_of_paperids_conference = sorted(citation_ids["Conference"])
+    lst_of_paperids_journal = sorted(citation_ids["JournalArticle"])
 
+    ## Fetching Paper Details for new or stale Citation paperids in a batch size 500
     chunk_size = 500 
-    cited_journal_papers = []
-
-    new_cited_conference_papers = [dict(x) for x in cited_conference_papers]
-
-    for i in tqdm(range(0, len(lst_of_paperids_journal), chunk_size)):
-        
-        chunk = lst_of_paperids_journal[i:min(i + chunk_size,len(lst_of_paperids_journal))]
-        response = sc.get_papers(paper_ids=chunk,fields=fields)
-        cited_journal_papers.extend(response)
-
-    new_cited_journal_papers = [dict(x) for x in cited_journal_papers]
-
-    with open("./paper_data/conference_papers_citations.json","w") as f:
-        json.dump(new_cited_conference_papers,f)
+    cited_conference_papers = fetch_delta("conference_papers_citations", registry, 'paper', lst_of_paperids_conference, chunk_size,
+                                          lambda chunk, stale: get_papers_cached(session, cache, scheduler, chunk, stale),
+                                          scheduler, "./paper_data/conference_papers_citations.json", 'paperId')
+    register_paper_shard("./paper_data/conference_papers_citations.json")
 
-    with open("./paper_data/journal_papers_citations.json","w") as f:
-        json.dump(new_cited_journal_papers,f)
+    cited_journal_papers = fetch_delta("journal_papers_citations", registry, 'paper', lst_of_paperids_journal, chunk_size,
+                                       lambda chunk, stale: get_papers_cached(session, cache, scheduler, chunk, stale),
+                                       scheduler, "./paper_data/journal_papers_citations.json", 'paperId')
+    register_paper_shard("./paper_data/journal_papers_citations.json")
 
     print("Cited Conference and Journal Papers fetched successfully!!!")
+    cache.report("get_papers")
 
     ## Collecting all the authorids from fetched papers
-    lst_of_author_ids = []
-
-    for paper in conference_papers :
-        lst_of_author_ids.extend([author['authorId'] for author in paper['authors']])
-
-    for paper in journal_papers :
-        lst_of_author_ids.extend([author['authorId'] for author in paper['authors']])
-
     for paper in cited_conference_papers :
-        lst_of_author_ids.extend([author['authorId'] for author in paper['authors']])
+        lst_of_author_ids.update([author['authorId'] for author in paper['authors']])
 
     for paper in cited_journal_papers :
-        lst_of_author_ids.extend([author['authorId'] for author in paper['authors']])
+        lst_of_author_ids.update([author['authorId'] for author in paper['authors']])
 
-    
-    lst_of_author_ids = list(set(lst_of_author_ids))
+    lst_of_author_ids = sorted(author_id for author_id in lst_of_author_ids if author_id is not None)
 
-    ## Fetching Author details in batch size of 100
+    ## Fetching Author details of new or stale authors in batch size of 100
     chunk_size = 100
-    author_details = []
-
-    for i in tqdm(range(0, len(lst_of_author_ids), chunk_size)):
-        
-        chunk = lst_of_author_ids[i:min(i + chunk_size,len(lst_of_author_ids))]
-        response = sc.get_authors(chunk,fields=author_fields)
-
-        author_details.extend(response)
-
-    new_author_details = [dict(x) for x in author_details]
-
-    with open("./paper_data/authors_details_new.json","w") as f:
-        json.dump(new_author_details,f)
+    fetch_delta("authors_details", registry, 'author', lst_of_author_ids, chunk_size,
+                lambda chunk, stale: get_authors_cached(session, cache, scheduler, chunk, stale),
+                scheduler, "./paper_data/authors_details_new.json", 'authorId')
 
     print("Author Details Fetched Successfully!!!")
-
-    combined_papers_data = []
+    cache.report("get_authors")
+    registry.close()
+    session.close()
+
+
+def is_eligible_paper(paper):
+    """Journal articles need a journal volume, conference papers are always kept"""
+    if not isinstance(paper, dict) or paper.get("publicationTypes") is None:
+        return False
+    publication_types = paper.get("publicationTypes", [])
+    if "JournalArticle" not in publication_types and "Conference" not in publication_types:
+        return False
+    journal = paper.get("journal", [])
+    if "JournalArticle" in publication_types and journal is None and "Conference" not in publication_types:
+        return False
+    if "JournalArticle" in publication_types and "Conference" not in publication_types and (journal.get("volume") is None or journal.get("volume")==""):
+        return False
+    return True
+
+
+def read_paper_manifest(manifest_path=paper_manifest_path):
+    """Paper shard files listed in the manifest, relative to the manifest directory"""
+    if not os.path.exists(manifest_path):
+        print(f"{manifest_path} not found, combining the default paper shards")
+        return list(default_paper_shards)
+    with open(manifest_path, 'r') as f:
+        return json.load(f)["paper_shards"]
+
+
+def register_paper_shard(path, manifest_path=paper_manifest_path):
+    """Add a paper file written by a fetch stage to the manifest of the combine step"""
+    shard = os.path.relpath(path, os.path.dirname(manifest_path) or '.')
+    shards = read_paper_manifest(manifest_path) if os.path.exists(manifest_path) else []
+    if shard not in shards:
+        shards.append(shard)
+        write_json_atomic(manifest_path, {"paper_shards": shards})
+
+
+def compact_paper_id(paper_id):
+    """S2 paper ids are 40 lowercase hex characters, kept as 20 raw bytes in the dedup set.
+    Other ids are kept as they are, so ids differing in case stay distinct like in a string comparison"""
+    if len(paper_id) == 40 and paper_id == paper_id.lower():
+        try:
+            return bytes.fromhex(paper_id)
+        except ValueError:
+            pass
+    return paper_id
+
+
+def combine_papers(manifest_path=paper_manifest_path, output='./combined_papers_data.json'):
+    """Stream the eligible papers of every shard in the manifest into output, dropping duplicate paperIds"""
+    json_dir = os.path.dirname(manifest_path) or '.'
     seen_ids = set()
-
-    # Loop through each JSON file in the directory
-    json_dir = './paper_data'
-
-    for filename in os.listdir(json_dir):
-        if filename.endswith('.json'):
-            file_path = os.path.join(json_dir, filename)
-            with open(file_path, 'r') as file:
-                data = json.load(file)  # Load JSON data
-                # Filter data
-                filtered_data = [
-                    paper for paper in data
-                    if paper is not None and paper.get("publicationTypes") is not None and ("JournalArticle" in paper.get("publicationTypes", [])
-                        or "Conference" in paper.get("publicationTypes", []))
-                ]
-                for paper in filtered_data:
-                    paper_id = paper.get("paperId")
-                    journal = paper.get("journal", [])
-                    if "JournalArticle" in paper.get("publicationTypes", []) and journal is None and "Conference" not in paper.get("publicationTypes", []):
-                        continue
-                    if "JournalArticle" in paper.get("publicationTypes", []) and "Conference" not in paper.get("publicationTypes", []) and (journal.get("volume") is None or journal.get("volume")==""):
-                        continue
-                    if paper_id and paper_id not in seen_ids:
-                        seen_ids.add(paper_id)
-                        combined_papers_data.append(paper)
-
-    # Write combined data to a new JSON file
-    with open('./combined_papers_data.json', 'w') as outfile:
-        json.dump(combined_papers_data, outfile, indent=4)
-
-    print("JSON files combined successfully!")
+    skipped = {"duplicate": 0, "ineligible": 0}
+
+    def eligible_papers():
+        for shard in read_paper_manifest(manifest_path):
+            shard_path = existing_records_path(os.path.join(json_dir, shard))
+            if not os.path.exists(shard_path):
+                print(f"{shard_path} not found, skipping")
+                continue
+            # Papers are parsed one at a time, so a shard is never held in memory as a whole
+            for paper in read_records(shard_path):
+                if not is_eligible_paper(paper) or not paper.get("paperId"):
+                    skipped["ineligible"] += 1
+                    continue
+                paper_id = compact_paper_id(paper["paperId"])
+                if paper_id in seen_ids:
+                    skipped["duplicate"] += 1
+                    continue
+                seen_ids.add(paper_id)
+                yield paper
+
+    # Write combined data to a new file, one paper at a time
+    count = write_records(records_path(output), eligible_papers())
+
+    print(f"Paper shards combined successfully into {count} papers! "
+          f"({skipped['duplicate']} duplicates, {skipped['ineligible']} ineligible skipped)")
+
+
+def main(offline_dir=None):
+    """Build ./paper_data from the live APIs, or from local dataset dumps when offline_dir is given"""
+
+    if offline_dir is None:
+        cache = ResponseCache()
+        fetch_online(cache)
+    else:
+        from helper import offline_data
+        offline_data.fetch_offline(offline_dir)
+
+    combine_papers()
     
-    paper_lst = []
-    paths = ['combined_papers_data.json']
-    for path in paths:
-        with open(f'./{path}','r') as f:
-            data = json.load(f)
+    # Streamed from disk, the OpenAlex works are fetched and written chunk by chunk
+    paper_lst = load_records('./combined_papers_data.json')
 
-        paper_lst.extend(data)
-    
-    print("Paper Loaded Successfully")
-
-    alex_info_lst = []
-
-    for paper in tqdm(paper_lst):
-        try:  
-            if len(paper['externalIds']) > 0:
-                if 'DOI' in paper['externalIds']:
-                    doi = paper['externalIds']['DOI']
-                    doi_url = f"https://api.openalex.org/works/https://doi.org/{doi}"
-                    response_url = requests.get(doi_url).json()
-                    response_url['paperId'] = paper['paperId']
-                    alex_info_lst.append(response_url)   
-                elif 'MAG' in paper['externalIds']:
-                    mag = paper['externalIds']['MAG']
-                    mag_url = f"https://api.openalex.org/works?filter=ids.mag:{mag}"
-                    response_url = requests.get(mag_url).json()
-                    response_url['paperId'] = paper['paperId']
-                    alex_info_lst.append(response_url)  
-
-        except Exception as e:
-            print(f'error as {e}')
+    if offline_dir is None:
+        alex_info_lst = fetch_alex_info(paper_lst, cache=cache)
+    else:
+        alex_info_lst = offline_data.alex_info_offline(offline_dir, paper_lst)
 
-    with open('./paper_data/alex_info.json','w') as f:
-        json.dump(alex_info_lst,f)
+    write_records(records_path('./paper_data/alex_info.json'), alex_info_lst)
 
     print("Keywords Data Fetched Successfully!!!")
+    if offline_dir is None:
+        cache.report("openalex")
+        cache.close()
 
 
 if __name__ == "__main__":
 
-    main()
-  
+    # python -m helper.fetching_data [dataset dump directory]
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
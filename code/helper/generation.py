@@ -0,0 +1,52 @@
+import hashlib
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from faker import Faker
+
+### Reproducible generation of the synthetic metadata (reviews, locations, ...)
+### Every generated value comes from a generator seeded with a hash of the master seed and the entity it
+### belongs to (e.g. the paperId), never from the global random state. A value is then the same whatever
+### the order, the shard or the process it is generated in, so the work can be split over a process pool.
+
+master_seed = int(os.environ.get("PAPER_DATA_SEED", "42"))
+num_workers = os.cpu_count() or 1
+min_shard_size = 10000     # smaller inputs are generated in the calling process
+
+_faker = None
+
+
+def entity_seed(*keys, seed=None):
+    """64 bit seed derived from the master seed and the keys of an entity"""
+    seed = master_seed if seed is None else seed
+    digest = hashlib.blake2b('\x1f'.join([str(seed)] + [str(key) for key in keys]).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def entity_random(*keys):
+    """random.Random of an entity"""
+    return random.Random(entity_seed(*keys))
+
+
+def entity_faker(*keys):
+    """Faker of the process, reseeded for an entity"""
+    global _faker
+    if _faker is None:
+        _faker = Faker()
+    _faker.seed_instance(entity_seed(*keys))
+    return _faker
+
+
+def map_shards(fn, items, shard_size=min_shard_size, workers=num_workers):
+    """fn(list of items) -> list of results, run over shards of items in a process pool.
+    Results are returned in the order of items."""
+    items = list(items)
+    if len(items) <= shard_size or workers <= 1:
+        return fn(items)
+    shards = [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_results in executor.map(fn, shards):
+            results.extend(shard_results)
+    return results
@@ -0,0 +1,71 @@
+from collections import deque
+
+### Multi-pattern keyword matcher (Aho-Corasick automaton)
+### All keywords are compiled once into a trie with failure links, a text is then scanned in a single pass
+### whatever the number of keywords. Matching is case-insensitive. By default a keyword matches anywhere in the
+### text, like a substring check; with word_boundary=True it has to start and end at word boundaries.
+
+
+class KeywordMatcher:
+
+    def __init__(self, keywords, word_boundary=False):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        self.word_boundary = word_boundary
+        self.goto = [{}]       # state -> {character: next state}
+        self.fail = [0]
+        self.output = [[]]     # state -> keyword indices ending in this state
+
+        for keyword_idx, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(keyword_idx)
+
+        # Failure links in breadth first order, every state also reports the keywords of its failure state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, text):
+        """Indices (into self.keywords) of the keywords found in text"""
+        text = text.lower()
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        found = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for keyword_idx in output[state]:
+                    if not self.word_boundary or self.at_boundaries(text, end + 1 - len(self.keywords[keyword_idx]), end):
+                        found.add(keyword_idx)
+        return found
+
+    @staticmethod
+    def at_boundaries(text, start, end):
+        return (start == 0 or not text[start - 1].isalnum()) and (end + 1 == len(text) or not text[end + 1].isalnum())
+
+    def find_keywords(self, text):
+        """Lowercased keywords found in text"""
+        return {self.keywords[keyword_idx] for keyword_idx in self.find(text)}
+
+    def find_many(self, texts):
+        """Batched find over a list of texts, one set of keyword indices per text"""
+        return [self.find(text) for text in texts]
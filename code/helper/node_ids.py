@@ -0,0 +1,37 @@
+import math
+import uuid
+
+### Deterministic ids of the nodes that have no id in the source data
+### The id is a uuid5 of the node label and its natural key, so the node files and the edge files compute
+### the same id on their own (no mapping file between them) and a re-run produces identical files.
+
+NODE_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'paper_data/nodes_edges')   # changing it changes every id
+
+
+def key_part(value):
+    """Text of one key value: None and NaN are empty, whole floats (pandas columns with NaNs) are integers"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def node_id(label, *keys):
+    return str(uuid.uuid5(NODE_NAMESPACE, '\x1f'.join([label] + [key_part(key) for key in keys])))
+
+
+def keyword_id(keyword):
+    return node_id('Keyword', keyword.strip().lower())
+
+
+def volume_id(journal_id, year, number):
+    return node_id('Volume', journal_id, year, number)
+
+
+def edition_id(venue_id, edition, location, year):
+    return node_id('Edition', venue_id, edition, location, year)
+
+
+def affiliation_id(name):
+    return node_id('Affiliation', name)
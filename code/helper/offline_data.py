@@ -0,0 +1,239 @@
+import glob
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from helper.fetching_data import domain, is_eligible_paper, alex_lookup_key, work_lookup_keys, register_paper_shard
+from helper.storage import records_path, write_records
+
+### Offline mode of fetching_data: builds ./paper_data from local gzipped JSONL dataset shards
+### instead of the live APIs. Expected layout of the dump directory:
+###   papers/*.gz, abstracts/*.gz, citations/*.gz, authors/*.gz, publication-venues/*.gz  (Semantic Scholar datasets)
+###   openalex/works/**/*.gz                                                                (OpenAlex snapshot)
+### Every pass over a dataset scans its shards in a process pool.
+
+min_citation_count = 5
+num_workers = os.cpu_count()
+
+# Lookup sets shared with the pool workers, set once per worker by init_worker
+_shared = {}
+
+
+def init_worker(shared):
+    _shared.update(shared)
+
+
+def read_shard(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def scan_shards(dump_dir, dataset, shard_fn, shared=None):
+    """Apply shard_fn to every shard of a dataset in a process pool, returns the per-shard results"""
+    shards = sorted(glob.glob(os.path.join(dump_dir, dataset, '**', '*.gz'), recursive=True))
+    if not shards:
+        print(f"No shards found for {dataset} in {dump_dir}")
+        return []
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker, initargs=(shared or {},)) as executor:
+        return list(executor.map(shard_fn, shards))
+
+
+def to_api_paper(record):
+    """Convert a record of the papers dataset to the shape returned by the Graph API"""
+    url = record.get('url') or ''
+    fields_of_study = []
+    for field in record.get('s2fieldsofstudy') or []:
+        if field.get('category') and field['category'] not in fields_of_study:
+            fields_of_study.append(field['category'])
+    return {
+        'paperId': url.rstrip('/').split('/')[-1] if url else None,
+        'corpusId': record.get('corpusid'),
+        'externalIds': record.get('externalids'),
+        'url': url,
+        'title': record.get('title'),
+        'abstract': None,
+        'venue': record.get('venue'),
+        'publicationVenue': record.get('publicationvenueid'),
+        'year': record.get('year'),
+        'referenceCount': record.get('referencecount'),
+        'citationCount': record.get('citationcount'),
+        'influentialCitationCount': record.get('influentialcitationcount'),
+        'isOpenAccess': record.get('isopenaccess'),
+        'fieldsOfStudy': fields_of_study or None,
+        'publicationTypes': record.get('publicationtypes'),
+        'publicationDate': record.get('publicationdate'),
+        'journal': record.get('journal'),
+        'authors': [{'authorId': author.get('authorId', author.get('authorid')), 'name': author.get('name')}
+                    for author in record.get('authors') or []],
+        'citations': []
+    }
+
+
+def matches_domain(paper):
+    """Same selection as the online search: a domain keyword in the title for one of the paper's fields"""
+    title = (paper['title'] or '').lower()
+    for field in paper['fieldsOfStudy'] or []:
+        for word in domain.get(field, []):
+            if word.lower() in title:
+                return True
+    return False
+
+
+def select_seed_papers(path):
+    journal_papers, conference_papers = [], []
+    for record in read_shard(path):
+        paper = to_api_paper(record)
+        if (paper['citationCount'] or 0) < min_citation_count or not matches_domain(paper):
+            continue
+        if not is_eligible_paper(paper):
+            continue
+        if 'Conference' in paper['publicationTypes']:
+            conference_papers.append(paper)
+        else:
+            journal_papers.append(paper)
+    return journal_papers, conference_papers
+
+
+def select_papers_by_corpus_id(path):
+    return [paper for paper in map(to_api_paper, read_shard(path)) if paper['corpusId'] in _shared['corpus_ids']]
+
+
+def select_citing_ids(path):
+    return {row['citingcorpusid'] for row in read_shard(path)
+            if row.get('citedcorpusid') in _shared['corpus_ids'] and row.get('citingcorpusid') is not None}
+
+
+def select_citation_edges(path):
+    corpus_ids = _shared['corpus_ids']
+    return [(row['citedcorpusid'], row['citingcorpusid']) for row in read_shard(path)
+            if row.get('citedcorpusid') in corpus_ids and row.get('citingcorpusid') in corpus_ids]
+
+
+def select_abstracts(path):
+    return {row['corpusid']: row.get('abstract') for row in read_shard(path) if row.get('corpusid') in _shared['corpus_ids']}
+
+
+def select_venues(path):
+    return {row['id']: row for row in read_shard(path) if row.get('id') in _shared['venue_ids']}
+
+
+def select_authors(path):
+    authors = []
+    for row in read_shard(path):
+        if str(row.get('authorid')) in _shared['author_ids']:
+            authors.append({
+                'authorId': str(row['authorid']),
+                'externalIds': row.get('externalids'),
+                'url': row.get('url'),
+                'name': row.get('name'),
+                'affiliations': row.get('affiliations') or [],
+                'homepage': row.get('homepage'),
+                'paperCount': row.get('papercount'),
+                'citationCount': row.get('citationcount'),
+                'hIndex': row.get('hindex')
+            })
+    return authors
+
+
+def select_works(path):
+    works = {}
+    for work in read_shard(path):
+        for key in work_lookup_keys(work):
+            if key in _shared['lookup_keys']:
+                works[key] = work
+    return works
+
+
+def fetch_offline(dump_dir):
+    """Write the same ./paper_data files as the online fetch, read from the dataset shards in dump_dir"""
+
+    if not os.path.exists("./paper_data"):
+         os.mkdir("./paper_data")
+
+    ## Seed papers matching the domain keywords
+    journal_papers, conference_papers = [], []
+    for journal_shard, conference_shard in scan_shards(dump_dir, 'papers', select_seed_papers):
+        journal_papers.extend(journal_shard)
+        conference_papers.extend(conference_shard)
+    print(f"Selected {len(journal_papers)} journal and {len(conference_papers)} conference papers")
+
+    ## Papers citing the seed papers
+    seed_ids = {paper['corpusId'] for paper in journal_papers + conference_papers}
+    citing_ids = set()
+    for shard_ids in scan_shards(dump_dir, 'citations', select_citing_ids, {'corpus_ids': seed_ids}):
+        citing_ids.update(shard_ids)
+    citing_ids -= seed_ids
+
+    citing_papers = []
+    for shard_papers in scan_shards(dump_dir, 'papers', select_papers_by_corpus_id, {'corpus_ids': citing_ids}):
+        citing_papers.extend(shard_papers)
+    print(f"Selected {len(citing_papers)} citing papers")
+
+    ## Citations, abstracts and venues of every selected paper
+    all_papers = journal_papers + conference_papers + citing_papers
+    by_corpus_id = {paper['corpusId']: paper for paper in all_papers}
+    corpus_ids = set(by_corpus_id)
+
+    for edges in scan_shards(dump_dir, 'citations', select_citation_edges, {'corpus_ids': corpus_ids}):
+        for cited, citing in edges:
+            citing_paper = by_corpus_id[citing]
+            by_corpus_id[cited]['citations'].append({'paperId': citing_paper['paperId'], 'title': citing_paper['title']})
+
+    for abstracts in scan_shards(dump_dir, 'abstracts', select_abstracts, {'corpus_ids': corpus_ids}):
+        for corpus_id, abstract in abstracts.items():
+            by_corpus_id[corpus_id]['abstract'] = abstract
+
+    venue_ids = {paper['publicationVenue'] for paper in all_papers if paper['publicationVenue']}
+    venues = {}
+    for shard_venues in scan_shards(dump_dir, 'publication-venues', select_venues, {'venue_ids': venue_ids}):
+        venues.update(shard_venues)
+    for paper in all_papers:
+        paper['publicationVenue'] = venues.get(paper['publicationVenue'])
+
+    ## Citing papers are split by the publication type of the seed paper they cite, like the online fetch
+    def citing_papers_of(seed_papers):
+        citing = {cite['paperId'] for paper in seed_papers for cite in paper['citations']}
+        return [paper for paper in citing_papers if paper['paperId'] in citing]
+
+    cited_journal_papers = citing_papers_of(journal_papers)
+    cited_conference_papers = citing_papers_of(conference_papers)
+
+    for path, papers in [("./paper_data/journal_papers.json", journal_papers),
+                         ("./paper_data/conference_papers.json", conference_papers),
+                         ("./paper_data/journal_papers_citations.json", cited_journal_papers),
+                         ("./paper_data/conference_papers_citations.json", cited_conference_papers)]:
+        write_records(records_path(path), papers)
+        register_paper_shard(path)
+    print("Conference and Journal Research Papers loaded from the dataset dump!!")
+
+    ## Authors of every selected paper
+    author_ids = {str(author['authorId']) for paper in all_papers for author in paper['authors'] if author['authorId']}
+    author_details = []
+    for shard_authors in scan_shards(dump_dir, 'authors', select_authors, {'author_ids': author_ids}):
+        author_details.extend(shard_authors)
+    write_records(records_path("./paper_data/authors_details_new.json"), author_details)
+    print("Author Details loaded from the dataset dump!!!")
+
+
+def alex_info_offline(dump_dir, paper_lst):
+    """OpenAlex works of the combined papers, matched by DOI/MAG against the OpenAlex snapshot"""
+    keyed_papers = {}
+    for paper in paper_lst:
+        key = alex_lookup_key(paper)
+        if key is not None:
+            keyed_papers.setdefault(key, []).append(paper['paperId'])
+
+    works = {}
+    for shard_works in scan_shards(dump_dir, 'openalex', select_works, {'lookup_keys': set(keyed_papers)}):
+        works.update(shard_works)
+
+    alex_info_lst = []
+    for paper in paper_lst:
+        key = alex_lookup_key(paper)
+        if key in works:
+            alex_info_lst.append(dict(works[key], paperId=paper['paperId']))
+    print(f"Matched {len(alex_info_lst)} papers to OpenAlex works")
+    return alex_info_lst
@@ -0,0 +1,125 @@
+import csv
+import shutil
+
+from helper import table_output
+from helper.table_output import TableWriter, parquet_path, merge_parquet_shards
+
+### Single pass over the paper records for the CSV generation
+### Node and edge writers are registered on a PaperEmitter, which hands every paper record once to each of
+### them in registration order. Writers only keep their own state, e.g. the ids they already wrote.
+### The paper stream can also be split into shards written separately (e.g. in a process pool); the shard
+### files of a writer are then merged in shard order, dropping rows whose merge_key was already written.
+
+
+def publication_types(paper):
+    return paper.get('publicationTypes', None) or []
+
+
+def is_journal_article(paper):
+    types = publication_types(paper)
+    return 'JournalArticle' in types and 'Conference' not in types and paper.get('publicationVenue') is not None
+
+
+def is_conference_paper(paper):
+    return 'Conference' in publication_types(paper) and paper.get('publicationVenue') is not None
+
+
+class PaperWriter:
+    """One node or edge table written from the paper records passed to write_paper"""
+
+    columns = []
+    writer_args = {}
+    text_columns = [] # Columns cleaned with clean_text_column
+    merge_key = None # Columns identifying a row when deduplicating over shards, None if rows never repeat
+
+    def __init__(self, output):
+        self.output = output
+        self.table = TableWriter(output, self.columns, self.text_columns, **self.writer_args)
+
+    @property
+    def count(self):
+        return self.table.count + len(self.table.rows)
+
+    def write_row(self, *values):
+        """Writes a row given as its values in the order of columns"""
+        self.table.write(values)
+
+    def write_paper(self, paper):
+        raise NotImplementedError
+
+    def report(self):
+        return f'Added {self.count} rows to {self.output}'
+
+    def close(self):
+        self.table.close()
+
+
+class PaperEmitter:
+
+    def __init__(self):
+        self.writers = []
+
+    def register(self, writer):
+        self.writers.append(writer)
+        return writer
+
+    def run(self, papers, report=True):
+        """Hands every paper once to all registered writers, returns the number of papers"""
+        num_papers = 0
+        try:
+            for paper in papers:
+                if paper is None:  # Skip None entries
+                    continue
+                for writer in self.writers:
+                    writer.write_paper(paper)
+                num_papers += 1
+        finally:
+            for writer in self.writers:
+                writer.close()
+
+        if report:
+            for writer in self.writers:
+                print(writer.report())
+        return num_papers
+
+
+def write_papers(papers, writer):
+    """Runs a single writer over the papers"""
+    emitter = PaperEmitter()
+    emitter.register(writer)
+    emitter.run(papers)
+    return writer
+
+
+def merge_shard_files(output, shard_files, shard_counts, writer_class):
+    """Concatenates the shard files of a writer in order, returns the number of rows left after deduplication"""
+    if 'parquet' in table_output.output_formats:
+        count = merge_parquet_shards(parquet_path(output), [parquet_path(shard_file) for shard_file in shard_files],
+                                     writer_class.merge_key)
+        if 'csv' not in table_output.output_formats:
+            return count
+
+    count = 0
+    with open(output, 'w', newline='') as out:
+        if writer_class.merge_key is None:
+            # Rows never repeat: copy everything after the header
+            for i, shard_file in enumerate(shard_files):
+                with open(shard_file, 'r', newline='') as f:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    shutil.copyfileobj(f, out)
+            return sum(shard_counts)
+
+        writer = csv.DictWriter(out, fieldnames=writer_class.columns, **writer_class.writer_args)
+        writer.writeheader()
+        seen = set()
+        for shard_file in shard_files:
+            with open(shard_file, 'r', newline='') as f:
+                for row in csv.DictReader(f):
+                    key = tuple(row[column] for column in writer_class.merge_key)
+                    if key not in seen:
+                        seen.add(key)
+                        writer.writerow(row)
+                        count += 1
+    return count
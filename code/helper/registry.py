@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import time
+
+### Registry of the paper and author ids already held in ./paper_data, with the time they were last fetched.
+### Fetch stages only request ids that are new or older than max_age, the rest is reused from the existing files.
+
+default_registry_path = './paper_data/registry.sqlite'
+default_max_age = 7 * 24 * 3600       # refresh entities older than a week
+
+
+class Registry:
+
+    def __init__(self, path=default_registry_path, max_age=default_max_age):
+        if os.path.dirname(path) and not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        self.max_age = max_age
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entities (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (kind, id)
+            )
+        """)
+        self.conn.commit()
+
+    def split(self, kind, ids):
+        """(new ids, stale ids) among ids, ids fetched less than max_age ago are left out"""
+        fetched_at = {}
+        ids = list(ids)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(f"SELECT id, fetched_at FROM entities WHERE kind = ? AND id IN ({placeholders})",
+                                     [kind] + chunk)
+            fetched_at.update(rows)
+
+        oldest = time.time() - self.max_age
+        new_ids = [entity_id for entity_id in ids if entity_id not in fetched_at]
+        stale_ids = [entity_id for entity_id in ids if entity_id in fetched_at and fetched_at[entity_id] < oldest]
+        return new_ids, stale_ids
+
+    def mark(self, kind, ids):
+        now = time.time()
+        self.conn.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?, ?)", [(kind, entity_id, now) for entity_id in ids])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+### Local cache for Semantic Scholar and OpenAlex responses, stored in SQLite
+### Entries are keyed by (endpoint, entity id) and expire after ttl seconds.
+### Once the cache grows above max_bytes the least recently used entries are removed.
+### One connection is shared by the fetch threads, every access holds the cache lock.
+
+default_cache_path = './paper_data/cache/responses.sqlite'
+default_ttl = 30 * 24 * 3600          # 30 days
+default_max_bytes = 2 * 1024 ** 3     # 2 GB
+
+
+class ResponseCache:
+
+    def __init__(self, path=default_cache_path, ttl=default_ttl, max_bytes=default_max_bytes):
+        if os.path.dirname(path) and not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+        self.hits = {}
+        self.misses = {}
+
+    def get_many(self, endpoint, keys, max_age=None):
+        """Cached values for the given keys, expired or unknown keys are left out.
+        With max_age, entries older than max_age seconds are treated as expired as well"""
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        oldest = now - (self.ttl if max_age is None else min(self.ttl, max_age))
+        found = {}
+        with self.lock:
+            # SQLite limits the number of bound parameters, so look the keys up in slices
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, value FROM responses WHERE endpoint = ? AND fetched_at >= ? AND key IN ({placeholders})",
+                    [endpoint, oldest] + chunk)
+                for key, value in rows:
+                    found[key] = json.loads(value)
+
+            if found:
+                self.conn.executemany("UPDATE responses SET accessed_at = ? WHERE endpoint = ? AND key = ?",
+                                      [(now, endpoint, key) for key in found])
+                self.conn.commit()
+
+            self.hits[endpoint] = self.hits.get(endpoint, 0) + len(found)
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + len(keys) - len(found)
+        return found
+
+    def get(self, endpoint, key, max_age=None):
+        return self.get_many(endpoint, [key], max_age).get(key)
+
+    def set_many(self, endpoint, values):
+        now = time.time()
+        rows = []
+        for key, value in values.items():
+            value = json.dumps(value)
+            rows.append((endpoint, key, value, len(value), now, now))
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def set(self, endpoint, key, value):
+        self.set_many(endpoint, {key: value})
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones until the cache fits in max_bytes"""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,))
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                removed = 0
+                rows = self.conn.execute("SELECT endpoint, key, size FROM responses ORDER BY accessed_at").fetchall()
+                to_delete = []
+                for endpoint, key, size in rows:
+                    if total - removed <= self.max_bytes:
+                        break
+                    to_delete.append((endpoint, key))
+                    removed += size
+                self.conn.executemany("DELETE FROM responses WHERE endpoint = ? AND key = ?", to_delete)
+            self.conn.commit()
+
+    def report(self, stage):
+        """Print and reset the hit/miss counters collected since the last report"""
+        for endpoint in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(endpoint, 0)
+            misses = self.misses.get(endpoint, 0)
+            print(f"[cache] {stage} - {endpoint}: {hits} hits, {misses} misses")
+        self.hits = {}
+        self.misses = {}
+
+    def close(self):
+        self.evict()
+        self.conn.close()
@@ -0,0 +1,167 @@
+import heapq
+import random
+from array import array
+
+import numpy as np
+
+### Indexes used to assign reviewers to the papers
+### Every author gets an integer id. Eligible authors (h-index above the threshold) are indexed by domain in
+### sorted, deduplicated int32 arrays.
+### Conflicts of interest come from the paper/author incidence in CSR form (authors of every paper and papers of
+### every author as indptr/indices arrays, linear in the authorships even for papers with hundreds of authors) and
+### from the affiliations of the authors: co-authors of a paper's authors and authors sharing an affiliation are
+### never picked.
+### assign() balances the reviews: every domain keeps a min-heap on the number of reviews per author, the least
+### loaded candidates of the paper's domains are picked first and authors at capacity leave the heaps.
+### The heaps are built up front and domains are always visited in sorted order, so the random tie breaks
+### (and the assignment) only depend on the seed, never on set iteration order (PYTHONHASHSEED).
+
+
+class ReviewerIndex:
+
+    def __init__(self, author_ids, domain_members, incidence, affiliations, seed=None):
+        self.author_ids = author_ids                                    # integer id -> authorId
+        self.id_of = {author_id: i for i, author_id in enumerate(author_ids)}
+        self.domain_members = domain_members                            # domain -> sorted int32 array
+        # authors of paper p: paper_authors[paper_indptr[p]:paper_indptr[p + 1]],
+        # papers of author i: author_papers[author_indptr[i]:author_indptr[i + 1]]
+        self.paper_indptr, self.paper_authors, self.author_indptr, self.author_papers = incidence
+        self.affiliations = affiliations                                # integer id -> frozenset of affiliation ids
+        self.loads = [0] * len(author_ids)                              # reviews assigned per author
+        self.capacity = None
+        self.rng = random.Random(seed)                                  # tie breaks
+        self.heaps = {field: self.new_heap(field) for field in sorted(domain_members)}  # domain -> min-heap
+
+    def conflicts(self, authors):
+        """Integer ids of the given authors and of all their co-authors"""
+        conflicting = set(authors)
+        papers = [self.author_papers[self.author_indptr[i]:self.author_indptr[i + 1]] for i in authors]
+        # Every shared paper is visited once, however many of the given authors wrote it
+        for p in np.unique(np.concatenate(papers)).tolist() if papers else []:
+            conflicting.update(self.paper_authors[self.paper_indptr[p]:self.paper_indptr[p + 1]].tolist())
+        return conflicting
+
+    def conflict_filter(self, paper_authors):
+        """allowed(i) for the reviewers of a paper written by paper_authors"""
+        authors = [self.id_of[author_id] for author_id in paper_authors if author_id in self.id_of]
+        conflicting = self.conflicts(authors)
+        paper_affiliations = frozenset().union(*(self.affiliations[i] for i in authors))
+
+        def allowed(i):
+            return i not in conflicting and self.affiliations[i].isdisjoint(paper_affiliations)
+
+        return allowed
+
+    def new_heap(self, field):
+        """Min-heap of (reviews, random tie break, id) over the candidates of a domain"""
+        heap = [(self.loads[i], self.rng.random(), i) for i in self.domain_members[field].tolist()]
+        heapq.heapify(heap)
+        return heap
+
+    def domain_heap(self, field):
+        """Heap of a domain with outdated entries refreshed and full authors dropped until the top entry is current"""
+        heap = self.heaps[field]
+        while heap and heap[0][0] != self.loads[heap[0][2]]:
+            # Entry is outdated, the author was picked through another domain
+            _, _, i = heapq.heappop(heap)
+            if self.loads[i] < self.capacity:
+                heapq.heappush(heap, (self.loads[i], self.rng.random(), i))
+        return heap
+
+    def assign(self, fields, paper_authors, k, capacity):
+        """Up to k authorIds of the pool of fields with the fewest reviews so far, without a conflict of interest
+        and never above capacity reviews per author. Ties are broken at random."""
+        self.capacity = capacity
+        fields = [field for field in sorted(set(fields)) if field in self.domain_members]
+        allowed = self.conflict_filter(paper_authors)
+
+        selected = {}                          # id -> domain it was picked from
+        skipped = []
+        while len(selected) < k:
+            # Least loaded current entry over the heaps of the paper's domains
+            heaps = [(heap[0], field) for field in fields for heap in [self.domain_heap(field)] if heap]
+            if not heaps:
+                break
+            (load, tie, i), field = min(heaps)
+            heapq.heappop(self.heaps[field])
+            if load >= capacity:
+                continue                       # loads only grow, the author is full for good
+            if i not in selected and allowed(i):
+                selected[i] = field
+            else:
+                skipped.append(((load, tie, i), field))
+
+        for i, field in selected.items():
+            self.loads[i] += 1
+            if self.loads[i] < capacity:
+                heapq.heappush(self.heaps[field], (self.loads[i], self.rng.random(), i))
+        for entry, field in skipped:
+            heapq.heappush(self.heaps[field], entry)
+        return [self.author_ids[i] for i in selected]
+
+    def load_report(self, capacity):
+        """Distribution of the number of reviews over the reviewer candidates"""
+        reviewers = np.unique(np.concatenate(list(self.domain_members.values()))) if self.domain_members else []
+        loads = np.array(self.loads, dtype=np.int64)[reviewers]
+        if len(loads) == 0:
+            return "no reviewer candidates"
+        return (f"{len(loads)} candidates, {int((loads > 0).sum())} reviewing, "
+                f"reviews per reviewer min {loads.min()} / median {np.median(loads):.0f} / mean {loads.mean():.2f} / "
+                f"p95 {np.percentile(loads, 95):.0f} / max {loads.max()}, {int((loads >= capacity).sum())} at capacity {capacity}")
+
+
+def build_incidence(paper_lst, id_of):
+    """(paper_indptr, paper_authors, author_indptr, author_papers): the authors of every paper and the papers of
+    every author as CSR arrays over the integer author ids, one entry per authorship"""
+    # Typed arrays keep the authorships at 8 bytes per id for large corpora
+    paper_indptr = array('q', [0])
+    paper_authors = array('q')
+    for paper in paper_lst:
+        authors = sorted({id_of[author['authorId']] for author in paper['authors'] if author['authorId'] in id_of})
+        if len(authors) > 1:               # single author papers have no co-authors
+            paper_authors.extend(authors)
+            paper_indptr.append(len(paper_authors))
+
+    num_authors = len(id_of)
+    paper_indptr = np.frombuffer(paper_indptr, dtype=np.int64)
+    paper_authors = np.frombuffer(paper_authors, dtype=np.int64).astype(np.int32)
+    # Transpose: the paper of every authorship, ordered by author
+    papers = np.repeat(np.arange(len(paper_indptr) - 1, dtype=np.int32), np.diff(paper_indptr))
+    author_papers = papers[np.argsort(paper_authors, kind='stable')]
+    author_indptr = np.zeros(num_authors + 1, dtype=np.int64)
+    np.cumsum(np.bincount(paper_authors, minlength=num_authors), out=author_indptr[1:])
+    return paper_indptr, paper_authors, author_indptr, author_papers
+
+
+def build_reviewer_index(paper_lst, author_h_index, h_index_threshold=5, author_affiliations=None, seed=None):
+    """Index the authors with an h-index of at least h_index_threshold by the fields of study of their papers,
+    with the co-authorships and affiliations ({authorId: [affiliation names]}) used to avoid conflicts of interest"""
+    author_affiliations = author_affiliations or {}
+    author_ids = set(author_h_index) | set(author_affiliations)
+    for paper in paper_lst:
+        author_ids.update(author['authorId'] for author in paper['authors'])
+    author_ids.discard(None)
+    author_ids = sorted(author_ids)
+    id_of = {author_id: i for i, author_id in enumerate(author_ids)}
+
+    domain_sets = {}
+    for paper in paper_lst:
+        if paper['fieldsOfStudy'] is None:
+            continue
+        eligible = [id_of[author['authorId']] for author in paper['authors']
+                    if author['authorId'] in author_h_index and author_h_index[author['authorId']] >= h_index_threshold]
+        for field in paper['fieldsOfStudy']:
+            domain_sets.setdefault(field, set()).update(eligible)
+    domain_members = {field: np.array(sorted(members), dtype=np.int32) for field, members in domain_sets.items()}
+
+    incidence = build_incidence(paper_lst, id_of)
+
+    # Affiliation names are compared case-insensitively and stored as small integer ids
+    affiliation_id = {}
+    affiliations = [frozenset()] * len(author_ids)
+    for author_id, names in author_affiliations.items():
+        names = {name.strip().lower() for name in names or [] if name and name.strip()}
+        if author_id in id_of and names:
+            affiliations[id_of[author_id]] = frozenset(affiliation_id.setdefault(name, len(affiliation_id)) for name in names)
+
+    return ReviewerIndex(author_ids, domain_members, incidence, affiliations, seed)
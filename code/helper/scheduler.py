@@ -0,0 +1,124 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+### Concurrent, rate limited execution of the batch API requests
+### Requests share a token bucket, 429/5xx answers are retried with jittered exponential backoff
+### and a request that times out is split in halves, shrinking the chunk size used afterwards.
+
+retryable_status = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate              # tokens added per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedScheduler:
+
+    def __init__(self, rate=1.0, concurrency=4, max_retries=5, backoff=1.0, min_chunk_size=10):
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.min_chunk_size = min_chunk_size
+        self.chunk_size = None        # lowered when requests time out
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.items = 0
+        self.started = time.perf_counter()
+
+    def count(self, name, n=1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def wait_backoff(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            delay = int(retry_after)
+        else:
+            delay = self.backoff * 2 ** attempt
+        time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def call(self, request_fn, ids):
+        """request_fn(ids) -> list of records, run under the rate limit with retries and timeout splitting"""
+        chunk_size = self.chunk_size or len(ids)
+        records = []
+        for i in range(0, len(ids), max(chunk_size, 1)):
+            records.extend(self.call_once(request_fn, ids[i:i + chunk_size]))
+        return records
+
+    def call_once(self, request_fn, ids):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            self.count('requests')
+            try:
+                records = request_fn(ids)
+                self.count('items', len(records))
+                return records
+            except requests.exceptions.Timeout:
+                self.count('timeouts')
+                if len(ids) > self.min_chunk_size:
+                    half = len(ids) // 2
+                    with self.lock:
+                        self.chunk_size = max(self.min_chunk_size, min(self.chunk_size or len(ids), half))
+                    print(f"Request for {len(ids)} ids timed out, lowering the chunk size to {self.chunk_size}")
+                    return self.call_once(request_fn, ids[:half]) + self.call_once(request_fn, ids[half:])
+                if attempt == self.max_retries:
+                    raise
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code not in retryable_status or attempt == self.max_retries:
+                    raise
+                self.count('retries')
+                self.wait_backoff(attempt, e.response)
+                continue
+            except requests.exceptions.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+            self.count('retries')
+            self.wait_backoff(attempt)
+
+    def request(self, request_fn):
+        """Single request that cannot be split (e.g. a search page), with the same rate limit and retries"""
+        return self.call_once(lambda ids: [request_fn()], [])[0]
+
+    def map_chunks(self, chunks, fetch_chunk):
+        """Run fetch_chunk over {chunk index: ids} concurrently, yielding (chunk index, records) as chunks finish"""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(fetch_chunk, ids): chunk_idx for chunk_idx, ids in chunks.items()}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def report(self, stage):
+        """Print and reset the request statistics of a stage"""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(f"[scheduler] {stage}: {self.requests} requests ({self.requests / elapsed:.2f} req/s), "
+              f"{self.retries} retries, {self.timeouts} timeouts, {self.items / elapsed:.1f} items/s, "
+              f"chunk size {self.chunk_size or 'unchanged'}")
+        self.reset_stats()
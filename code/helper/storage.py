@@ -0,0 +1,169 @@
+import gzip
+import io
+import itertools
+import json
+import os
+
+try:
+    import zstandard
+except ImportError:  # only needed for .jsonl.zst files
+    zstandard = None
+
+### Storage of the fetched record lists (papers, authors, OpenAlex works).
+### Files are either one JSON list (.json) or JSON Lines, optionally compressed (.jsonl, .jsonl.gz, .jsonl.zst).
+### Records are written and read one at a time (JSON lists are parsed incrementally), so the memory
+### needed to stream a file is bounded by one record.
+
+# Format used for newly written record files: json, jsonl, jsonl.gz or jsonl.zst
+storage_format = os.environ.get("PAPER_DATA_FORMAT", "json")
+
+record_extensions = ['.jsonl.zst', '.jsonl.gz', '.jsonl', '.json']
+
+
+def strip_extension(path):
+    for extension in record_extensions:
+        if path.endswith(extension):
+            return path[:-len(extension)]
+    return path
+
+
+def records_path(path):
+    """Path of a record file in the configured storage format, e.g. alex_info.json -> alex_info.jsonl.gz"""
+    return f"{strip_extension(path)}.{storage_format}"
+
+
+def existing_records_path(path):
+    """Path of a record file as it exists on disk, preferring the configured storage format"""
+    base = strip_extension(path)
+    candidates = [records_path(path)] + [base + extension for extension in record_extensions]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    return records_path(path)
+
+
+def is_records_file(filename):
+    return any(filename.endswith(extension) for extension in record_extensions)
+
+
+def open_text(path, mode):
+    """Open a (possibly compressed) text file for reading ('r') or writing ('w')"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("zstandard is required to read or write .zst files (pip install zstandard)")
+        if mode == 'r':
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), encoding='utf-8')
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, 'wb')), encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_json_stream(path, records):
+    """Write an iterable of records as a JSON list, one record at a time. Returns the number of records"""
+    tmp_path = path + '.tmp'
+    count = 0
+    with open(tmp_path, 'w') as f:
+        f.write('[')
+        for record in records:
+            if count:
+                f.write(', ')
+            json.dump(record, f)
+            count += 1
+        f.write(']')
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_records(path, records):
+    """Write an iterable of records in the format given by the extension of path. Returns the number of records"""
+    if path.endswith('.json'):
+        return write_json_stream(path, records)
+
+    tmp_path = path + '.tmp' + path[len(strip_extension(path)):]
+    count = 0
+    with open_text(tmp_path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def iter_json_array(f, buffer_size=1 << 16, raw=False):
+    """Incrementally parse a JSON list from a file object, yielding one element (or its JSON text if raw) at a time"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        # Skip the separators between elements
+        buffer = buffer.lstrip(' \t\r\n,')
+        if not started and buffer.startswith('['):
+            started = True
+            buffer = buffer[1:].lstrip(' \t\r\n')
+        if started and buffer.startswith(']'):
+            return
+        if buffer and started:
+            try:
+                record, end = decoder.raw_decode(buffer)
+                # A number at the end of the buffer may continue in the next read
+                if end < len(buffer) or eof:
+                    yield buffer[:end] if raw else record
+                    buffer = buffer[end:]
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        if eof:
+            if not started and not buffer:
+                return
+            raise json.JSONDecodeError("Unterminated JSON list", buffer, 0)
+        data = f.read(buffer_size)
+        if not data:
+            eof = True
+        buffer += data
+
+
+def read_records(path, raw=False):
+    """Generator over the records of a file written by write_records.
+    With raw, the JSON text of every record is yielded instead, e.g. to parse it in another process"""
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            yield from iter_json_array(f, raw=raw)
+        return
+
+    with open_text(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield line if raw else json.loads(line)
+
+
+def iter_batches(records, batch_size):
+    """Lists of up to batch_size records from an iterable"""
+    iterator = iter(records)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class RecordStream:
+    """Re-iterable view of a record file, every iteration streams the file again from disk"""
+
+    def __init__(self, path):
+        self.path = existing_records_path(path)
+
+    def __iter__(self):
+        return read_records(self.path)
+
+
+def load_records(path):
+    """Record stream of a file, raises FileNotFoundError if it does not exist"""
+    stream = RecordStream(path)
+    if not os.path.exists(stream.path):
+        raise FileNotFoundError(f"{path} not found (looked for {stream.path})")
+    print(f"Streaming records from {stream.path}")
+    return stream
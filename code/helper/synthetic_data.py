@@ -0,0 +1,215 @@
+import hashlib
+import itertools
+import os
+import random
+import sys
+import time
+import uuid
+
+from faker import Faker
+
+from helper.fetching_data import domain
+from helper.generation import master_seed
+from helper.storage import records_path, write_records
+
+### Synthetic ./paper_data at any size (1k to 10M papers) for benchmarking the pipeline offline
+### Writes combined_papers_data, authors_details_new and alex_info in the schema of fetching_data.
+### Papers and authors are generated one at a time and streamed to disk, ids are derived from the
+### record index, so the memory does not depend on the number of papers. Distributions:
+###   authors per paper: 1-12, mode 2-3        author productivity and citations per paper: power law
+###   venues: Zipf popularity                   keywords: 0-5 per paper from a Zipf distributed vocabulary
+
+papers_per_author = 1.6          # number of distinct authors = papers / papers_per_author
+papers_per_venue = 500
+conference_share = 0.5           # share of conference papers, the rest are journal articles
+citation_exponent = 1.6          # Pareto shape of the number of citations per paper
+max_citations = 2000
+author_exponent = 2.5            # larger values concentrate the papers on fewer, prolific authors
+alex_share = 0.7                 # papers with an OpenAlex work (DOI)
+abstract_words = 80
+vocabulary_size = 5000
+num_institutions = 2000
+authors_per_paper_weights = [10, 25, 25, 17, 10, 6, 3, 2, 1, 0.5, 0.3, 0.2]   # 1 to 12 authors
+
+fields_weights = {"Computer Science": 30, "Medicine": 25, "Biology": 20, "Chemistry": 15, "Mathematics": 10}
+conference_kinds = ["International Conference on", "Symposium on", "Workshop on", "Annual Conference on"]
+journal_kinds = ["Journal of", "Transactions on", "Annals of", "Letters in"]
+
+
+def hex_id(kind, index, seed):
+    """40 hex character id of a record, like the Semantic Scholar paperIds"""
+    return hashlib.sha1(f"{seed}:{kind}:{index}".encode()).hexdigest()
+
+
+def ordinal(n):
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+
+def zipf_index(rng, n, exponent=1.2):
+    """Index in [0, n) with a power law popularity (small indices are the most frequent)"""
+    return min(int(n * rng.random() ** (1 + exponent)), n - 1)
+
+
+class SyntheticCorpus:
+
+    def __init__(self, num_papers, seed=master_seed):
+        self.num_papers = num_papers
+        self.seed = seed
+        self.num_authors = max(int(num_papers / papers_per_author), 10)
+        self.num_venues = max(num_papers // papers_per_venue, 4)
+
+        # Small pools of names and words, records pick from them by index
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.first_names = [fake.first_name() for _ in range(500)]
+        self.last_names = [fake.last_name() for _ in range(2000)]
+        self.cities = [fake.city() for _ in range(500)]
+        self.institutions = self.create_institutions(fake)
+        # Domain keywords first (the most frequent), then lorem words and two word phrases of them,
+        # multi-word like the real n-gram keywords
+        keywords = [word for words in domain.values() for word in words]
+        words = sorted(set(fake.words(nb=2000)))
+        phrases = (f"{a} {b}" for a, b in itertools.product(words, words) if a != b)
+        self.vocabulary = list(itertools.islice(itertools.chain(keywords, words, phrases), vocabulary_size))
+        self.topics = [" ".join(fake.words(2)).title() for _ in range(200)]
+        self.fields = list(fields_weights)
+        self.field_weights = list(fields_weights.values())
+
+    def create_institutions(self, fake):
+        """Institution names, each with spelling variants as they appear in author affiliations"""
+        institutions = []
+        for i in range(num_institutions):
+            city = self.cities[i % len(self.cities)]
+            name = random.Random(i).choice([f"University of {city}", f"{city} Institute of Technology",
+                                            f"{fake.last_name()} Research Center"])
+            variants = [name, name.upper(), name.replace("University of", "Univ. of"), f"{name}, {city}",
+                        name.replace(" of ", " "), f"Dept. of Computer Science, {name}"]
+            institutions.append(variants)
+        return institutions
+
+    def paper_id(self, index):
+        return hex_id('paper', index, self.seed)
+
+    def author_id(self, index):
+        return str(10000 + index)
+
+    def author_name(self, index):
+        h = int(hex_id('author', index, self.seed)[:12], 16)
+        return f"{self.first_names[h % len(self.first_names)]} {self.last_names[(h >> 16) % len(self.last_names)]}"
+
+    def venue(self, rng, conference):
+        index = zipf_index(rng, self.num_venues)
+        topic = self.topics[index % len(self.topics)]
+        if conference:
+            name = f"{conference_kinds[index % len(conference_kinds)]} {topic}"
+        else:
+            name = f"{journal_kinds[index % len(journal_kinds)]} {topic}"
+        kind = 'conference' if conference else 'journal'
+        return index, {"id": str(uuid.UUID(hex_id(kind, index, self.seed)[:32])), "name": name,
+                       "type": kind,
+                       "issn": None if conference else f"{index % 10000:04d}-{index // 10000 % 10000:04d}",
+                       "url": f"https://venues.example.org/{index}"}
+
+    def words(self, rng, n):
+        return " ".join(self.vocabulary[zipf_index(rng, len(self.vocabulary), 0.5)] for _ in range(n))
+
+    def create_paper(self, rng, index):
+        conference = rng.random() < conference_share
+        year = rng.randint(1990, 2024)
+        venue_index, venue = self.venue(rng, conference)
+        if conference:
+            edition = year - 1990 + venue_index % 20 + 1
+            venue_name = rng.choice([f"{year} {venue['name']}", f"{ordinal(edition)} {venue['name']}", venue['name']])
+        else:
+            venue_name = venue['name']
+
+        num_authors = rng.choices(range(1, len(authors_per_paper_weights) + 1), authors_per_paper_weights)[0]
+        authors = {zipf_index(rng, self.num_authors, author_exponent) for _ in range(num_authors)}
+        num_citations = min(int(rng.paretovariate(citation_exponent)) - 1, max_citations, self.num_papers - 1)
+        citing = {rng.randrange(self.num_papers) for _ in range(num_citations)} - {index}
+        fields = [rng.choices(self.fields, self.field_weights)[0]] if rng.random() < 0.95 else None
+
+        return {
+            "paperId": self.paper_id(index),
+            "corpusId": index,
+            "externalIds": {"DOI": f"10.5555/synthetic.{index}", "CorpusId": index},
+            "url": f"https://www.semanticscholar.org/paper/{self.paper_id(index)}",
+            "title": self.words(rng, rng.randint(4, 12)).capitalize(),
+            "abstract": self.words(rng, abstract_words) if rng.random() < 0.9 else None,
+            "venue": venue_name,
+            "publicationVenue": venue,
+            "year": year,
+            "referenceCount": rng.randint(5, 60),
+            "citationCount": len(citing),
+            "influentialCitationCount": len(citing) // 10,
+            "isOpenAccess": rng.random() < 0.4,
+            "openAccessPdf": None,
+            "fieldsOfStudy": fields,
+            "s2FieldsOfStudy": [{"category": field, "source": "s2-fos-model"} for field in fields or []],
+            "publicationTypes": ["Conference"] if conference else ["JournalArticle"],
+            "publicationDate": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "journal": {"name": venue_name, "pages": f"{rng.randint(1, 400)}-{rng.randint(401, 420)}",
+                        "volume": None if conference else str(year - 1980)},
+            "authors": [{"authorId": self.author_id(a), "name": self.author_name(a)} for a in authors],
+            "citations": [{"paperId": self.paper_id(c), "title": None} for c in sorted(citing)],
+        }
+
+    def papers(self):
+        rng = random.Random(self.seed)
+        for index in range(self.num_papers):
+            yield self.create_paper(rng, index)
+
+    def authors(self):
+        rng = random.Random(self.seed + 1)
+        for index in range(self.num_authors):
+            # Authors with a small index write the most papers and get the highest h-index
+            h_index = int(60 * (1 - index / self.num_authors) ** 8 + rng.randint(0, 5))
+            institution = self.institutions[zipf_index(rng, len(self.institutions), 0.8)]
+            yield {
+                "authorId": self.author_id(index),
+                "externalIds": {},
+                "url": f"https://www.semanticscholar.org/author/{self.author_id(index)}",
+                "name": self.author_name(index),
+                "affiliations": [rng.choice(institution)] if rng.random() < 0.6 else [],
+                "homepage": None,
+                "paperCount": max(1, int(h_index * rng.uniform(1, 4))),
+                "citationCount": h_index * rng.randint(h_index + 1, 10 * h_index + 10),
+                "hIndex": h_index if rng.random() < 0.97 else None,
+            }
+
+    def alex_works(self):
+        rng = random.Random(self.seed + 2)
+        for index in range(self.num_papers):
+            if rng.random() < alex_share:
+                keywords = [self.vocabulary[zipf_index(rng, len(self.vocabulary), 0.5)] for _ in range(rng.randint(0, 5))]
+                yield {"paperId": self.paper_id(index), "doi": f"https://doi.org/10.5555/synthetic.{index}",
+                       "keywords": [{"display_name": keyword.title(), "score": round(rng.random(), 3)}
+                                    for keyword in dict.fromkeys(keywords)]}
+
+
+def generate(num_papers, data_dir='./paper_data', seed=master_seed):
+    """Write a synthetic corpus of num_papers papers to data_dir"""
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+    corpus = SyntheticCorpus(num_papers, seed)
+
+    start = time.perf_counter()
+    count = write_records(records_path(os.path.join(data_dir, 'combined_papers_data.json')), corpus.papers())
+    print(f"{count} synthetic papers written in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    count = write_records(records_path(os.path.join(data_dir, 'authors_details_new.json')), corpus.authors())
+    print(f"{count} synthetic authors written in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    count = write_records(records_path(os.path.join(data_dir, 'alex_info.json')), corpus.alex_works())
+    print(f"{count} synthetic OpenAlex works written in {time.perf_counter() - start:.1f}s")
+    if not os.path.exists(os.path.join(data_dir, 'nodes_edges')):
+        os.makedirs(os.path.join(data_dir, 'nodes_edges'))
+
+
+if __name__ == "__main__":
+
+    # python -m helper.synthetic_data <number of papers> [paper_data directory]
+    generate(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, sys.argv[2] if len(sys.argv) > 2 else './paper_data')
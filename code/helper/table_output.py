@@ -0,0 +1,169 @@
+import csv
+import io
+import os
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.csv
+    import pyarrow.parquet
+except ImportError:  # listed in requirements.txt, without it the CSV files are written in pure Python
+    pyarrow = None
+
+### Output of the node and edge tables
+### Rows are buffered and written in batches of batch_size: text columns are cleaned a column at a time
+### (with Arrow string kernels when pyarrow is installed), then the batch is written to the CSV file read by
+### LOAD CSV and, if 'parquet' is in output_formats, appended to a Parquet file next to it (same name,
+### .parquet) that analytics and tests can read as Arrow tables.
+### Tables quoting every field whose columns are all cleaned (no nulls, quotes or backslashes left, e.g. the
+### paper table) are written to CSV by the Arrow CSV writer, which gives the same bytes as csv.QUOTE_ALL.
+
+# Formats of the node and edge tables: csv and/or parquet (parquet requires pyarrow)
+output_formats = os.environ.get("PAPER_GRAPH_FORMATS", "csv").split(',')
+supported_formats = ['csv', 'parquet']
+batch_size = 10000
+missing_pyarrow = "pyarrow is required for the parquet output (pip install pyarrow), or set PAPER_GRAPH_FORMATS=csv"
+
+# Characters removed by str.strip(), so that the Arrow cleaning gives the same text as clean_field
+PYTHON_WHITESPACE = ''.join(c for c in map(chr, range(0x3000 + 1)) if c.isspace())
+
+
+def check_output_formats():
+    """Fails before any table is written if output_formats has an unknown format or one whose package is missing"""
+    unknown = [output_format for output_format in output_formats if output_format not in supported_formats]
+    if unknown or not output_formats:
+        raise ValueError(f"Unknown table formats {unknown} in PAPER_GRAPH_FORMATS, use csv and/or parquet")
+    if 'parquet' in output_formats and pyarrow is None:
+        raise ImportError(missing_pyarrow)
+
+
+def parquet_path(path):
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+def string_array(values):
+    try:
+        return pyarrow.array(values, type=pyarrow.string())
+    except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+        return pyarrow.array([value if value is None else str(value) for value in values], type=pyarrow.string())
+
+
+def clean_field(value):
+    """Text of one field as written in the tables, the reference of clean_text_column"""
+    value = str(value).strip()
+    # Replace problematic characters
+    value = value.replace('\r', ' ').replace('\n', ' ')  # Remove newlines
+    value = value.replace('"', "'")  # Standardize to single quotes
+    value = value.replace('\\', '/')  # Handle backslashes
+    return value
+
+
+def clean_text_column(values):
+    """clean_field over a whole column: str, strip, newlines to spaces, " to ', \\ to /"""
+    if pyarrow is None:
+        return [clean_field(value) for value in values]
+    column = pyarrow.compute.fill_null(string_array(values), 'None')
+    column = pyarrow.compute.utf8_trim(column, characters=PYTHON_WHITESPACE)
+    column = pyarrow.compute.replace_substring_regex(column, pattern='[\r\n]', replacement=' ')
+    column = pyarrow.compute.replace_substring(column, pattern='"', replacement="'")
+    column = pyarrow.compute.replace_substring(column, pattern='\\', replacement='/')
+    return column
+
+
+class TableWriter:
+    """One node or edge table, rows are tuples in the order of columns"""
+
+    def __init__(self, output, columns, text_columns=(), **writer_args):
+        self.output = output
+        self.columns = columns
+        self.text_columns = [columns.index(column) for column in text_columns]
+        self.count = 0
+        self.rows = []
+        self.csvfile = None
+        self.parquet_writer = None
+        check_output_formats()
+        self.arrow_csv = (pyarrow is not None and writer_args.get('quoting') == csv.QUOTE_ALL
+                          and len(self.text_columns) == len(columns))
+        if 'csv' in output_formats and self.arrow_csv:
+            header = io.StringIO()
+            csv.writer(header, **writer_args).writerow(columns)
+            self.csvfile = open(output, 'wb')
+            self.csvfile.write(header.getvalue().encode('utf-8'))
+            self.csv_options = pyarrow.csv.WriteOptions(include_header=False, quoting_style='all_valid', eol='\r\n')
+        elif 'csv' in output_formats:
+            self.csvfile = open(output, 'w', newline='', encoding='utf-8')
+            self.writer = csv.writer(self.csvfile, **writer_args)
+            self.writer.writerow(columns)
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= batch_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        if not self.rows and (self.parquet_writer is not None or 'parquet' not in output_formats):
+            return
+        columns = [list(column) for column in zip(*self.rows)] or [[] for _ in self.columns]
+        for i in self.text_columns:
+            columns[i] = clean_text_column(columns[i])
+
+        table = None
+        if 'parquet' in output_formats or self.arrow_csv:
+            table = pyarrow.table([column if isinstance(column, pyarrow.Array) else string_array(column)
+                                   for column in columns], names=self.columns)
+
+        if self.csvfile is not None and self.arrow_csv:
+            pyarrow.csv.write_csv(table, self.csvfile, self.csv_options)
+        elif self.csvfile is not None:
+            self.writer.writerows(zip(*[column.to_pylist() if pyarrow is not None and isinstance(column, pyarrow.Array)
+                                        else column for column in columns]))
+        if 'parquet' in output_formats:
+            if self.parquet_writer is None:
+                self.parquet_writer = pyarrow.parquet.ParquetWriter(parquet_path(self.output), table.schema)
+            self.parquet_writer.write_table(table)
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        if self.csvfile is not None:
+            self.csvfile.close()
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def write_frame(df, output):
+    """Writes a DataFrame table in the output formats"""
+    if 'csv' in output_formats:
+        df.to_csv(output, index=False)
+    if 'parquet' in output_formats:
+        check_output_formats()
+        df.to_parquet(parquet_path(output), index=False)
+
+
+def merge_parquet_shards(output, shard_files, merge_key=None):
+    """Concatenates the Parquet shard files of a table in order, dropping rows whose merge_key was already written.
+    Returns the number of rows written"""
+    seen = set()
+    count = 0
+    parquet_writer = None
+    for shard_file in shard_files:
+        table = pyarrow.parquet.read_table(shard_file)
+        if merge_key is not None:
+            keys = zip(*[table.column(column).to_pylist() for column in merge_key])
+            mask = []
+            for key in keys:
+                mask.append(key not in seen)
+                seen.add(key)
+            table = table.filter(pyarrow.array(mask, type=pyarrow.bool_()))
+        if parquet_writer is None:
+            parquet_writer = pyarrow.parquet.ParquetWriter(output, table.schema)
+        parquet_writer.write_table(table)
+        count += table.num_rows
+    if parquet_writer is not None:
+        parquet_writer.close()
+    return count
@@ -0,0 +1,110 @@
+import heapq
+import json
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from helper.storage import iter_batches
+
+### Keywords extracted from the titles and abstracts with TF-IDF
+### Two passes over the papers, chunk by chunk, so the memory is bounded by one chunk and the vocabulary:
+###   1. document frequencies are accumulated per chunk and a fixed vocabulary is selected from them
+###   2. every chunk is counted against that vocabulary, weighted with the idf and l2 normalised,
+###      the top_k terms of each paper are taken from the sparse matrix with vectorised operations.
+### The terms are merged into ./paper_data/paper_keywords.json next to the OpenAlex and title keywords.
+
+tfidf_top_k = 3                  # keywords added per paper
+tfidf_chunk_size = 20000         # papers vectorized at a time
+tfidf_ngram_range = (1, 2)
+tfidf_min_df = 2                 # terms in fewer papers are ignored
+tfidf_max_df = 0.5               # terms in a larger share of the papers are ignored
+tfidf_max_features = 200000      # size of the fixed vocabulary
+max_tracked_terms = 5000000      # document frequency table is pruned to the most frequent terms above this
+token_pattern = r"(?u)\b[a-zA-Z][a-zA-Z]+\b"
+
+
+def paper_text(paper):
+    return f"{paper.get('title') or ''}. {paper.get('abstract') or ''}"
+
+
+def count_vectorizer(vocabulary=None):
+    return CountVectorizer(stop_words='english', token_pattern=token_pattern, ngram_range=tfidf_ngram_range,
+                           vocabulary=vocabulary, dtype=np.float32)
+
+
+def document_frequencies(paper_lst, chunk_size=tfidf_chunk_size):
+    """(number of papers, {term: number of papers containing it}) accumulated chunk by chunk"""
+    df = {}
+    num_papers = 0
+    for batch in iter_batches(paper_lst, chunk_size):
+        num_papers += len(batch)
+        vectorizer = count_vectorizer()
+        try:
+            counts = vectorizer.fit_transform([paper_text(paper) for paper in batch])
+        except ValueError:                 # chunk without any term
+            continue
+        chunk_df = np.bincount(counts.indices, minlength=counts.shape[1])
+        for term, idx in vectorizer.vocabulary_.items():
+            df[term] = df.get(term, 0) + int(chunk_df[idx])
+
+        if len(df) > max_tracked_terms:
+            # Rare terms are dropped, their counts in later chunks start again from zero
+            df = dict(heapq.nlargest(max_tracked_terms // 2, df.items(), key=lambda item: item[1]))
+    return num_papers, df
+
+
+def select_vocabulary(num_papers, df):
+    """Fixed vocabulary and the smoothed idf of its terms"""
+    max_count = tfidf_max_df * num_papers
+    terms = [(count, term) for term, count in df.items() if tfidf_min_df <= count <= max_count]
+    terms = heapq.nlargest(tfidf_max_features, terms)
+    vocabulary = {term: i for i, (_, term) in enumerate(sorted(terms, key=lambda item: item[1]))}
+    counts = np.array([df[term] for term in vocabulary], dtype=np.float32)
+    idf = np.log((1 + num_papers) / (1 + counts)) + 1
+    return vocabulary, idf
+
+
+def top_terms(matrix, top_k):
+    """Column indices of the top_k largest entries of every row of a CSR matrix, as one list per row"""
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    # Sort every row by decreasing score, then keep the first top_k entries of each row
+    order = np.lexsort((-matrix.data, rows))
+    rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+    keep = order[rank < top_k]
+    split = np.searchsorted(rows[keep], np.arange(1, matrix.shape[0]))
+    return np.split(matrix.indices[keep], split)
+
+
+def extract_tfidf_keywords(paper_lst, top_k=tfidf_top_k, chunk_size=tfidf_chunk_size):
+    start = time.perf_counter()
+    num_papers, df = document_frequencies(paper_lst, chunk_size)
+    vocabulary, idf = select_vocabulary(num_papers, df)
+    del df
+    if not vocabulary:
+        print("No TF-IDF keywords extracted, the vocabulary is empty")
+        return
+    terms = np.array(sorted(vocabulary, key=vocabulary.get), dtype=object)
+    print(f"TF-IDF vocabulary of {len(vocabulary)} terms from {num_papers} papers")
+
+    with open("./paper_data/paper_keywords.json", 'r') as f:
+        paper_keywords = json.load(f)
+
+    vectorizer = count_vectorizer(vocabulary)
+    added = 0
+    for batch in iter_batches(paper_lst, chunk_size):
+        counts = vectorizer.transform([paper_text(paper) for paper in batch])
+        tfidf = normalize(counts.multiply(idf).tocsr())
+        for paper, term_idx in zip(batch, top_terms(tfidf, top_k)):
+            keywords = paper_keywords.setdefault(paper['paperId'], [])
+            existing = {keyword.lower() for keyword in keywords}
+            for term in terms[term_idx]:
+                if term not in existing:
+                    keywords.append(term)
+                    added += 1
+
+    with open("./paper_data/paper_keywords.json", 'w') as f:
+        json.dump(paper_keywords, f)
+
+    print(f"{added} TF-IDF keywords added in {time.perf_counter() - start:.1f}s")
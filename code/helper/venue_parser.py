@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from helper.checkpoint import write_json_atomic
+
+### Parsing of conference venue names into (base name, edition)
+### The regexes are compiled once at import, parses are memoized per raw venue string and the results
+### are kept in a venue table on disk so that later runs only parse venue names they have not seen yet.
+### The table stores the parser version it was built with, a table of another version is discarded.
+
+default_venue_table_path = './paper_data/venue_table.json'
+
+ORDINAL_WORDS = {
+    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5, 'sixth': 6,
+    'seventh': 7, 'eighth': 8, 'ninth': 9, 'tenth': 10, 'eleventh': 11,
+    'twelfth': 12, 'thirteenth': 13, 'fourteenth': 14, 'fifteenth': 15,
+    'sixteenth': 16, 'seventeenth': 17, 'eighteenth': 18, 'nineteenth': 19,
+    'twentieth': 20, 'twentyfirst': 21, 'twentysecond': 22, 'twentythird': 23,
+    'twentyfourth': 24, 'twentyfifth': 25, 'twentysixth': 26, 'twentyseventh': 27,
+    'twentyeighth': 28, 'twentyninth': 29, 'thirtieth': 30
+}
+
+EDITION_PATTERN = re.compile(
+    r"""
+    (\b\d{4}\b)|                        # 4-digit year (group 1)
+    (\d+)(?:st|nd|rd|th)\b|             # Numeric ordinal (group 2)
+    Edition\s+(\d+)|                    # Explicit "Edition X" (group 3)
+    ['’](\d{2})\b|                      # Apostrophe year (group 4)
+    \b(First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth|
+    Eleventh|Twelfth|Thirteenth|Fourteenth|Fifteenth|Sixteenth|Seventeenth|
+    Eighteenth|Nineteenth|Twentieth|Twenty[- ]?First|Twenty[- ]?Second|
+    Twenty[- ]?Third|Twenty[- ]?Fourth|Twenty[- ]?Fifth|Twenty[- ]?Sixth|
+    Twenty[- ]?Seventh|Twenty[- ]?Eighth|Twenty[- ]?Ninth|Thirtieth)\b
+    """,
+    re.IGNORECASE | re.X
+)
+
+# Edition-related terms, removed to get the base name
+EDITION_TERMS_PATTERN = re.compile(
+    r"""
+    \b\d{4}\b|                        # 4-digit year
+    \d+(?:st|nd|rd|th)\b|             # Numeric ordinal
+    Edition\s+\d+|                    # Explicit "Edition X"
+    ['’]\d{2}\b|                      # Apostrophe year
+    \b(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth|
+    Eleventh|Twelfth|Thirteenth|Fourteenth|Fifteenth|Sixteenth|Seventeenth|
+    Eighteenth|Nineteenth|Twentieth|Twenty[- ]?First|Twenty[- ]?Second|
+    Twenty[- ]?Third|Twenty[- ]?Fourth|Twenty[- ]?Fifth|Twenty[- ]?Sixth|
+    Twenty[- ]?Seventh|Twenty[- ]?Eighth|Twenty[- ]?Ninth|Thirtieth)\b
+    """,
+    re.IGNORECASE | re.X
+)
+MULTIPLE_SPACES = re.compile(r'\s{2,}')
+TRAILING_PUNCTUATION = re.compile(r'[ ,\-]+$')
+LEADING_PUNCTUATION = re.compile(r'^[ ,\-]+')
+
+# Priority order: edition_x > textual_ordinal > ordinal > apostrophe_year > year
+EDITION_PRIORITY = ['edition_x', 'textual_ordinal', 'ordinal', 'apostrophe_year', 'year']
+
+
+def extract_edition(conference_name):
+    editions = []
+    for match in EDITION_PATTERN.finditer(conference_name):
+        year_4d, numeric_ordinal, edition_x, apostrophe_year, textual_ordinal = match.groups()
+
+        if year_4d:
+            editions.append(('year', int(year_4d)))
+        elif numeric_ordinal:
+            editions.append(('ordinal', int(numeric_ordinal)))
+        elif edition_x:
+            editions.append(('edition_x', int(edition_x)))
+        elif apostrophe_year:
+            year = int(apostrophe_year)
+            current_year = datetime.now().year
+            full_year = 2000 + year if year < (current_year - 2000 + 1) else 1900 + year
+            editions.append(('apostrophe_year', full_year))
+        elif textual_ordinal:
+            key = textual_ordinal.lower().replace('-', '').replace(' ', '')
+            editions.append(('textual_ordinal', ORDINAL_WORDS.get(key, None)))
+
+    for category in EDITION_PRIORITY:
+        for ed_type, value in editions:
+            if ed_type == category and value is not None:
+                return value
+    return None
+
+
+def clean_conference_name(conference_name):
+    cleaned = EDITION_TERMS_PATTERN.sub('', conference_name)
+    # Clean up extra spaces and punctuation
+    cleaned = MULTIPLE_SPACES.sub(' ', cleaned)  # Replace multiple spaces
+    cleaned = TRAILING_PUNCTUATION.sub('', cleaned)  # Remove trailing punctuation
+    cleaned = LEADING_PUNCTUATION.sub('', cleaned)  # Remove leading punctuation
+    return cleaned.strip()
+
+
+@lru_cache(maxsize=200000)
+def parse_venue(venue):
+    """(base name, edition) of a raw venue name"""
+    return clean_conference_name(venue), extract_edition(venue)
+
+
+# Bump when the parsing code changes without a change of the patterns and tables below
+parser_revision = 1
+
+
+def parser_version():
+    """Hash of the patterns and tables used by parse_venue, stored with the venue table"""
+    patterns = [EDITION_PATTERN, EDITION_TERMS_PATTERN, MULTIPLE_SPACES, TRAILING_PUNCTUATION, LEADING_PUNCTUATION]
+    spec = json.dumps([parser_revision, [(pattern.pattern, pattern.flags) for pattern in patterns],
+                       ORDINAL_WORDS, EDITION_PRIORITY], sort_keys=True)
+    return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+
+class VenueTable:
+    """Venue name -> (base name, edition), loaded from and saved to a JSON table"""
+
+    def __init__(self, path=default_venue_table_path):
+        self.path = path
+        self.version = parser_version()
+        self.table = {}
+        self.new_entries = 0
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            if stored.get('parser_version') == self.version:
+                self.table = {venue: tuple(parsed) for venue, parsed in stored['venues'].items()}
+            else:
+                print(f"Venue table {path} was built by another parser version, parsing the venue names again")
+
+    def parse(self, venue):
+        parsed = self.table.get(venue)
+        if parsed is None:
+            parsed = parse_venue(venue)
+            self.table[venue] = parsed
+            self.new_entries += 1
+        return parsed
+
+    def base_name(self, venue):
+        return self.parse(venue)[0]
+
+    def edition(self, venue):
+        return self.parse(venue)[1]
+
+    def save(self):
+        if self.new_entries:
+            write_json_atomic(self.path, {'parser_version': self.version, 'venues': self.table})
+            print(f"Venue table: {self.new_entries} new venue names parsed, {len(self.table)} stored in {self.path}")
+            self.new_entries = 0
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The helper package is imported like the PartA/B/C/D scripts do, from the code directory.
+# Appended, so that helper/argparse.py does not shadow the standard library module.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
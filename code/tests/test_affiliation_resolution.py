@@ -0,0 +1,45 @@
+from helper.affiliation_resolution import normalize_affiliation, resolve_affiliations
+
+
+def resolve(names):
+    return resolve_affiliations({name: 1 for name in names})
+
+
+def test_normalized_form_keeps_the_campus():
+    assert normalize_affiliation("Dept. of EECS, Univ. of California, Berkeley, CA, USA") == \
+        'california university | berkeley'
+    assert normalize_affiliation("University of California San Diego") == 'california diego san university'
+    assert normalize_affiliation("Oxford University") == normalize_affiliation("Univ. of Oxford") == 'oxford university'
+    assert normalize_affiliation(" , ") == ''
+
+
+def test_campuses_are_not_merged():
+    names = ["University of California, Berkeley", "University of California, Los Angeles",
+             "University of California San Diego", "University of California",
+             "University of Texas at Austin", "University of Texas, Dallas", "University of Texas at Dallas",
+             "Microsoft Research, Redmond, WA", "Microsoft Research, Cambridge, UK"]
+    resolved = resolve(names)
+    assert resolved["University of California, Berkeley"] != resolved["University of California, Los Angeles"]
+    assert resolved["University of California, Berkeley"] != resolved["University of California San Diego"]
+    assert resolved["University of California, Los Angeles"] != resolved["University of California San Diego"]
+    # Matches several campuses: left on its own rather than linking them
+    assert resolved["University of California"] == "University of California"
+    assert resolved["University of Texas at Austin"] != resolved["University of Texas, Dallas"]
+    assert resolved["University of Texas, Dallas"] == resolved["University of Texas at Dallas"]
+    assert resolved["Microsoft Research, Redmond, WA"] != resolved["Microsoft Research, Cambridge, UK"]
+
+
+def test_spelling_variants_are_merged():
+    counts = {"University of California, Berkeley": 3, "Univ. of California, Berkeley, CA, USA": 1,
+              "Dept. of EECS, University of California, Berkeley": 1, "UNIVERSITY OF CALIFORNIA, BERKELEY": 1,
+              "University of Oxford": 2, "Univ. Oxford": 1, "Oxford University": 1,
+              "University of Texas at Austin": 1, "University of Texas, Austin": 2}
+    resolved = resolve_affiliations(counts)
+    assert {resolved[name] for name in list(counts)[:4]} == {"University of California, Berkeley"}
+    assert {resolved[name] for name in list(counts)[4:7]} == {"University of Oxford"}
+    assert {resolved[name] for name in list(counts)[7:]} == {"University of Texas, Austin"}
+
+
+def test_name_without_location_joins_its_only_campus():
+    resolved = resolve(["Hall Research Center", "Hall Research Center, North Dawnburgh", "Dept. of CS, Hall Research Center"])
+    assert len(set(resolved.values())) == 1
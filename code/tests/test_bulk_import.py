@@ -0,0 +1,42 @@
+import csv
+
+from helper.bulk_import import export_bulk_import, import_command
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def test_node_and_relationship_files(tmp_path):
+    write_csv(tmp_path / 'author.csv', ['authorId', 'name'], [['1', 'Ann'], ['2', 'Bob']])
+    write_csv(tmp_path / 'event.csv', ['eventId', 'name', 'ISSN', 'url', 'type'],
+              [['e1', 'VLDB', '', 'u', 'Conference'], ['e2', 'DEEM', '', '', 'Workshop']])
+    write_csv(tmp_path / 'edition.csv', ['editionId', 'edition', 'location', 'year'], [['ed1', '3.0', 'Paris', '']])
+    write_csv(tmp_path / 'author_reviewed_paper.csv', ['authorId', 'paperId'], [['1', 'p1'], ['2', 'p1']])
+    write_csv(tmp_path / 'review_relations.csv', ['authorId', 'paperId', 'comments', 'vote'], [['1', 'p1', 'Good', 'accepted']])
+
+    node_paths, relationship_paths = export_bulk_import(str(tmp_path))
+    import_dir = tmp_path / 'import'
+    assert [path.split('/')[-1] for path in node_paths] == ['author.csv', 'event.csv', 'edition.csv']
+    assert read_csv(import_dir / 'author.csv') == [[':ID(Author)', 'authorId:int', 'name', ':LABEL'],
+                                                    ['1', '1', 'Ann', 'Author'], ['2', '2', 'Bob', 'Author']]
+    assert read_csv(import_dir / 'event.csv')[1:] == [['e1', 'VLDB', '', 'u', 'Event;Conference'],
+                                                      ['e2', 'DEEM', '', '', 'Event;Workshop']]
+    assert read_csv(import_dir / 'edition.csv')[1] == ['ed1', '3', 'Paris', '', 'Edition']
+    # Review comments and votes come from review_relations.csv
+    assert read_csv(import_dir / 'author_reviewed_paper.csv') == [
+        [':START_ID(Author)', ':END_ID(Paper)', ':TYPE', 'comments', 'vote'],
+        ['1', 'p1', 'REVIEWED', 'Good', 'accepted'], ['2', 'p1', 'REVIEWED', '', '']]
+
+    command = import_command(node_paths, relationship_paths, database='graph')
+    assert command[:5] == ['neo4j-admin', 'database', 'import', 'full', 'graph']
+    assert f'--nodes={import_dir / "author.csv"}' in command
+    assert f'--relationships={import_dir / "author_reviewed_paper.csv"}' in command
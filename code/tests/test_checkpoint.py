@@ -0,0 +1,35 @@
+from helper.checkpoint import Checkpoint
+
+
+def test_interrupted_stage_resumes_with_its_chunks(tmp_path):
+    ids = [f'p{i}' for i in range(10)]
+    checkpoint = Checkpoint('papers', str(tmp_path))
+    checkpoint.start(ids, 4)
+    checkpoint.save(2, [{'paperId': 'p8'}, {'paperId': 'p9'}])
+    checkpoint.save(0, [{'paperId': 'p0'}])
+
+    resumed = Checkpoint('papers', str(tmp_path))
+    resumed.start(ids, 4)
+    assert [chunk_idx for chunk_idx in range(3) if not resumed.is_done(chunk_idx)] == [1]
+    resumed.save(1, [{'paperId': 'p4'}])
+    assert [record['paperId'] for record in resumed.load_all()] == ['p0', 'p4', 'p8', 'p9']
+
+
+def test_other_ids_or_chunk_size_start_over(tmp_path):
+    checkpoint = Checkpoint('papers', str(tmp_path))
+    checkpoint.start(['a', 'b'], 1)
+    checkpoint.save(0, [{'paperId': 'a'}])
+
+    for ids, chunk_size in [(['a', 'c'], 1), (['a', 'b'], 2)]:
+        restarted = Checkpoint('papers', str(tmp_path))
+        restarted.start(ids, chunk_size)
+        assert not restarted.is_done(0)
+        assert restarted.load_all() == []
+
+
+def test_clear_removes_the_stage(tmp_path):
+    checkpoint = Checkpoint('papers', str(tmp_path))
+    checkpoint.start(['a'], 1)
+    checkpoint.save(0, [{'paperId': 'a'}])
+    checkpoint.clear()
+    assert not (tmp_path / 'papers').exists()
@@ -0,0 +1,39 @@
+import json
+
+from helper import storage
+from helper.fetching_data import combine_papers, register_paper_shard
+from helper.storage import write_records, read_records, existing_records_path
+
+
+def paper(paper_id, publication_types=('Conference',), volume='1'):
+    return {'paperId': paper_id, 'publicationTypes': list(publication_types), 'journal': {'volume': volume}}
+
+
+def test_shards_are_combined_in_manifest_order_without_duplicates(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'storage_format', 'json')
+    manifest_path = str(tmp_path / 'manifest.json')
+    hex_id = 'a' * 40
+    shards = {
+        'journal_papers.json': [paper(hex_id, ['JournalArticle']), paper('b' * 40, ['JournalArticle'], volume=''),
+                                None, paper('c1')],
+        'conference_papers.jsonl.gz': [paper('c1'), paper(hex_id), paper('d' * 40, ['Review']), paper('e' * 40)],
+    }
+    for filename, papers in shards.items():
+        write_records(str(tmp_path / filename), papers)
+        register_paper_shard(str(tmp_path / filename), manifest_path)
+    register_paper_shard(str(tmp_path / 'journal_papers.json'), manifest_path)     # registered once
+    register_paper_shard(str(tmp_path / 'missing_papers.json'), manifest_path)     # skipped
+    with open(manifest_path) as f:
+        assert json.load(f)['paper_shards'] == ['journal_papers.json', 'conference_papers.jsonl.gz', 'missing_papers.json']
+
+    output = str(tmp_path / 'combined_papers_data.json')
+    combine_papers(manifest_path, output)
+    # First occurrence wins, ineligible papers (no volume, other types, None) are dropped
+    assert [p['paperId'] for p in read_records(existing_records_path(output))] == [hex_id, 'c1', 'e' * 40]
+
+
+def test_compact_ids_compare_like_strings():
+    from helper.fetching_data import compact_paper_id
+    ids = ['ab' * 20, 'AB' * 20, 'ab' * 10, 'zz' * 20, ' ' + 'ab' * 20]
+    assert len({compact_paper_id(paper_id) for paper_id in ids}) == len(ids)
+    assert compact_paper_id('ab' * 20) == bytes.fromhex('ab' * 20)
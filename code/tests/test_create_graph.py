@@ -0,0 +1,90 @@
+import filecmp
+import re
+import os
+
+import pytest
+
+from helper import a2_preprocessing, a2_create_graph, a2_create_nodes, a2_create_edges, table_output
+from helper.synthetic_data import generate
+
+
+@pytest.fixture(scope='module')
+def paper_data(tmp_path_factory):
+    """Preprocessed synthetic corpus, the stages read and write ./paper_data"""
+    data_dir = tmp_path_factory.mktemp('corpus')
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        generate(400)
+        a2_preprocessing.preprocessing()
+    finally:
+        os.chdir(cwd)
+    return str(data_dir / 'paper_data')
+
+
+def assert_same_files(expected_dir, actual_dir):
+    files = sorted(os.listdir(expected_dir))
+    assert files == sorted(os.listdir(actual_dir))
+    _, mismatch, errors = filecmp.cmpfiles(expected_dir, actual_dir, files, shallow=False)
+    assert not mismatch and not errors, mismatch + errors
+
+
+def test_sharded_graph_equals_single_process(paper_data, tmp_path, monkeypatch):
+    single, sharded = tmp_path / 'single', tmp_path / 'sharded'
+    single.mkdir()
+    sharded.mkdir()
+    a2_create_graph.create_graph(paper_data, str(single))
+    # Small shards, so authors, journals, volumes and events repeat across shards and have to be merged
+    monkeypatch.setattr(a2_create_graph, 'shard_size', 37)
+    a2_create_graph.create_graph(paper_data, str(sharded), workers=2)
+    assert not (sharded / 'shards').exists()
+    assert_same_files(str(single), str(sharded))
+
+
+def test_graph_is_reproducible(paper_data, tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    for output in [first, second]:
+        output.mkdir()
+        a2_create_graph.create_graph(paper_data, str(output))
+    assert_same_files(str(first), str(second))
+
+
+def test_single_scan_equals_nodes_then_edges(paper_data, tmp_path):
+    fused, two_step = tmp_path / 'fused', tmp_path / 'two_step'
+    fused.mkdir()
+    two_step.mkdir()
+    a2_create_graph.create_graph(paper_data, str(fused))
+    a2_create_nodes.create_nodes(paper_data, str(two_step))
+    a2_create_edges.create_edges(paper_data, str(two_step))
+    assert_same_files(str(fused), str(two_step))
+
+
+@pytest.mark.skipif(table_output.pyarrow is None, reason='pyarrow is not installed')
+def test_sharded_parquet_equals_single_process(paper_data, tmp_path, monkeypatch):
+    monkeypatch.setattr(table_output, 'output_formats', ['csv', 'parquet'])
+    single, sharded = tmp_path / 'single', tmp_path / 'sharded'
+    single.mkdir()
+    sharded.mkdir()
+    a2_create_graph.create_graph(paper_data, str(single))
+    monkeypatch.setattr(a2_create_graph, 'shard_size', 37)
+    a2_create_graph.create_graph(paper_data, str(sharded), workers=2)
+    for filename in sorted(os.listdir(single)):
+        if filename.endswith('.parquet'):
+            expected = table_output.pyarrow.parquet.read_table(str(single / filename))
+            assert table_output.pyarrow.parquet.read_table(str(sharded / filename)).equals(expected), filename
+
+
+@pytest.mark.skipif(table_output.pyarrow is None, reason='pyarrow is not installed')
+def test_sharded_parquet_only_counts_rows_after_dedup(paper_data, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(table_output, 'output_formats', ['parquet'])
+    monkeypatch.setattr(a2_create_graph, 'shard_size', 37)
+    a2_create_graph.create_graph(paper_data, str(tmp_path), workers=2)
+    counts = {}
+    for line in capsys.readouterr().out.splitlines():
+        match = re.match(r'Added (\d+) rows to (\S+) from \d+ shards', line)
+        if match:
+            counts[os.path.basename(match.group(2))] = int(match.group(1))
+    assert {'author.csv', 'journal.csv', 'event.csv'} <= set(counts)
+    for filename, count in counts.items():
+        table = table_output.pyarrow.parquet.read_table(str(tmp_path / filename.replace('.csv', '.parquet')))
+        assert count == table.num_rows, filename
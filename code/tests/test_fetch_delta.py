@@ -0,0 +1,109 @@
+from helper import fetching_data
+from helper.registry import Registry
+from helper.response_cache import ResponseCache
+from helper.storage import read_records, existing_records_path
+
+
+class InlineScheduler:
+
+    def map_chunks(self, chunks, fetch_chunk):
+        for chunk_idx, ids in chunks.items():
+            yield chunk_idx, fetch_chunk(ids)
+
+    def report(self, stage):
+        pass
+
+
+def fetch(registry, ids, version, requested):
+    def fetch_chunk(chunk, stale_ids):
+        requested.extend(chunk)
+        return [{'authorId': author_id, 'version': version} for author_id in chunk]
+
+    return fetching_data.fetch_delta('authors_details', registry, 'author', ids, 2, fetch_chunk, InlineScheduler(),
+                                     './paper_data/authors_details_new.json', 'authorId')
+
+
+def test_stale_refresh_of_the_same_ids_fetches_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = Registry('./paper_data/registry.sqlite')
+    ids = ['a1', 'a2', 'a3']
+
+    requested = []
+    fetch(registry, ids, 1, requested)
+    assert requested == ids
+    assert not (tmp_path / 'paper_data' / 'checkpoints' / 'authors_details').exists()
+
+    requested = []
+    fetch(registry, ids, 2, requested)                 # everything is up to date
+    assert requested == []
+
+    registry.max_age = -1                              # everything is stale
+    requested = []
+    records = fetch(registry, ids, 3, requested)
+    assert requested == ids
+    assert [record['version'] for record in records] == [3, 3, 3]
+    stored = read_records(existing_records_path('./paper_data/authors_details_new.json'))
+    assert [record['version'] for record in stored] == [3, 3, 3]
+    registry.close()
+
+
+class FakeResponse:
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class S2Session:
+    """Semantic Scholar stand-in: the bulk search always finds the seed s1, batches return the current records"""
+
+    def __init__(self, papers):
+        self.papers = papers
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return FakeResponse({'data': [{'paperId': 's1'}]})
+
+    def post(self, url, params=None, json=None, headers=None, timeout=None):
+        if url.endswith('/paper/batch'):
+            return FakeResponse([self.papers.get(paper_id) for paper_id in json['ids']])
+        return FakeResponse([{'authorId': author_id, 'name': author_id} for author_id in json['ids']])
+
+    def close(self):
+        pass
+
+
+def paper(paper_id, citations):
+    return {'paperId': paper_id, 'authors': [{'authorId': 'a1'}],
+            'citations': [{'paperId': citing_id} for citing_id in citations]}
+
+
+def fetch_online(monkeypatch, papers, max_age):
+    monkeypatch.setattr(fetching_data, 'create_http_session', lambda pool_size: S2Session(papers))
+    monkeypatch.setattr(fetching_data, 'Registry', lambda: Registry(max_age=max_age))
+    monkeypatch.setattr(fetching_data, 's2_requests_per_second', 1000)
+    monkeypatch.setattr(fetching_data, 'harvest_target',
+                        {keyword: {"JournalArticle": 1, "Conference": 0} for keyword in fetching_data.domain})
+    cache = ResponseCache()
+    fetching_data.fetch_online(cache)
+    cache.close()
+    seed = next(read_records(existing_records_path('./paper_data/journal_papers.json')))
+    citing = read_records(existing_records_path('./paper_data/journal_papers_citations.json'))
+    return [cite['paperId'] for cite in seed['citations']], sorted(record['paperId'] for record in citing)
+
+
+def test_delta_run_sees_new_citations_of_a_seed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    papers = {'s1': paper('s1', ['c1']), 'c1': paper('c1', []), 'c2': paper('c2', [])}
+    assert fetch_online(monkeypatch, papers, 3600) == (['c1'], ['c1'])
+
+    # The seed gets a new citation, still within the cache ttl and the registry max_age: nothing is requested
+    papers['s1'] = paper('s1', ['c1', 'c2'])
+    assert fetch_online(monkeypatch, papers, 3600) == (['c1'], ['c1'])
+
+    # Once the seed is older than the registry max_age, the search and the seed are requested again
+    assert fetch_online(monkeypatch, papers, -1) == (['c1', 'c2'], ['c1', 'c2'])
@@ -0,0 +1,145 @@
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from helper import fetching_data
+from helper.response_cache import ResponseCache
+from helper.scheduler import RateLimitedScheduler
+
+
+class FakeResponse:
+
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """OpenAlex stand-in: /works/<doi>, the MAG filter and the OR-ed batch filters"""
+
+    def __init__(self, works, batch=True):
+        self.works = works
+        self.batch = batch
+
+    def get(self, url, params=None, timeout=None):
+        path = urlparse(url).path
+        query = dict(params or {}, **{k: v[0] for k, v in parse_qs(urlparse(url).query).items()})
+        if path.startswith('/works/https://doi.org/'):
+            work = self.find('doi', path[len('/works/https://doi.org/'):])
+            return FakeResponse(work, 200) if work else FakeResponse({'error': 'not found'}, 404)
+        id_type, ids = query['filter'].split(':', 1)
+        if '|' in ids or 'per-page' in query:
+            results = [work for i in ids.split('|') for work in [self.find(id_type, i)] if work] if self.batch else []
+        else:
+            results = [work for work in [self.find(id_type, ids)] if work]
+        return FakeResponse({'meta': {'count': len(results)}, 'results': results})
+
+    def find(self, id_type, value):
+        for work in self.works:
+            if id_type == 'doi' and work['doi'] == f'https://doi.org/{value}':
+                return work
+            if id_type == 'ids.mag' and work['ids'].get('mag') == value:
+                return work
+        return None
+
+    def close(self):
+        pass
+
+
+works = [
+    {'id': 'W1', 'doi': 'https://doi.org/10.1/a', 'ids': {'mag': '11'}, 'keywords': [{'display_name': 'graphs'}]},
+    {'id': 'W2', 'doi': None, 'ids': {'mag': '22'}, 'keywords': [{'display_name': 'indexing'}]},
+]
+papers = [
+    {'paperId': 'p1', 'externalIds': {'DOI': '10.1/a'}},
+    {'paperId': 'p2', 'externalIds': {'MAG': '22'}},
+    {'paperId': 'p3', 'externalIds': {'MAG': '33'}},        # unknown to OpenAlex
+    {'paperId': 'p4', 'externalIds': {'DOI': '10.1/missing'}},
+    {'paperId': 'p5', 'externalIds': {}},
+]
+
+
+class ThrottledSession(FakeSession):
+    """FakeSession answering the first requests with the given error statuses"""
+
+    def __init__(self, works, errors, batch=True):
+        super().__init__(works, batch)
+        self.errors = list(errors)
+        self.requests = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        if self.errors:
+            return FakeResponse({'error': 'Too Many Requests'}, self.errors.pop(0))
+        return super().get(url, params, timeout)
+
+
+def fetch(monkeypatch, batch, session=None, **kwargs):
+    session = session or FakeSession(works, batch)
+    monkeypatch.setattr(fetching_data, 'create_http_session', lambda pool_size: session)
+    scheduler = RateLimitedScheduler(rate=1000, concurrency=1, max_retries=3, backoff=0)
+    return list(fetching_data.fetch_alex_info(papers, concurrency=1, scheduler=scheduler, **kwargs))
+
+
+def test_single_and_batched_lookups_return_the_same_records(monkeypatch):
+    batched = fetch(monkeypatch, batch=True)
+    single = fetch(monkeypatch, batch=False)     # every paper falls back to a single lookup
+    assert batched == single
+    assert batched == [dict(works[0], paperId='p1'), dict(works[1], paperId='p2')]
+
+
+def test_papers_are_streamed_in_chunks(monkeypatch):
+    monkeypatch.setattr(fetching_data, 'create_http_session', lambda pool_size: FakeSession(works))
+    scheduler = RateLimitedScheduler(rate=1000, concurrency=1, backoff=0)
+    chunked = fetching_data.fetch_alex_info(iter(papers), concurrency=1, scheduler=scheduler, chunk_size=2)
+    assert list(chunked) == fetch(monkeypatch, batch=True)
+
+
+def test_single_lookup_work():
+    assert fetching_data.single_lookup_work(works[0]) == works[0]
+    assert fetching_data.single_lookup_work({'meta': {}, 'results': [works[1]]}) == works[1]
+    assert fetching_data.single_lookup_work({'meta': {}, 'results': []}) is None
+    assert fetching_data.single_lookup_work({'error': 'not found'}) is None
+
+
+def test_throttled_requests_are_retried(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    # batch lookups: DOI batch throttled twice; single lookups of the misses: one 503
+    session = ThrottledSession(works, [429, 503], batch=False)
+    assert fetch(monkeypatch, False, session, cache=cache) == [dict(works[0], paperId='p1'), dict(works[1], paperId='p2')]
+    assert session.requests == 2 + 2 + 4
+    cache.close()
+
+
+def test_errors_are_not_cached_as_missing(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    # Every attempt of the batches fails, the papers of these batches are not looked up one by one
+    session = ThrottledSession(works, [503] * 8, batch=True)
+    assert fetch(monkeypatch, True, session, cache=cache) == []
+    assert session.requests == 8
+    assert cache.get_many('openalex', ['doi:10.1/a', 'ids.mag:22']) == {}
+    assert cache.get_many('openalex_single', ['/works/https://doi.org/10.1/a']) == {}
+
+    # The next run, with OpenAlex answering again, finds the works
+    session = FakeSession(works, batch=True)
+    assert fetch(monkeypatch, True, session, cache=cache) == [dict(works[0], paperId='p1'), dict(works[1], paperId='p2')]
+    cache.close()
+
+
+def test_single_lookup_raises_on_errors():
+    session = ThrottledSession(works, [429])
+    try:
+        fetching_data.fetch_alex_work(session, papers[0])
+    except requests.exceptions.HTTPError as e:
+        assert e.response.status_code == 429
+    else:
+        raise AssertionError("a throttled lookup must not be a missing work")
+    assert fetching_data.fetch_alex_work(FakeSession(works), papers[3]) is None     # 404
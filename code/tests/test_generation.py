@@ -0,0 +1,33 @@
+from helper import a2_preprocessing
+from helper.generation import entity_seed, entity_random, entity_faker, map_shards
+
+
+def squares(items):
+    return [item * item for item in items]
+
+
+def test_entity_values_do_not_depend_on_the_order():
+    forward = [entity_random('review', i).random() for i in range(50)]
+    backward = [entity_random('review', i).random() for i in reversed(range(50))]
+    assert forward == backward[::-1]
+    assert entity_seed('review', 1) != entity_seed('review', 1, seed=7)
+    assert entity_seed('venue', 'a', 'b') != entity_seed('venue', 'ab')
+
+
+def test_faker_reseeded_per_entity():
+    first = entity_faker('location', 'Conf', 3).city()
+    entity_faker('location', 'Other', 1).city()
+    assert entity_faker('location', 'Conf', 3).city() == first
+
+
+def test_map_shards_keeps_the_order():
+    items = list(range(103))
+    assert map_shards(squares, items, shard_size=10, workers=2) == squares(items)
+    assert map_shards(squares, iter(items)) == squares(items)
+
+
+def test_reviews_same_in_shards():
+    paper_reviewers = [(f"p{i}", [str(i), str(i + 1), str(i + 2)][:2 + i % 2]) for i in range(40)]
+    serial = a2_preprocessing.reviews_of_papers(paper_reviewers)
+    assert map_shards(a2_preprocessing.reviews_of_papers, paper_reviewers, shard_size=7, workers=2) == serial
+    assert a2_preprocessing.reviews_of_papers(paper_reviewers[::-1]) == serial[::-1]
@@ -0,0 +1,77 @@
+from urllib.parse import urlparse
+
+from helper import fetching_data
+
+
+class FakeResponse:
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class PagedSession:
+    """Bulk search stand-in: pages of page_size papers linked by continuation tokens"""
+
+    def __init__(self, num_papers, page_size):
+        self.num_papers = num_papers
+        self.page_size = page_size
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        assert urlparse(url).path.endswith('/paper/search/bulk')
+        self.requests.append(params.get('token'))
+        start = int(params.get('token') or 0)
+        end = min(start + self.page_size, self.num_papers)
+        body = {'total': self.num_papers, 'data': [{'paperId': f'p{i}'} for i in range(start, end)]}
+        if end < self.num_papers:
+            body['token'] = str(end)
+        return FakeResponse(body)
+
+
+class DictCache:
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, kind, key, max_age=None):
+        return self.entries.get((kind, key))
+
+    def set(self, kind, key, value):
+        self.entries[(kind, key)] = value
+
+
+class InlineScheduler:
+
+    def request(self, fn):
+        return fn()
+
+
+def harvest(session, cache, target_size):
+    return [paper['paperId'] for paper in
+            fetching_data.harvest_papers(session, cache, InlineScheduler(), 'Biology', 'JournalArticle', target_size)]
+
+
+def test_follows_the_tokens_until_the_target():
+    session = PagedSession(25, 10)
+    assert harvest(session, DictCache(), 15) == [f'p{i}' for i in range(15)]
+    assert session.requests == [None, '10']
+
+
+def test_stops_when_the_results_run_out():
+    session = PagedSession(25, 10)
+    assert harvest(session, DictCache(), 100) == [f'p{i}' for i in range(25)]
+    assert session.requests == [None, '10', '20']
+
+
+def test_pages_are_cached():
+    cache = DictCache()
+    first = harvest(PagedSession(25, 10), cache, 100)
+    session = PagedSession(25, 10)
+    assert harvest(session, cache, 100) == first
+    assert session.requests == []
@@ -0,0 +1,63 @@
+import json
+import random
+
+from helper import a2_preprocessing
+from helper.keyword_matcher import KeywordMatcher
+
+keywords = ['data', 'database', 'base', 'data management', 'big data', 'mining', 'Genomic', 'genome', 'nome',
+            'Harmonic', 'harm', 'curves']
+alphabet = 'databseminggoruvhclk ,-'
+
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    texts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+    return texts + ['Big DATA Management of Genomic databases', 'Nonharmonic curves', 'genomes', '']
+
+
+def test_matches_like_substring_checks():
+    matcher = KeywordMatcher(keywords)
+    for text in random_texts(5000):
+        assert matcher.find_keywords(text) == {keyword.lower() for keyword in keywords if keyword.lower() in text.lower()}
+
+
+def test_word_boundary_matches():
+    matcher = KeywordMatcher(keywords, word_boundary=True)
+    assert matcher.find_keywords('Big DATA Management of Genomic databases') == \
+        {'big data', 'data', 'data management', 'genomic'}
+    assert matcher.find_keywords('Nonharmonic curves') == {'curves'}
+
+
+def legacy_paper_keywords(paper_lst, alex_info_lst):
+    """Keyword assignment before the automaton: a substring check per paper, field and domain word"""
+    alex_info_dict = {paper['paperId']: [x['display_name'] for x in paper['keywords'] if x['display_name'] != 'Plain Text']
+                      for paper in alex_info_lst if 'keywords' in paper}
+    paper_keywords = {}
+    for paper in paper_lst:
+        initial_keywords = {kw.lower(): kw for kw in alex_info_dict.get(paper['paperId'], [])}
+        if paper['fieldsOfStudy'] is not None:
+            for field in paper['fieldsOfStudy']:
+                if field in a2_preprocessing.domain:
+                    for word in a2_preprocessing.domain[field]:
+                        if word.lower() in paper['title'].lower():
+                            initial_keywords[word.lower()] = word
+        paper_keywords[paper['paperId']] = list(initial_keywords.values())
+    return paper_keywords
+
+
+def test_paper_keywords_equal_the_substring_assignment(tmp_path, monkeypatch):
+    rng = random.Random(1)
+    words = [word for field_words in a2_preprocessing.domain.values() for word in field_words] + ['of', 'the', 're']
+    fields = list(a2_preprocessing.domain) + ['Physics']
+    paper_lst = [{'paperId': f'p{i}', 'title': ' '.join(rng.choice(words) for _ in range(rng.randint(1, 6))).title(),
+                  'fieldsOfStudy': rng.sample(fields, rng.randint(1, 3)) if i % 5 else None} for i in range(3000)]
+    alex_info_lst = [{'paperId': f'p{i}', 'keywords': [{'display_name': rng.choice(['Big Data', 'Plain Text', 'Health'])}]}
+                     for i in range(0, 3000, 3)]
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'paper_data').mkdir()
+    (tmp_path / 'paper_data' / 'alex_info.json').write_text(json.dumps(alex_info_lst))
+    monkeypatch.setattr(a2_preprocessing, 'keyword_word_boundary', False)
+    a2_preprocessing.assign_keywords_research_paper(paper_lst)
+    with open(tmp_path / 'paper_data' / 'paper_keywords.json') as f:
+        assert json.load(f) == legacy_paper_keywords(paper_lst, alex_info_lst)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from helper.node_ids import node_id, keyword_id, volume_id, edition_id, affiliation_id
+
+
+def test_ids_are_stable_across_runs():
+    # Pinned: the graph files of earlier runs use these ids, a change of namespace or key format breaks them
+    assert keyword_id('Big Data') == 'c9d0da3a-a5b4-5487-9900-6d2b7aaf5a91'
+    assert volume_id('j1', 2019, '3') == 'eb96547f-8c6b-574b-805c-50a43a5ac1d6'
+    assert edition_id('v1', 3, 'Paris', 2019) == '0946d994-ba5b-54cf-af16-df931ffd34b1'
+    assert affiliation_id('University of Oxford') == '21c1d17d-c26e-5c57-8674-f15364156cd2'
+
+
+def test_keys_read_from_json_and_pandas_give_the_same_id():
+    assert keyword_id(' big data ') == keyword_id('BIG DATA') == keyword_id('Big Data')
+    assert volume_id('j1', 2019.0, '3') == volume_id('j1', 2019, '3') == volume_id('j1', '2019', 3)
+    assert volume_id('j1', 2019, None) == volume_id('j1', 2019, float('nan')) == volume_id('j1', 2019, np.nan)
+    assert edition_id('v1', np.float64(3.0), 'Paris', np.int64(2019)) == edition_id('v1', 3, 'Paris', 2019)
+
+
+def test_different_keys_or_labels_give_different_ids():
+    assert volume_id('j1', 2019, '3') != volume_id('j1', 2019, '4')
+    assert volume_id('j1', 2019, '') != volume_id('j1', 2020, '')
+    assert node_id('Keyword', 'x') != node_id('Affiliation', 'x')
+    # Key parts are separated, so they cannot run into each other
+    assert node_id('Volume', 'j1', '20', '19') != node_id('Volume', 'j1', '2019', '')
@@ -0,0 +1,72 @@
+import gzip
+import json
+import os
+
+from helper import offline_data
+from helper.storage import read_records, existing_records_path
+
+
+def write_shard(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row) + '\n')
+
+
+def paper_row(corpus_id, title, types, citations=10, volume='3', venue_id=None):
+    return {'corpusid': corpus_id, 'url': f'https://www.semanticscholar.org/paper/s{corpus_id}', 'title': title,
+            'externalids': {'DOI': f'10.1/{corpus_id}'}, 'venue': 'Venue', 'publicationvenueid': venue_id,
+            'year': 2020, 'citationcount': citations, 's2fieldsofstudy': [{'category': 'Biology'}],
+            'publicationtypes': types, 'journal': {'name': 'J', 'volume': volume},
+            'authors': [{'authorId': str(corpus_id * 10), 'name': f'A{corpus_id}'}]}
+
+
+def create_dump(dump_dir):
+    write_shard(f'{dump_dir}/papers/0.gz', [
+        paper_row(1, 'Genome of the fly', ['JournalArticle'], venue_id='v1'),
+        paper_row(2, 'Receptor binding', ['Conference']),
+        paper_row(3, 'Genome scans', ['JournalArticle'], citations=1),       # too few citations
+        paper_row(4, 'Unrelated title', ['JournalArticle']),                 # no domain keyword
+    ])
+    write_shard(f'{dump_dir}/papers/1.gz', [paper_row(5, 'Citing paper', ['JournalArticle'], citations=0),
+                                            paper_row(6, 'Other citing paper', ['Conference'], citations=0)])
+    write_shard(f'{dump_dir}/citations/0.gz', [{'citedcorpusid': 1, 'citingcorpusid': 5},
+                                               {'citedcorpusid': 2, 'citingcorpusid': 6},
+                                               {'citedcorpusid': 4, 'citingcorpusid': 5}])
+    write_shard(f'{dump_dir}/abstracts/0.gz', [{'corpusid': 1, 'abstract': 'About genomes'}])
+    write_shard(f'{dump_dir}/publication-venues/0.gz', [{'id': 'v1', 'name': 'Genome Journal'}])
+    write_shard(f'{dump_dir}/authors/0.gz', [{'authorid': 10, 'name': 'A1', 'hindex': 7},
+                                             {'authorid': 99, 'name': 'Unused'}])
+    write_shard(f'{dump_dir}/openalex/works/part/0.gz', [{'id': 'W1', 'doi': 'https://doi.org/10.1/1', 'ids': {}},
+                                                         {'id': 'W9', 'doi': 'https://doi.org/10.1/9', 'ids': {}}])
+
+
+def read_paper_ids(path):
+    return [paper['paperId'] for paper in read_records(existing_records_path(path))]
+
+
+def test_fetch_offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_dump('dump')
+    offline_data.fetch_offline('dump')
+
+    assert read_paper_ids('./paper_data/journal_papers.json') == ['s1']
+    assert read_paper_ids('./paper_data/conference_papers.json') == ['s2']
+    assert read_paper_ids('./paper_data/journal_papers_citations.json') == ['s5']
+    assert read_paper_ids('./paper_data/conference_papers_citations.json') == ['s6']
+
+    journal_paper, = read_records(existing_records_path('./paper_data/journal_papers.json'))
+    assert journal_paper['abstract'] == 'About genomes'
+    assert journal_paper['publicationVenue'] == {'id': 'v1', 'name': 'Genome Journal'}
+    assert journal_paper['citations'] == [{'paperId': 's5', 'title': 'Citing paper'}]
+    assert journal_paper['fieldsOfStudy'] == ['Biology']
+
+    authors = list(read_records(existing_records_path('./paper_data/authors_details_new.json')))
+    assert [(author['authorId'], author['hIndex']) for author in authors] == [('10', 7)]
+
+
+def test_alex_info_offline(tmp_path):
+    create_dump(str(tmp_path))
+    papers = [{'paperId': 's1', 'externalIds': {'DOI': '10.1/1'}}, {'paperId': 's2', 'externalIds': {'DOI': '10.1/2'}}]
+    assert offline_data.alex_info_offline(str(tmp_path), papers) == \
+        [{'id': 'W1', 'doi': 'https://doi.org/10.1/1', 'ids': {}, 'paperId': 's1'}]
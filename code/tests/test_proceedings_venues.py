@@ -0,0 +1,41 @@
+import pandas as pd
+
+from helper import a2_preprocessing
+
+
+def conference_paper(i, venue, year, venue_id='v1'):
+    return {'paperId': f'p{i}', 'title': f'T{i}', 'publicationDate': None, 'year': year, 'venue': venue,
+            'publicationTypes': ['Conference'], 'publicationVenue': {'id': venue_id}, 'journal': {'pages': f'{i}-{i + 9}'}}
+
+
+papers = [conference_paper(0, 'SIGMOD Conference', 2019), conference_paper(1, 'SIGMOD Conference', 2017),
+          conference_paper(2, 'SIGMOD Conference', 2019), conference_paper(3, 'SIGMOD Conference', 2021),
+          conference_paper(4, 'VLDB Workshop', 2019, 'v2'), conference_paper(5, '2018 3rd VLDB Workshop', 2018, 'v2'),
+          conference_paper(6, '2018 3rd VLDB Workshop', 2018, 'v2'), conference_paper(7, '12th ICDE', 2020, 'v3'),
+          conference_paper(8, 'SIGMOD Conference', 2019, None),
+          dict(conference_paper(9, 'Journal', 2019), publicationTypes=['JournalArticle'])]
+
+
+def assign(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'paper_data').mkdir(exist_ok=True)
+    a2_preprocessing.assign_proceedings_venues(papers)
+    return pd.read_csv(tmp_path / 'paper_data' / 'paper_proceedings_location_new.csv').set_index('paperId')
+
+
+def test_editions_and_locations(tmp_path, monkeypatch):
+    df = assign(tmp_path, monkeypatch)
+    assert sorted(df.index) == ['p0', 'p1', 'p2', 'p3', 'p4', 'p5', 'p6', 'p7']   # no venue id or not a conference
+    # Editions in the venue name are kept, the others are numbered from 3 in year order per conference
+    assert df['edition'].to_dict() == {'p0': 4, 'p1': 3, 'p2': 4, 'p3': 5, 'p4': 3, 'p5': 3, 'p6': 3, 'p7': 12}
+    assert df.loc['p5', 'new_conference_name'] == df.loc['p4', 'new_conference_name'] == 'VLDB Workshop'
+    # One location per edition
+    assert df.loc['p0', 'location'] == df.loc['p2', 'location']
+    assert df.loc['p5', 'location'] == df.loc['p6', 'location']
+    assert df.loc['p0', 'pages'] == '0-9'
+
+
+def test_assignment_is_reproducible(tmp_path, monkeypatch):
+    first = assign(tmp_path, monkeypatch)
+    (tmp_path / 'paper_data' / 'venue_table.json').unlink()
+    assert assign(tmp_path, monkeypatch).equals(first)
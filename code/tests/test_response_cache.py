@@ -0,0 +1,52 @@
+from helper import response_cache
+from helper.response_cache import ResponseCache
+
+
+class Clock:
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def create_cache(tmp_path, monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, 'time', clock.time)
+    return ResponseCache(str(tmp_path / 'cache' / 'responses.sqlite'), **kwargs), clock
+
+
+def test_get_and_set(tmp_path, monkeypatch):
+    cache, _ = create_cache(tmp_path, monkeypatch)
+    cache.set_many('paper', {'a': {'paperId': 'a'}, 'b': [1, 2]})
+    cache.set('author', 'a', None)
+    assert cache.get_many('paper', ['a', 'b', 'c', 'a']) == {'a': {'paperId': 'a'}, 'b': [1, 2]}
+    assert cache.get_many('author', ['a']) == {'a': None}     # a cached miss is still an entry
+    assert cache.get('author', 'b') is None
+    assert cache.hits == {'paper': 2, 'author': 1} and cache.misses == {'paper': 1, 'author': 1}
+    cache.close()
+
+
+def test_expired_entries_are_not_returned_and_evicted(tmp_path, monkeypatch):
+    cache, clock = create_cache(tmp_path, monkeypatch, ttl=100)
+    cache.set('paper', 'old', 1)
+    clock.now += 60
+    cache.set('paper', 'new', 2)
+    clock.now += 50                                            # 'old' is 110s old, 'new' 50s
+    assert cache.get_many('paper', ['old', 'new']) == {'new': 2}
+    cache.evict()
+    assert cache.conn.execute("SELECT key FROM responses").fetchall() == [('new',)]
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_above_max_bytes(tmp_path, monkeypatch):
+    value = 'x' * 98                                           # 100 bytes once JSON encoded
+    cache, clock = create_cache(tmp_path, monkeypatch, max_bytes=250)
+    for key in ['a', 'b', 'c']:
+        cache.set('paper', key, value)
+        clock.now += 1
+    cache.get('paper', 'a')                                    # 'b' is now the least recently used
+    cache.evict()
+    assert sorted(key for key, in cache.conn.execute("SELECT key FROM responses")) == ['a', 'c']
+    cache.close()
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import time
+
+from helper.reviewer_index import build_reviewer_index, build_incidence
+
+
+def paper(paper_id, author_ids, fields=('Biology',)):
+    return {'paperId': paper_id, 'fieldsOfStudy': list(fields), 'authors': [{'authorId': a} for a in author_ids]}
+
+
+def test_incidence_lists_both_directions():
+    id_of = {'a': 0, 'b': 1, 'c': 2, 'd': 3}
+    paper_indptr, paper_authors, author_indptr, author_papers = build_incidence(
+        [paper('p1', ['a', 'b', 'a']), paper('p2', ['d']), paper('p3', ['c', 'b', None])], id_of)
+    assert paper_indptr.tolist() == [0, 2, 4]                  # the single author paper is left out
+    assert paper_authors.tolist() == [0, 1, 1, 2]
+    assert author_indptr.tolist() == [0, 1, 3, 4, 4]
+    assert author_papers.tolist() == [0, 0, 1, 1]
+
+
+def test_conflicts_are_the_co_authors():
+    index = build_reviewer_index([paper('p1', ['a', 'b']), paper('p2', ['b', 'c']), paper('p3', ['d'])],
+                                 {'a': 10, 'b': 10, 'c': 10, 'd': 10})
+    ids = {author_id: i for i, author_id in enumerate(index.author_ids)}
+    names = lambda conflicting: sorted(index.author_ids[i] for i in conflicting)
+    assert names(index.conflicts([ids['a']])) == ['a', 'b']
+    assert names(index.conflicts([ids['b']])) == ['a', 'b', 'c']
+    assert names(index.conflicts([ids['d']])) == ['d']
+
+
+def test_large_author_lists_stay_linear():
+    # Consortium papers: the co-author pairs would be 200 * 2000^2, the authorships are 400k
+    papers = [paper(f'p{i}', [f'a{(i * 1000 + j) % 50000}' for j in range(2000)]) for i in range(200)]
+    start = time.perf_counter()
+    index = build_reviewer_index(papers, {})
+    conflicting = index.conflicts([index.id_of['a0']])
+    assert time.perf_counter() - start < 30
+    assert len(index.paper_authors) == 400_000
+    expected = {author['authorId'] for p in papers if {'authorId': 'a0'} in p['authors'] for author in p['authors']}
+    assert {index.author_ids[i] for i in conflicting} == expected
+
+
+def test_assign_respects_conflicts_and_capacity():
+    papers = [paper(f'p{i}', [f'a{i}', f'a{i + 1}']) for i in range(20)]
+    index = build_reviewer_index(papers, {f'a{i}': 10 for i in range(21)}, seed=0)
+    reviews = {}
+    for p in papers:
+        authors = {author['authorId'] for author in p['authors']}
+        reviewers = index.assign(p['fieldsOfStudy'], authors, 3, capacity=3)
+        assert len(reviewers) == len(set(reviewers)) == 3
+        for reviewer in reviewers:
+            assert reviewer not in authors
+            assert index.id_of[reviewer] not in index.conflicts([index.id_of[a] for a in authors])
+            reviews[reviewer] = reviews.get(reviewer, 0) + 1
+    assert max(reviews.values()) <= 3
+
+
+assignment_script = '''
+import json, random, sys
+sys.path.append(sys.argv[1])
+from helper.reviewer_index import build_reviewer_index
+rng = random.Random(0)
+fields = ['Biology', 'Chemistry', 'Computer Science', 'Mathematics', 'Medicine', 'Physics']
+papers = [{'paperId': f'p{i}', 'fieldsOfStudy': rng.sample(fields, rng.randint(1, 4)),
+           'authors': [{'authorId': f'a{rng.randrange(300)}'} for _ in range(rng.randint(1, 4))]} for i in range(2000)]
+index = build_reviewer_index(papers, {f'a{i}': 10 for i in range(300)}, seed=42)
+print(json.dumps([index.assign(p['fieldsOfStudy'], {a['authorId'] for a in p['authors']}, 3, 10) for p in papers]))
+'''
+
+
+def test_assignment_does_not_depend_on_the_hash_seed():
+    code_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    outputs = []
+    for hash_seed in ['1', '2', '3']:
+        result = subprocess.run([sys.executable, '-c', assignment_script, code_dir], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONHASHSEED=hash_seed), check=True)
+        outputs.append(result.stdout)
+    assert outputs[0] == outputs[1] == outputs[2]
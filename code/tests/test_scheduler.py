@@ -0,0 +1,66 @@
+import time
+
+import pytest
+import requests
+
+from helper.scheduler import RateLimitedScheduler, TokenBucket
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+def test_timed_out_requests_are_split_in_order():
+    calls = []
+
+    def request_fn(ids):
+        calls.append(len(ids))
+        if len(ids) > 25:
+            raise requests.exceptions.Timeout()
+        return [{'id': i} for i in ids]
+
+    scheduler = RateLimitedScheduler(rate=1000, backoff=0, min_chunk_size=10)
+    ids = list(range(100))
+    assert [record['id'] for record in scheduler.call(request_fn, ids)] == ids
+    assert scheduler.chunk_size == 25 and scheduler.timeouts == 3
+    # Later calls start with the lowered chunk size
+    calls.clear()
+    scheduler.call(request_fn, ids)
+    assert calls == [25, 25, 25, 25]
+
+
+def test_retryable_errors_are_retried_and_others_raised():
+    answers = [http_error(429), http_error(503), ['ok']]
+
+    def request_fn(ids):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    scheduler = RateLimitedScheduler(rate=1000, backoff=0)
+    assert scheduler.call_once(request_fn, ['a']) == ['ok']
+    assert scheduler.retries == 2 and scheduler.requests == 3
+
+    def not_found(ids):
+        raise http_error(404)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        scheduler.call_once(not_found, ['a'])
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.19          # the first token is free, then 10 at 50 per second
+
+
+def test_map_chunks_returns_every_chunk():
+    scheduler = RateLimitedScheduler(rate=1000, concurrency=3)
+    chunks = {i: list(range(i * 10, i * 10 + 10)) for i in range(7)}
+    results = dict(scheduler.map_chunks(chunks, lambda ids: [sum(ids)]))
+    assert results == {i: [sum(ids)] for i, ids in chunks.items()}
@@ -0,0 +1,39 @@
+import gzip
+import json
+
+import pytest
+
+from helper import storage
+from helper.storage import write_records, read_records, load_records, iter_json_array
+
+records = [{'paperId': 'p1', 'title': 'A "quoted" [title]', 'authors': [{'authorId': '1'}]},
+           {'paperId': 'p2', 'title': 'Ünïcode, {braces}', 'authors': []},
+           None]
+
+
+@pytest.mark.parametrize('extension', ['.json', '.jsonl', '.jsonl.gz', '.jsonl.zst'])
+def test_records_round_trip(tmp_path, extension):
+    path = str(tmp_path / f'papers{extension}')
+    assert write_records(path, iter(records)) == len(records)
+    assert list(read_records(path)) == records
+    assert [json.loads(text) for text in read_records(path, raw=True)] == records
+
+
+def test_json_array_is_parsed_incrementally(tmp_path):
+    path = tmp_path / 'papers.json'
+    path.write_text(json.dumps(records))
+    with open(path) as f:
+        assert list(iter_json_array(f, buffer_size=7)) == records
+
+
+def test_load_records_streams_the_existing_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'storage_format', 'jsonl.gz')
+    with gzip.open(tmp_path / 'papers.jsonl.gz', 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(records[0]) + '\n')
+    stream = load_records(str(tmp_path / 'papers.json'))
+    assert list(stream) == list(stream) == [records[0]]
+
+
+def test_load_records_of_a_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_records(str(tmp_path / 'combined_papers_data.json'))
@@ -0,0 +1,48 @@
+import os
+
+from helper.storage import read_records
+from helper.synthetic_data import SyntheticCorpus, generate
+
+
+def read_dir(data_dir):
+    return {name: list(read_records(os.path.join(data_dir, name))) for name in sorted(os.listdir(data_dir))
+            if name.endswith('.json')}
+
+
+def test_generate_is_reproducible(tmp_path):
+    generate(200, str(tmp_path / 'a'))
+    generate(200, str(tmp_path / 'b'))
+    first = read_dir(tmp_path / 'a')
+    assert set(first) == {'combined_papers_data.json', 'authors_details_new.json', 'alex_info.json'}
+    assert first == read_dir(tmp_path / 'b')
+    assert (tmp_path / 'a' / 'nodes_edges').is_dir()
+
+
+def test_papers_match_the_schema():
+    corpus = SyntheticCorpus(300, seed=3)
+    papers = list(corpus.papers())
+    author_ids = {author['authorId'] for author in corpus.authors()}
+    paper_ids = {paper['paperId'] for paper in papers}
+
+    assert len(paper_ids) == 300 and all(len(paper_id) == 40 for paper_id in paper_ids)
+    for paper in papers:
+        assert 1 <= len(paper['authors']) <= 12
+        assert {author['authorId'] for author in paper['authors']} <= author_ids
+        assert {citation['paperId'] for citation in paper['citations']} <= paper_ids - {paper['paperId']}
+        assert paper['citationCount'] == len(paper['citations'])
+        assert paper['publicationTypes'] in (['Conference'], ['JournalArticle'])
+    assert {work['paperId'] for work in corpus.alex_works()} <= paper_ids
+
+
+def test_seed_changes_the_corpus():
+    assert next(SyntheticCorpus(10, seed=1).papers()) != next(SyntheticCorpus(10, seed=2).papers())
+
+
+def test_keywords_are_made_of_words():
+    corpus = SyntheticCorpus(10, seed=3)
+    words = {entry for entry in corpus.vocabulary if ' ' not in entry}
+    phrases = [entry for entry in corpus.vocabulary if ' ' in entry]
+    assert len(phrases) > len(corpus.vocabulary) // 2
+    # Past the domain keywords, every phrase is two vocabulary words, e.g. "data theory", never "datatheory"
+    assert all(set(phrase.split()) <= words for phrase in phrases[-100:])
+    assert all(len(phrase.split()) == 2 for phrase in phrases[-100:])
@@ -0,0 +1,74 @@
+import csv
+import io
+
+import pytest
+
+from helper import table_output
+from helper.table_output import TableWriter, clean_field, clean_text_column, check_output_formats, parquet_path
+
+requires_pyarrow = pytest.mark.skipif(table_output.pyarrow is None, reason='pyarrow is not installed')
+
+texts = ['plain', ' padded\t', 'line\nbreak\r\n', 'say "hi"', 'back\\slash', '', None, 'Ünïcode　', '\x1c\x85end',
+         'comma, inside', 42, 3.5]
+columns = ['paperId', 'title', 'abstract']
+rows = [(f'p{i}', texts[i % len(texts)], texts[(i * 7) % len(texts)]) for i in range(60)]
+
+
+def write_table(path, text_columns, **writer_args):
+    table = TableWriter(str(path), columns, text_columns, **writer_args)
+    for row in rows:
+        table.write(row)
+    table.close()
+    return table.count
+
+
+def legacy_bytes(text_columns, **writer_args):
+    """Row at a time csv.writer with clean_field, as the node and edge functions wrote before"""
+    out = io.StringIO(newline='')
+    writer = csv.writer(out, **writer_args)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([clean_field(value) if column in text_columns else value for column, value in zip(columns, row)])
+    return out.getvalue().encode('utf-8')
+
+
+@pytest.mark.parametrize('text_columns, writer_args', [
+    (columns, {'quoting': csv.QUOTE_ALL, 'escapechar': '\\'}),      # paper.csv, written by the Arrow CSV writer
+    (['title'], {}),
+    (['title'], {'quoting': csv.QUOTE_NONNUMERIC}),
+])
+@pytest.mark.parametrize('with_pyarrow', [pytest.param(True, marks=requires_pyarrow), False])
+def test_csv_bytes_are_unchanged(tmp_path, monkeypatch, text_columns, writer_args, with_pyarrow):
+    monkeypatch.setattr(table_output, 'batch_size', 7)
+    if not with_pyarrow:
+        monkeypatch.setattr(table_output, 'pyarrow', None)
+    assert write_table(tmp_path / 'table.csv', text_columns, **writer_args) == len(rows)
+    assert (tmp_path / 'table.csv').read_bytes() == legacy_bytes(text_columns, **writer_args)
+
+
+@requires_pyarrow
+def test_arrow_cleaning_equals_clean_field():
+    values = texts + [chr(c) + 'x' + chr(c) for c in range(0x3001)]
+    assert clean_text_column(values).to_pylist() == [clean_field(value) for value in values]
+
+
+@requires_pyarrow
+def test_parquet_has_the_csv_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(table_output, 'output_formats', ['csv', 'parquet'])
+    monkeypatch.setattr(table_output, 'batch_size', 7)
+    write_table(tmp_path / 'table.csv', ['title'])
+    table = table_output.pyarrow.parquet.read_table(parquet_path(str(tmp_path / 'table.csv')))
+    with open(tmp_path / 'table.csv', newline='', encoding='utf-8') as f:
+        csv_rows = list(csv.reader(f))
+    assert table.column_names == csv_rows[0]
+    assert [[value or '' for value in row] for row in zip(*table.to_pydict().values())] == csv_rows[1:]
+
+
+def test_output_formats_are_checked(monkeypatch):
+    monkeypatch.setattr(table_output, 'output_formats', ['csv', 'parqet'])
+    with pytest.raises(ValueError):
+        check_output_formats()
+    monkeypatch.setattr(table_output, 'output_formats', ['parquet'])
+    monkeypatch.setattr(table_output, 'pyarrow', None)
+    with pytest.raises(ImportError, match='PAPER_GRAPH_FORMATS=csv'):
+        check_output_formats()
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from helper import tfidf_keywords
+
+papers = [
+    {'paperId': 'p0', 'title': 'Graph databases', 'abstract': 'Indexing of graph databases with transformer models'},
+    {'paperId': 'p1', 'title': 'Genome assembly', 'abstract': 'Genome assembly with graph algorithms'},
+    {'paperId': 'p2', 'title': 'Transformer models', 'abstract': None},
+    {'paperId': 'p3', 'title': None, 'abstract': 'Protein folding and genome assembly'},
+    {'paperId': 'p4', 'title': 'Harmonic curves', 'abstract': 'Hyperbolic curves and harmonic analysis'},
+    {'paperId': 'p5', 'title': 'Protein folding', 'abstract': 'Indexing protein structures'},
+]
+
+
+def test_top_terms_per_row():
+    matrix = csr_matrix(np.array([[0.1, 0.5, 0, 0.3], [0, 0, 0, 0], [0.2, 0, 0.9, 0]], dtype=np.float32))
+    assert [list(row) for row in tfidf_keywords.top_terms(matrix, 2)] == [[1, 3], [], [2, 0]]
+
+
+def test_document_frequencies_do_not_depend_on_the_chunks():
+    assert tfidf_keywords.document_frequencies(papers, chunk_size=2) == \
+        tfidf_keywords.document_frequencies(papers, chunk_size=100)
+
+
+def test_scores_match_sklearn(monkeypatch):
+    monkeypatch.setattr(tfidf_keywords, 'tfidf_max_df', 1.0)
+    num_papers, df = tfidf_keywords.document_frequencies(papers, chunk_size=4)
+    vocabulary, idf = tfidf_keywords.select_vocabulary(num_papers, df)
+    reference = TfidfVectorizer(stop_words='english', token_pattern=tfidf_keywords.token_pattern,
+                                ngram_range=tfidf_keywords.tfidf_ngram_range, vocabulary=vocabulary)
+    texts = [tfidf_keywords.paper_text(paper) for paper in papers]
+    reference.fit(texts)
+    assert np.allclose(idf, reference.idf_)
+
+
+def test_keywords_appended_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'paper_data').mkdir()
+    with open('./paper_data/paper_keywords.json', 'w') as f:
+        json.dump({'p0': ['Graph Databases'], 'p1': []}, f)
+
+    tfidf_keywords.extract_tfidf_keywords(papers, top_k=2, chunk_size=4)
+    with open('./paper_data/paper_keywords.json') as f:
+        first = json.load(f)
+    assert first['p0'][0] == 'Graph Databases' and 'graph databases' not in first['p0'][1:]
+    assert all(len(first[paper['paperId']]) <= 3 for paper in papers)
+
+    with open('./paper_data/paper_keywords.json', 'w') as f:
+        json.dump({'p0': ['Graph Databases'], 'p1': []}, f)
+    tfidf_keywords.extract_tfidf_keywords(papers, top_k=2, chunk_size=1)
+    with open('./paper_data/paper_keywords.json') as f:
+        assert json.load(f) == first
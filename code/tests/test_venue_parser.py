@@ -0,0 +1,65 @@
+import json
+import re
+
+import pytest
+
+from helper import venue_parser
+from helper.venue_parser import parse_venue, VenueTable
+
+# (base name, edition) given by the original per call regexes of a2_preprocessing
+venues = [
+    ("Proceedings of the 2019 International Conference on Management of Data",
+     ("Proceedings of the International Conference on Management of Data", 2019)),
+    ("VLDB '98", ("VLDB", 1998)),
+    ("Twenty-First International Conference on Data Engineering", ("International Conference on Data Engineering", 21)),
+    ("ICDE 2020, 36th IEEE Conference", ("ICDE , IEEE Conference", 36)),
+    ("Edition 5 - Workshop on Health Informatics", ("Workshop on Health Informatics", 5)),
+    ("- Third Symposium on Principles of Database Systems, 2011 -", ("Symposium on Principles of Database Systems", 3)),
+    ("ACM SIGMOD Conference", ("ACM SIGMOD Conference", None)),
+    ("Thirty-First Workshop", ("Thirty- Workshop", 1)),
+    ("", ("", None)),
+    ("EDBT/ICDT 2021 Joint Conference", ("EDBT/ICDT Joint Conference", 2021)),
+    ("1st and 2nd Workshop on AI '05", ("and Workshop on AI", 1)),
+]
+
+
+@pytest.mark.parametrize('venue, parsed', venues)
+def test_parse_venue(venue, parsed):
+    assert parse_venue(venue) == parsed
+    assert parse_venue(venue) == parsed          # memoized parse
+
+
+def test_venue_table_is_saved_and_reused(tmp_path):
+    path = str(tmp_path / 'venue_table.json')
+    table = VenueTable(path)
+    for venue, parsed in venues:
+        assert (table.base_name(venue), table.edition(venue)) == parsed
+    assert table.new_entries == len(venues)
+    table.save()
+
+    reloaded = VenueTable(path)
+    assert reloaded.table == dict(venues)
+    for venue, parsed in venues:
+        assert reloaded.parse(venue) == parsed
+    assert reloaded.new_entries == 0
+
+
+def test_venue_table_entries_win_over_parsing(tmp_path):
+    path = tmp_path / 'venue_table.json'
+    path.write_text(json.dumps({"parser_version": venue_parser.parser_version(),
+                                "venues": {"ACM SIGMOD Conference": ["SIGMOD", 1]}}))
+    assert VenueTable(str(path)).parse("ACM SIGMOD Conference") == ("SIGMOD", 1)
+
+
+def test_venue_table_of_another_parser_is_discarded(tmp_path, monkeypatch):
+    path = tmp_path / 'venue_table.json'
+    path.write_text(json.dumps({"ACM SIGMOD Conference": ["SIGMOD", 1]}))      # table without a version
+    assert VenueTable(str(path)).parse("ACM SIGMOD Conference") == ("ACM SIGMOD Conference", None)
+
+    table = VenueTable(str(path))
+    table.parse("2020 ACM SIGMOD Conference")
+    table.save()
+    assert len(VenueTable(str(path)).table) == 1
+    # A changed pattern gives another version, the stored entries are not reused
+    monkeypatch.setattr(venue_parser, 'MULTIPLE_SPACES', re.compile(r'\s{3,}'))
+    assert VenueTable(str(path)).table == {}